@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""
+Bulk entity import throughput benchmark
+
+Generates a CSV or NDJSON upload of --rows entities and POSTs it to
+/entities/bulk on a running backend, then reports rows per second:
+
+    python benchmarks/bench_bulk_import.py --rows 100000 --label after
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    print("❌ httpx not installed. Run: pip install -r requirements-bench.txt")
+    sys.exit(1)
+
+STATES = ["DE", "NY", "CA", "TX", "FL", "NV", "WY", "IL"]
+ENTITY_TYPES = ["LLC", "Corporation", "S-Corp", "Partnership", "Non-Profit"]
+
+
+def generate_rows(count, seed, run_id):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "entity_name": f"Bench Entity {run_id}-{i}",
+            "ein": f"{run_id}-{i:07d}",
+            "date_of_formation": f"{rng.randint(1990, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "registered_address": f"{rng.randint(1, 9999)} Main St",
+            "state_of_formation": rng.choice(STATES),
+            "entity_type": rng.choice(ENTITY_TYPES),
+            "status": "active",
+        }
+
+
+def build_body(rows, fmt):
+    if fmt == "ndjson":
+        return "\n".join(json.dumps(row) for row in rows).encode(), "application/x-ndjson"
+    buf = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buf, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+    return buf.getvalue().encode(), "text/csv"
+
+
+def main(args):
+    run_id = args.run_id or f"B{int(time.time())}"
+    body, content_type = build_body(generate_rows(args.rows, args.seed, run_id), args.format)
+    print(f"🚀 {args.label}: POST {args.base_url}/entities/bulk ({args.rows} rows, {len(body) / 1e6:.1f} MB {args.format})")
+
+    results = []
+    for attempt in range(args.repeat):
+        started = time.perf_counter()
+        response = httpx.post(
+            f"{args.base_url}/entities/bulk",
+            content=body,
+            headers={"Content-Type": content_type},
+            timeout=args.timeout,
+        )
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            print(f"❌ HTTP {response.status_code}: {response.text[:500]}")
+            sys.exit(1)
+        report = response.json()
+        result = {
+            "rows": args.rows,
+            "format": args.format,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(args.rows / elapsed, 1),
+            "inserted": report["inserted"],
+            "updated": report["updated"],
+            "failed": report["failed"],
+        }
+        results.append(result)
+        # The first pass inserts; repeats exercise the ON CONFLICT update path
+        print(
+            f"  pass {attempt + 1}: {result['elapsed_s']}s  {result['rows_per_s']} rows/s  "
+            f"inserted={result['inserted']} updated={result['updated']} failed={result['failed']}"
+        )
+
+    if args.output:
+        try:
+            with open(args.output) as f:
+                output = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            output = {}
+        output[args.label] = {"endpoint": "/entities/bulk", "results": results}
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--repeat", type=int, default=2, help="upload the same file N times")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--run-id", help="EIN prefix; defaults to a timestamp so runs don't collide")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="JSON file to merge results into")
+    main(parser.parse_args())
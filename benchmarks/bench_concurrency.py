@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""
+Concurrent-request throughput benchmark for a running backend
+
+Run it once against the old build and once against the new one with a
+different --label to compare throughput at each concurrency level:
+
+    python benchmarks/bench_concurrency.py --base-url http://localhost:8000 --label after
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    print("❌ httpx not installed. Run: pip install -r requirements-bench.txt")
+    sys.exit(1)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_level(base_url, endpoint, concurrency, requests_per_client, timeout):
+    """Drive ``concurrency`` clients, each issuing requests back to back"""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                try:
+                    response = await client.get(endpoint)
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency * requests_per_client,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+async def main(args):
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = []
+    print(f"🚀 {args.label}: GET {args.base_url}{args.endpoint}")
+    for level in levels:
+        result = await run_level(args.base_url, args.endpoint, level, args.requests_per_client, args.timeout)
+        results.append(result)
+        print(
+            f"  c={level:<4} {result['throughput_rps']!s:>8} req/s  "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms errors={result['errors']}"
+        )
+
+    if args.output:
+        try:
+            with open(args.output) as f:
+                report = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            report = {}
+        report[args.label] = {"endpoint": args.endpoint, "results": results}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/entities")
+    parser.add_argument("--concurrency", default="50,100,250,500", help="comma separated client counts")
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="JSON file to merge results into")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+"""
+Reproducible load benchmark: every CRUD endpoint against a throwaway database
+
+Creates a fresh database on a local Postgres server, starts backend-render
+against it with uvicorn, seeds a deterministic dataset, then drives each
+endpoint at fixed concurrency levels and records p50/p95/p99 latency and
+throughput. The database is dropped afterwards.
+
+    python benchmarks/bench_load.py --admin-dsn postgresql://postgres@localhost/postgres \\
+        --label $(git rev-parse --short HEAD) --output load.json
+
+Results are merged into --output under --label together with the commit,
+dataset size and settings, so runs from different commits sit side by side.
+The response cache is off by default (--cache-ttl 0) so the numbers track
+the database path; pass --cache-ttl 30 to measure what production serves.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from bench_concurrency import percentile
+
+try:
+    import httpx
+    import psycopg2
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, make_dsn, parse_dsn
+except ImportError:
+    print("❌ httpx or psycopg2 not installed. Run: pip install -r requirements-bench.txt")
+    sys.exit(1)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATES = ["DE", "NY", "CA", "TX", "FL", "NV", "WY", "IL"]
+ENTITY_TYPES = ["LLC", "Corporation", "S-Corp", "Partnership", "Non-Profit"]
+
+SEED_SQL = """
+    SELECT setseed(%(seed)s);
+
+    INSERT INTO entities (entity_name, ein, date_of_formation, registered_address, state_of_formation,
+                          entity_type, status, created_at, updated_at)
+    SELECT 'Seed Entity ' || i, lpad(i::text, 9, '0'), date '1990-01-01' + (random() * 12000)::int,
+           i || ' Main St', (%(states)s::text[])[1 + (random() * 7)::int],
+           (%(entity_types)s::text[])[1 + (random() * 4)::int],
+           CASE WHEN random() < 0.1 THEN 'inactive' ELSE 'active' END,
+           now() - i * interval '1 minute', now() - i * interval '1 minute'
+    FROM generate_series(1, %(entities)s) AS i;
+
+    INSERT INTO accounts (account_name, username, encrypted_password, entity_id)
+    SELECT 'Account ' || e.n || '-' || a, 'seed_' || e.n || '_' || a, 'seed', e.id
+    FROM (SELECT id, row_number() OVER (ORDER BY ein) AS n FROM entities) e
+    CROSS JOIN generate_series(1, %(accounts_per_entity)s) AS a;
+
+    INSERT INTO tasks (task_name, description, status, entity_id)
+    SELECT 'Task ' || e.n || '-' || t, 'Seeded task', (ARRAY['pending', 'in_progress', 'completed'])[1 + (random() * 2)::int], e.id
+    FROM (SELECT id, row_number() OVER (ORDER BY ein) AS n FROM entities) e
+    CROSS JOIN generate_series(1, %(tasks_per_entity)s) AS t;
+
+    INSERT INTO task_steps (step_name, description, status, task_id)
+    SELECT 'Step ' || s, 'Seeded step', 'pending', t.id
+    FROM tasks t CROSS JOIN generate_series(1, %(steps_per_task)s) AS s;
+
+    ANALYZE;
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def throwaway_database(admin_dsn):
+    """Create an empty database next to ``admin_dsn``'s and yield its DSN"""
+    name = f"lawmox_bench_{os.getpid()}"
+    admin = psycopg2.connect(admin_dsn)
+    admin.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    try:
+        with admin.cursor() as cur:
+            cur.execute(f"CREATE DATABASE {name}")
+        yield make_dsn(**{**parse_dsn(admin_dsn), "dbname": name})
+    finally:
+        with admin.cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s", (name,))
+            cur.execute(f"DROP DATABASE IF EXISTS {name}")
+        admin.close()
+
+
+@contextmanager
+def running_app(dsn, port, app_dir, env):
+    """backend-render under uvicorn, yielded once /ready answers 200"""
+    env = {**os.environ, "DATABASE_URL": dsn, **env}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=2).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        else:
+            raise RuntimeError("backend did not become ready within 60s")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def seed(dsn, args):
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            started = time.perf_counter()
+            cur.execute(SEED_SQL, {
+                "seed": (args.seed % 1000) / 1000,
+                "states": STATES,
+                "entity_types": ENTITY_TYPES,
+                "entities": args.entities,
+                "accounts_per_entity": args.accounts_per_entity,
+                "tasks_per_entity": args.tasks_per_entity,
+                "steps_per_task": args.steps_per_task,
+            })
+            elapsed = time.perf_counter() - started
+            ids = {}
+            for table, order in (("entities", "ein"), ("tasks", "task_name")):
+                cur.execute(f"SELECT id::text FROM {table} ORDER BY {order}")
+                ids[table] = [row[0] for row in cur.fetchall()]
+        return ids, elapsed
+    finally:
+        conn.close()
+
+
+def scenarios(ids):
+    """(name, request factory, response hook) for every endpoint, reads before writes"""
+    created = []
+
+    def remember(response):
+        created.append(response.json()["id"])
+
+    def entity_body(rng, n):
+        return {
+            "entity_name": f"Load Entity {n}",
+            "ein": f"L{rng.getrandbits(40):012d}",
+            "date_of_formation": f"{rng.randint(1990, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "registered_address": f"{rng.randint(1, 9999)} Market St",
+            "state_of_formation": rng.choice(STATES),
+            "entity_type": rng.choice(ENTITY_TYPES),
+        }
+
+    return [
+        ("GET /entities", lambda rng, n: ("GET", "/entities?limit=100", None), None),
+        ("GET /entities?filtered", lambda rng, n: ("GET", f"/entities?state_of_formation={rng.choice(STATES)}&sort=entity_name", None), None),
+        ("GET /entities/{id}", lambda rng, n: ("GET", f"/entities/{rng.choice(ids['entities'])}", None), None),
+        ("GET /entities/{id}/full", lambda rng, n: ("GET", f"/entities/{rng.choice(ids['entities'])}/full", None), None),
+        ("GET /dashboard", lambda rng, n: ("GET", "/dashboard", None), None),
+        ("GET /accounts", lambda rng, n: ("GET", f"/accounts?entity_id={rng.choice(ids['entities'])}", None), None),
+        ("GET /tasks", lambda rng, n: ("GET", "/tasks?limit=100", None), None),
+        ("GET /task-steps", lambda rng, n: ("GET", "/task-steps?limit=100", None), None),
+        ("GET /changes", lambda rng, n: ("GET", "/changes?limit=100", None), None),
+        ("POST /entities", lambda rng, n: ("POST", "/entities", entity_body(rng, n)), remember),
+        ("PUT /entities/{id}", lambda rng, n: ("PUT", f"/entities/{rng.choice(ids['entities'])}", {"status": rng.choice(["active", "inactive"])}), None),
+        ("POST /accounts", lambda rng, n: ("POST", "/accounts", {
+            "account_name": f"Load Account {n}", "username": f"load_{rng.getrandbits(48):x}",
+            "password": "load-test-password", "entity_id": rng.choice(ids["entities"]),
+        }), None),
+        ("POST /tasks", lambda rng, n: ("POST", "/tasks", {"task_name": f"Load Task {n}", "entity_id": rng.choice(ids["entities"])}), None),
+        ("POST /task-steps", lambda rng, n: ("POST", "/task-steps", {"step_name": f"Load Step {n}", "task_id": rng.choice(ids["tasks"])}), None),
+        # Deletes the entities POST /entities created, so the seeded set stays intact
+        ("DELETE /entities/{id}", lambda rng, n: ("DELETE", f"/entities/{created.pop()}", None), None),
+    ]
+
+
+async def run_level(base_url, factory, hook, concurrency, requests_per_client, timeout, seed):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker(index):
+            nonlocal errors
+            rng = random.Random(f"{seed}-{concurrency}-{index}")
+            for i in range(requests_per_client):
+                try:
+                    method, path, body = factory(rng, f"{seed}-{concurrency}-{index}-{i}")
+                except IndexError:
+                    errors += 1
+                    continue
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                if response.status_code >= 400:
+                    errors += 1
+                    continue
+                latencies.append(elapsed)
+                if hook:
+                    hook(response)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency * requests_per_client,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+async def drive(base_url, ids, args):
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = {}
+    for name, factory, hook in scenarios(ids):
+        if args.only and not any(part in name for part in args.only.split(",")):
+            continue
+        results[name] = []
+        for level in levels:
+            result = await run_level(base_url, factory, hook, level, args.requests_per_client, args.timeout, args.seed)
+            results[name].append(result)
+            print(
+                f"  {name:<24} c={level:<4} {result['throughput_rps']!s:>8} req/s  "
+                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms errors={result['errors']}"
+            )
+    return results
+
+
+def main(args):
+    from cryptography.fernet import Fernet
+
+    env = {"CACHE_TTL": str(args.cache_ttl), "ENCRYPTION_KEY": Fernet.generate_key().decode()}
+    for pair in args.env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+
+    print(f"🚀 {args.label}: {args.entities} entities x {args.accounts_per_entity} accounts, "
+          f"{args.tasks_per_entity} tasks x {args.steps_per_task} steps (seed {args.seed})")
+    with throwaway_database(args.admin_dsn) as dsn:
+        with running_app(dsn, free_port(), os.path.join(ROOT, args.app_dir), env) as base_url:
+            ids, seed_s = seed(dsn, args)
+            print(f"  seeded in {seed_s:.1f}s")
+            results = asyncio.run(drive(base_url, ids, args))
+
+    if args.output:
+        try:
+            with open(args.output) as f:
+                report = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            report = {}
+        report[args.label] = {
+            "commit": git_commit(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "dataset": {
+                "entities": args.entities,
+                "accounts_per_entity": args.accounts_per_entity,
+                "tasks_per_entity": args.tasks_per_entity,
+                "steps_per_task": args.steps_per_task,
+                "seed": args.seed,
+                "seed_s": round(seed_s, 2),
+            },
+            "settings": {"requests_per_client": args.requests_per_client, **{k: v for k, v in env.items() if k != "ENCRYPTION_KEY"}},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admin-dsn", default=os.getenv("BENCH_ADMIN_DSN", "postgresql://postgres@localhost/postgres"),
+                        help="Server to create the throwaway database on (needs CREATEDB)")
+    parser.add_argument("--app-dir", default="backend-render", help="Backend to serve (must read DATABASE_URL)")
+    parser.add_argument("--entities", type=int, default=2000)
+    parser.add_argument("--accounts-per-entity", type=int, default=3)
+    parser.add_argument("--tasks-per-entity", type=int, default=2)
+    parser.add_argument("--steps-per-task", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", default="1,10,50", help="comma separated client counts")
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--only", help="comma separated substrings of scenario names to run")
+    parser.add_argument("--cache-ttl", type=float, default=0)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the backend, repeatable")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="JSON file to merge results into")
+    main(parser.parse_args())
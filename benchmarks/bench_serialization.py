@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+List serialization micro-benchmark
+
+Compares the old list path (RealDictCursor dicts -> EntityResponse(**row) ->
+FastAPI response_model validation -> JSONResponse) with the fast path
+(tuples -> orjson/json bytes) for 10k and 100k entity rows, in rows/s:
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --dsn postgresql://... --label after
+
+Without --dsn the rows are synthesized in Python and only encoding is
+timed; with --dsn they are fetched from Postgres (generate_series, no table
+needed) so the cursor type is part of the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+
+from lawmox.pagination import Page, encode_cursor
+from lawmox.serialize import encode_page, orjson
+
+COLUMNS = [
+    "entity_name", "ein", "date_of_formation", "registered_address", "state_of_formation",
+    "entity_type", "status", "id", "created_at", "updated_at",
+]
+
+SQL = """
+    SELECT 'Entity ' || i AS entity_name, lpad(i::text, 9, '0') AS ein,
+           date '2000-01-01' + (i %% 9000) AS date_of_formation, i || ' Main St' AS registered_address,
+           'DE' AS state_of_formation, 'LLC' AS entity_type, 'active' AS status,
+           gen_random_uuid()::text AS id, now() - i * interval '1 second' AS created_at, now() AS updated_at
+    FROM generate_series(1, %s) AS i
+"""
+
+
+# Same shape as the backends' EntityResponse
+class EntityResponse(BaseModel):
+    entity_name: str
+    ein: Optional[str] = None
+    date_of_formation: Optional[date] = None
+    registered_address: Optional[str] = None
+    state_of_formation: Optional[str] = None
+    entity_type: Optional[str] = None
+    status: str = "active"
+    id: str
+    created_at: datetime
+    updated_at: datetime
+
+
+def synthesize(count, seed=42):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        yield (
+            f"Entity {i}", f"{i:09d}", date(2000, 1, 1) + timedelta(days=rng.randint(0, 9000)), f"{i} Main St",
+            "DE", "LLC", "active", str(uuid.UUID(int=rng.getrandbits(128))), now - timedelta(seconds=i), now,
+        )
+
+
+def fetch(dsn, count, as_dicts):
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor if as_dicts else None) as cur:
+            cur.execute(SQL, (count,))
+            rows = cur.fetchall()
+            columns = [column.name for column in cur.description]
+        return columns, rows
+    finally:
+        conn.close()
+
+
+async def old_path(rows):
+    field = create_response_field(name="response", type_=Page[EntityResponse])
+    page = Page(items=[EntityResponse(**row) for row in rows], next_cursor=encode_cursor(rows[-1]))
+    content = await serialize_response(field=field, response_content=page, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+def fast_path(columns, rows):
+    last = dict(zip(columns, rows[-1]))
+    return encode_page(columns, rows, encode_cursor(last))
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List serialization micro-benchmark")
+    parser.add_argument("--rows", default="10000,100000", help="Comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--dsn", help="Fetch rows from this Postgres instead of synthesizing them")
+    parser.add_argument("--label", default="run", help="Name for this run in the output file")
+    parser.add_argument("--output", help="JSON file to merge results into")
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson' if orjson else 'json (stdlib)'}")
+    results = []
+    for count in [int(value) for value in args.rows.split(",")]:
+        if args.dsn:
+            def old():
+                _, rows = fetch(args.dsn, count, as_dicts=True)
+                return asyncio.run(old_path(rows))
+
+            def fast():
+                columns, rows = fetch(args.dsn, count, as_dicts=False)
+                return fast_path(columns, rows)
+        else:
+            tuples = list(synthesize(count))
+            dicts = [dict(zip(COLUMNS, row)) for row in tuples]
+
+            def old():
+                return asyncio.run(old_path(dicts))
+
+            def fast():
+                return fast_path(COLUMNS, tuples)
+
+        old_s, old_bytes = best_of(args.repeat, old)
+        fast_s, fast_bytes = best_of(args.repeat, fast)
+        result = {
+            "rows": count,
+            "source": "postgres" if args.dsn else "memory",
+            "old_rows_per_s": round(count / old_s, 1),
+            "fast_rows_per_s": round(count / fast_s, 1),
+            "speedup": round(old_s / fast_s, 2),
+            "old_bytes": old_bytes,
+            "fast_bytes": fast_bytes,
+        }
+        results.append(result)
+        print(
+            f"  {count:>7} rows: old {result['old_rows_per_s']:>10} rows/s  "
+            f"fast {result['fast_rows_per_s']:>10} rows/s  x{result['speedup']}"
+        )
+
+    if args.output:
+        try:
+            with open(args.output) as f:
+                output = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            output = {}
+        output[args.label] = {"encoder": "orjson" if orjson else "json", "results": results}
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+"""
+Query plan check: every endpoint query must use an index at a million rows
+
+Creates a throwaway database, applies the migrations, loads a ~1M row
+dataset with generate_dataset.py, VACUUM ANALYZEs it and EXPLAINs each
+query the list, detail, dashboard, ETag, change feed and write endpoints
+issue, built with the same lawmox helpers the backends use. Any Seq Scan on
+entities, accounts, tasks or task_steps fails the check (exit status 1).
+Scans of tables under --min-rows, and scans the planner expects to return
+at least --scan-fraction of the table (an ETag count over a filter most rows
+match), are the right plan and only reported:
+
+    python benchmarks/check_plans.py --admin-dsn postgresql://postgres@localhost/postgres
+
+Pass --dsn instead to check an already loaded database in place. Filters
+are checked with their most common value, the worst case for the planner.
+The related() lookups and the bulk upsert and insert are checked with
+1000-row uploads; the upsert's staging table is COPYed inside the check's
+transaction, which is rolled back. The CSV/NDJSON export reads whole tables
+by design and is not checked.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_dataset
+from bench_load import throwaway_database
+
+import psycopg2
+from cryptography.fernet import Fernet
+from psycopg2.extras import RealDictCursor
+
+from lawmox.bulk import insert_query, references_query, stage_rows, upsert_query
+from lawmox.changes import changes_query, start_query
+from lawmox.dashboard import dashboard_query, entity_full_query
+from lawmox.etag import collection_version_query
+from lawmox.filters import SORT_KEYS, DateRange, filter_conditions
+from lawmox.migrations import migrate
+from lawmox.pagination import encode_cursor, keyset_query
+from lawmox.postgres import related_query
+from lawmox.schema import CHANGE_FEED_TABLES
+
+BIG_TABLES = ("entities", "accounts", "tasks", "task_steps")
+AS_OF = "2025-01-01"
+# Rows per bulk upload in the checked bulk queries
+BULK_ROWS = 1000
+
+# What POST /entities/bulk upserts (lawmox.app.ENTITY_IMPORT_COLUMNS) and what
+# POST /accounts/bulk inserts (ACCOUNT_INSERT_COLUMNS)
+ENTITY_IMPORT_COLUMNS = ("entity_name", "ein", "date_of_formation", "registered_address", "state_of_formation", "entity_type", "status")
+ACCOUNT_INSERT_COLUMNS = ("account_name", "username", "encrypted_password", "entity_id")
+
+# Equality filters the list endpoints accept
+FILTERS = {
+    "entities": ("status", "state_of_formation", "entity_type"),
+    "accounts": ("entity_id",),
+    "tasks": ("entity_id", "status"),
+    "task_steps": ("task_id", "status"),
+}
+
+
+def load(dsn, args):
+    conn = psycopg2.connect(dsn)
+    try:
+        migrate(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    generate_dataset.main(argparse.Namespace(
+        dsn=dsn, key=os.getenv("ENCRYPTION_KEY") or Fernet.generate_key().decode(), as_of=AS_OF,
+        seed=args.seed, entities=args.entities, accounts=args.accounts, tasks=args.tasks,
+        skew=0.8, history_days=3 * 365, workers=None, truncate=False,
+    ))
+
+
+def most_common(cur, table, column):
+    cur.execute(f"SELECT {column} AS value FROM {table} GROUP BY {column} ORDER BY count(*) DESC, {column} LIMIT 1")
+    return cur.fetchone()["value"]
+
+
+def middle_cursor(cur, table, sort):
+    """Cursor into the middle of ``table`` in ``sort`` order, for a deep keyset page"""
+    column = sort.lstrip("-")
+    direction = "DESC" if sort.startswith("-") else "ASC"
+    cur.execute(f"SELECT count(*) AS count FROM {table}")
+    middle = cur.fetchone()["count"] // 2
+    cur.execute(f"SELECT {column}, id FROM {table} ORDER BY {column} {direction}, id {direction} OFFSET %s LIMIT 1", (middle,))
+    return encode_cursor(cur.fetchone(), sort)
+
+
+def column_types(cur, table, columns):
+    cur.execute(
+        "SELECT attname, format_type(atttypid, atttypmod) AS type FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attname = ANY(%s)", (table, list(columns)),
+    )
+    return {row["attname"]: row["type"] for row in cur.fetchall()}
+
+
+def related_queries(cur):
+    """related() as the dashboard fallback and the bulk existence checks call it, one ANY(%s) each"""
+    cur.execute("SELECT id FROM entities ORDER BY created_at DESC, id DESC LIMIT 25")
+    entity_ids = [row["id"] for row in cur.fetchall()]
+    cur.execute("SELECT id FROM tasks WHERE entity_id = ANY(%s::uuid[])", (entity_ids,))
+    task_ids = [row["id"] for row in cur.fetchall()]
+    cur.execute("SELECT id, ein FROM entities WHERE ein IS NOT NULL ORDER BY created_at DESC LIMIT %s", (BULK_ROWS,))
+    entities = cur.fetchall()
+    cur.execute("SELECT username FROM accounts ORDER BY created_at DESC LIMIT %s", (BULK_ROWS,))
+    usernames = [row["username"] for row in cur.fetchall()]
+    return [
+        ("related accounts entity_id=ANY", related_query("accounts", "entity_id"), [entity_ids]),
+        ("related tasks entity_id=ANY", related_query("tasks", "entity_id"), [entity_ids]),
+        ("related task_steps task_id=ANY", related_query("task_steps", "task_id", sort="created_at"), [task_ids]),
+        ("related entities id=ANY", related_query("entities", "id", ("id",), None), [[row["id"] for row in entities]]),
+        ("related entities ein=ANY", related_query("entities", "ein", ("ein",), None), [[row["ein"] for row in entities]]),
+        ("related accounts username=ANY", related_query("accounts", "username", ("username",), None), [usernames]),
+        ("bulk accounts entity references", references_query("entities"), [[row["id"] for row in entities]]),
+    ]
+
+
+def bulk_queries(cur):
+    """The statements behind POST /entities/bulk and /accounts/bulk, for BULK_ROWS rows"""
+    # Half the upload updates existing eins, half inserts new ones
+    cur.execute(
+        f"SELECT {', '.join(ENTITY_IMPORT_COLUMNS)} FROM entities WHERE ein IS NOT NULL ORDER BY created_at DESC LIMIT %s",
+        (BULK_ROWS // 2,),
+    )
+    existing = [tuple(row.values()) for row in cur.fetchall()]
+    new = [(name, f"bulk-{index}", *rest) for index, (name, _, *rest) in enumerate(existing)]
+    rows = [(row_no, *row) for row_no, row in enumerate(existing + new, 1)]
+    staging = stage_rows(cur, "entities", ENTITY_IMPORT_COLUMNS, column_types(cur, "entities", ENTITY_IMPORT_COLUMNS), rows)
+    cur.execute(f"ANALYZE {staging}")
+
+    cur.execute("SELECT id FROM entities ORDER BY created_at DESC LIMIT 1")
+    entity_id = cur.fetchone()["id"]
+    cur.execute("SELECT username FROM accounts ORDER BY created_at DESC LIMIT %s", (BULK_ROWS // 2,))
+    usernames = [row["username"] for row in cur.fetchall()]
+    usernames += [f"bulk-{index}" for index in range(BULK_ROWS - len(usernames))]
+    values = b",".join(cur.mogrify("(%s, %s, %s, %s)", ("bulk", username, "token", entity_id)) for username in usernames)
+    insert = insert_query("accounts", ACCOUNT_INSERT_COLUMNS, "username", "id, username").replace("%s", values.decode())
+    return [
+        ("bulk entities COPY-staged upsert", upsert_query("entities", staging, ENTITY_IMPORT_COLUMNS, "ein"), []),
+        ("bulk accounts insert", insert.replace("%", "%%"), []),
+    ]
+
+
+def workload(cur):
+    """(name, sql, params) for every query the endpoints issue"""
+    queries = []
+    since = datetime.fromisoformat(AS_OF).replace(tzinfo=timezone.utc) - timedelta(days=30)
+    for table in BIG_TABLES:
+        select = f"SELECT * FROM {table}"
+        queries.append((f"{table} version", collection_version_query(table), []))
+        for key in SORT_KEYS[table]:
+            for sort in (f"-{key}", key):
+                queries.append((f"{table} page sort={sort}", *keyset_query(select, None, 100, sort=sort)))
+            sort = f"-{key}"
+            queries.append((f"{table} deep page sort={sort}", *keyset_query(select, middle_cursor(cur, table, sort), 100, sort=sort)))
+        for column in FILTERS[table]:
+            value = most_common(cur, table, column)
+            conditions, params = filter_conditions({column: value})
+            queries.append((f"{table} page {column}=", *keyset_query(select, None, 100, conditions, params)))
+            queries.append((f"{table} version {column}=", collection_version_query(table, conditions), params))
+        for name, dates in (("created_after", DateRange(created_after=since)), ("updated_after", DateRange(updated_after=since))):
+            conditions, params = filter_conditions(dates=dates)
+            queries.append((f"{table} page {name}=", *keyset_query(select, None, 100, conditions, params)))
+            queries.append((f"{table} version {name}=", collection_version_query(table, conditions), params))
+
+        cur.execute(f"SELECT id FROM {table} ORDER BY created_at DESC LIMIT 1")
+        row_id = cur.fetchone()["id"]
+        queries.append((f"{table} detail", f"SELECT * FROM {table} WHERE id = %s", [row_id]))
+        queries.append((f"{table} update", f"UPDATE {table} SET updated_at = NOW() WHERE id = %s RETURNING *", [row_id]))
+        queries.append((f"{table} delete", f"DELETE FROM {table} WHERE id = %s RETURNING id", [row_id]))
+
+    # Active tasks by deadline: the open tasks' partial index, not every task's
+    conditions, params = filter_conditions({"status": "pending"})
+    queries.append(("tasks page status=pending sort=deadline",
+                    *keyset_query("SELECT * FROM tasks", None, 100, conditions, params, "deadline")))
+    # The next step number of a task (database_schema.sql's step_order)
+    task_id = most_common(cur, "task_steps", "task_id")
+    queries.append(("task_steps next step_order",
+                    "SELECT step_order FROM task_steps WHERE task_id = %s ORDER BY step_order DESC LIMIT 1", [task_id]))
+    # What ON DELETE SET NULL runs for each deleted account
+    cur.execute("SELECT id FROM accounts ORDER BY created_at DESC LIMIT 1")
+    queries.append(("accounts delete: tasks account_id = NULL",
+                    "UPDATE tasks SET account_id = NULL WHERE account_id = %s", [cur.fetchone()["id"]]))
+
+    entity_id = most_common(cur, "tasks", "entity_id")
+    queries.append(("entity full", *entity_full_query(entity_id)))
+    queries.append(("dashboard page", *dashboard_query(limit=25)))
+    queries.append(("dashboard deep page", *dashboard_query(middle_cursor(cur, "entities", "-created_at"), 25)))
+    cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot()) AS upper")
+    upper = cur.fetchone()["upper"]
+    cur.execute("SELECT changed_xid FROM entities ORDER BY changed_xid DESC LIMIT 1 OFFSET 1000")
+    recent = cur.fetchone()["changed_xid"]
+    queries += related_queries(cur)
+    queries += bulk_queries(cur)
+    queries.append(("changes start", start_query(CHANGE_FEED_TABLES), {
+        "since": since.isoformat(), "tables": list(CHANGE_FEED_TABLES),
+    }))
+    queries.append(("changes", changes_query(CHANGE_FEED_TABLES), {
+        "since_xid": recent, "since_id": "00000000-0000-0000-0000-000000000000",
+        "upper": upper, "tables": list(CHANGE_FEED_TABLES), "fetch": 1001,
+    }))
+    return queries
+
+
+def scans(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from scans(child)
+
+
+def check(dsn, min_rows, scan_fraction, verbose=False):
+    conn = psycopg2.connect(dsn, cursor_factory=RealDictCursor)
+    failures = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)", (list(BIG_TABLES),))
+            large = {row["relname"]: row["reltuples"] for row in cur.fetchall() if row["reltuples"] >= min_rows}
+            for name, sql, params in workload(cur):
+                # Writes are only planned, inside a transaction that is rolled back anyway
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                plan = cur.fetchone()["QUERY PLAN"]
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                nodes = list(scans(plan))
+                seq = [node for node in nodes if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in large]
+                selective = sorted({node["Relation Name"] for node in seq
+                                    if node["Plan Rows"] < scan_fraction * large[node["Relation Name"]]})
+                indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node}
+                                 | {name for node in nodes for name in node.get("Conflict Arbiter Indexes", ())})
+                if selective:
+                    failures.append(name)
+                    print(f"❌ {name:<42} Seq Scan on {', '.join(selective)}")
+                elif seq:
+                    print(f"⚠️  {name:<42} reads most of {', '.join(sorted({node['Relation Name'] for node in seq}))}")
+                elif verbose:
+                    print(f"✅ {name:<42} {', '.join(indexes)}")
+        conn.rollback()
+    finally:
+        conn.close()
+    return failures
+
+
+def main(args):
+    if args.dsn:
+        failures = check(args.dsn, args.min_rows, args.scan_fraction, args.verbose)
+    else:
+        with throwaway_database(args.admin_dsn) as dsn:
+            load(dsn, args)
+            conn = psycopg2.connect(dsn)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                # Sets the visibility map too, as autovacuum would in production
+                cur.execute("VACUUM ANALYZE")
+            conn.close()
+            failures = check(dsn, args.min_rows, args.scan_fraction, args.verbose)
+    if failures:
+        print(f"❌ {len(failures)} queries scan a whole table")
+        sys.exit(1)
+    print("✅ Every selective query uses an index")
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admin-dsn", default=os.getenv("BENCH_ADMIN_DSN", "postgresql://postgres@localhost/postgres"),
+                        help="Server to create the throwaway database on (needs CREATEDB)")
+    parser.add_argument("--dsn", help="Check this already loaded database instead")
+    parser.add_argument("--entities", type=int, default=100000)
+    parser.add_argument("--accounts", type=int, default=300000)
+    parser.add_argument("--tasks", type=int, default=270000, help="About 3.75 steps each: ~1M task_steps")
+    parser.add_argument("--min-rows", type=int, default=50000, help="Smaller tables may be scanned")
+    parser.add_argument("--scan-fraction", type=float, default=0.5,
+                        help="Scans expected to return this share of a table or more are allowed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", "-v", action="store_true", help="Also list the indexes passing queries use")
+    return parser
+
+
+if __name__ == "__main__":
+    main(arguments().parse_args())
@@ -1,5 +1,7 @@
 -- Lawmox Entity Tracker Database Schema
 -- Supabase PostgreSQL Schema
+-- (The local Postgres backends are migrated by lawmox/migrations.py instead;
+--  migration 2 adds the columns below that the API tables lacked.)
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
@@ -67,7 +69,28 @@ CREATE INDEX idx_tasks_entity_id ON tasks(entity_id);
 CREATE INDEX idx_tasks_account_id ON tasks(account_id);
 CREATE INDEX idx_tasks_deadline ON tasks(deadline);
 CREATE INDEX idx_tasks_status ON tasks(status);
-CREATE INDEX idx_task_steps_task_id ON task_steps(task_id);
+-- Steps are embedded in task responses ordered by step_order
+CREATE INDEX idx_task_steps_task_id_step_order ON task_steps(task_id, step_order);
+
+-- Keyset pagination indexes (ORDER BY created_at DESC, id DESC)
+CREATE INDEX idx_entities_created_at_id ON entities(created_at DESC, id DESC);
+CREATE INDEX idx_accounts_created_at_id ON accounts(created_at DESC, id DESC);
+CREATE INDEX idx_tasks_created_at_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX idx_task_steps_created_at_id ON task_steps(created_at DESC, id DESC);
+
+-- List endpoint filters and sort keys
+CREATE INDEX idx_entities_updated_at_id ON entities(updated_at, id);
+CREATE INDEX idx_entities_entity_name_id ON entities(entity_name, id);
+CREATE INDEX idx_entities_status_created_at_id ON entities(status, created_at DESC, id DESC);
+CREATE INDEX idx_entities_state_of_formation_created_at_id ON entities(state_of_formation, created_at DESC, id DESC);
+CREATE INDEX idx_entities_entity_type_created_at_id ON entities(entity_type, created_at DESC, id DESC);
+CREATE INDEX idx_accounts_updated_at_id ON accounts(updated_at, id);
+CREATE INDEX idx_accounts_account_name_id ON accounts(account_name, id);
+CREATE INDEX idx_accounts_entity_id_created_at_id ON accounts(entity_id, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_updated_at_id ON tasks(updated_at, id);
+CREATE INDEX idx_tasks_entity_id_created_at_id ON tasks(entity_id, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_status_created_at_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX idx_task_steps_task_id_created_at_id ON task_steps(task_id, created_at DESC, id DESC);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -88,6 +111,35 @@ CREATE TRIGGER update_accounts_updated_at BEFORE UPDATE ON accounts
 CREATE TRIGGER update_tasks_updated_at BEFORE UPDATE ON tasks
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Delete tombstones for the change feed (GET /changes)
+CREATE TABLE tombstones (
+    table_name TEXT NOT NULL,
+    row_id UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_tombstones_deleted_at_row_id ON tombstones(deleted_at, row_id);
+
+CREATE OR REPLACE FUNCTION record_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO tombstones (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER record_entities_tombstone AFTER DELETE ON entities
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+CREATE TRIGGER record_accounts_tombstone AFTER DELETE ON accounts
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+CREATE TRIGGER record_tasks_tombstone AFTER DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+CREATE TRIGGER record_task_steps_tombstone AFTER DELETE ON task_steps
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
 -- Row Level Security (RLS) policies
 ALTER TABLE entities ENABLE ROW LEVEL SECURITY;
 ALTER TABLE accounts ENABLE ROW LEVEL SECURITY;
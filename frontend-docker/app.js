@@ -5,12 +5,39 @@ class LawmoxEntityTracker {
         this.accounts = [];
         this.tasks = [];
         this.taskSteps = [];
+        // next_cursor of each collection and its in-flight page request
+        this.cursors = {};
+        this.loading = {};
         this.init();
     }
 
     init() {
         this.bindEvents();
         this.loadData();
+        this.subscribeToChanges();
+    }
+
+    // Live updates: reload only the collection another user changed
+    subscribeToChanges() {
+        if (!window.EventSource) return;
+        const reloaders = {
+            entities: () => this.loadEntities(),
+            accounts: () => this.loadAccounts(),
+            tasks: () => this.loadTasks(),
+            task_steps: () => this.loadTaskSteps()
+        };
+        const pending = {};
+        const events = new EventSource(`${this.apiBaseUrl}/events?topics=${Object.keys(reloaders).join(',')}`);
+        events.addEventListener('change', (message) => {
+            const { table } = JSON.parse(message.data);
+            // Coalesce bursts (e.g. a bulk import) into one reload per table
+            if (!reloaders[table] || pending[table]) return;
+            pending[table] = setTimeout(() => {
+                delete pending[table];
+                reloaders[table]();
+            }, 500);
+        });
+        events.addEventListener('resync', () => this.loadData());
     }
 
     bindEvents() {
@@ -50,7 +77,7 @@ class LawmoxEntityTracker {
         });
     }
 
-    async apiCall(endpoint, method = 'GET', data = null) {
+    async apiCall(endpoint, method = 'GET', data = null, { compact = false } = {}) {
         try {
             const options = {
                 method,
@@ -59,6 +86,11 @@ class LawmoxEntityTracker {
                 }
             };
 
+            // List pages can come back columnar: field names once per page, not once per row
+            if (compact) {
+                options.headers['Accept'] = 'application/vnd.lawmox.columnar+json, application/json;q=0.5';
+            }
+
             if (data) {
                 options.body = JSON.stringify(data);
             }
@@ -69,7 +101,9 @@ class LawmoxEntityTracker {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            return await response.json();
+            const body = await response.json();
+            const contentType = response.headers.get('Content-Type') || '';
+            return contentType.startsWith('application/vnd.lawmox.columnar+json') ? this.decodeColumnar(body) : body;
         } catch (error) {
             console.error('API call failed:', error);
             this.showAlert('Error: ' + error.message, 'danger');
@@ -77,6 +111,80 @@ class LawmoxEntityTracker {
         }
     }
 
+    // {columns, data: [[...column values], ...], next_cursor} -> {items, next_cursor}
+    decodeColumnar({ columns, data, next_cursor }) {
+        const count = data.length ? data[0].length : 0;
+        const items = new Array(count);
+        for (let i = 0; i < count; i++) {
+            const item = {};
+            columns.forEach((column, c) => { item[column] = data[c][i]; });
+            items[i] = item;
+        }
+        return { items, next_cursor };
+    }
+
+    // One page of a cursor-paginated list endpoint: {items, next_cursor}
+    apiCallPage(endpoint, cursor = null, pageSize = 100) {
+        const params = new URLSearchParams({ limit: pageSize });
+        if (cursor) params.set('cursor', cursor);
+        const separator = endpoint.includes('?') ? '&' : '?';
+        return this.apiCall(`${endpoint}${separator}${params}`, 'GET', null, { compact: true });
+    }
+
+    // Follow next_cursor until exhausted. Only for lists scoped to one parent,
+    // such as a task's steps
+    async apiCallAll(endpoint, pageSize = 500) {
+        const items = [];
+        let cursor = null;
+        do {
+            const page = await this.apiCallPage(endpoint, cursor, pageSize);
+            items.push(...page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
+        return items;
+    }
+
+    // The first page of a collection into this[name], or the next one appended
+    loadPage(name, endpoint, more = false) {
+        // One request per collection at a time, so a reload and a "load more" cannot interleave
+        const previous = this.loading[name] || Promise.resolve();
+        const result = previous.then(async () => {
+            if (more && !this.cursors[name]) return;
+            const page = await this.apiCallPage(endpoint, more ? this.cursors[name] : null);
+            this[name] = more ? this[name].concat(page.items) : page.items;
+            this.cursors[name] = page.next_cursor;
+        });
+        this.loading[name] = result.catch(() => {});
+        return result;
+    }
+
+    // A "Load more" button under a table while its collection has further pages;
+    // it also fires when scrolled into view
+    renderLoadMore(tbodyId, name, loadMore) {
+        const table = document.getElementById(tbodyId).closest('table');
+        let button = table.parentElement.querySelector('.load-more');
+        if (!this.cursors[name]) {
+            if (button) {
+                if (this.moreObserver) this.moreObserver.unobserve(button);
+                button.remove();
+            }
+            return;
+        }
+        if (button) return;
+        button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'btn btn-outline-secondary btn-sm w-100 mt-2 load-more';
+        button.textContent = 'Load more';
+        button.addEventListener('click', loadMore);
+        table.after(button);
+        if (window.IntersectionObserver) {
+            this.moreObserver = this.moreObserver || new IntersectionObserver(entries => {
+                entries.filter(entry => entry.isIntersecting).forEach(entry => entry.target.click());
+            });
+            this.moreObserver.observe(button);
+        }
+    }
+
     async loadData() {
         try {
             await Promise.all([
@@ -90,37 +198,41 @@ class LawmoxEntityTracker {
         }
     }
 
-    async loadEntities() {
+    async loadEntities(more = false) {
         try {
-            this.entities = await this.apiCall('/entities');
+            await this.loadPage('entities', '/entities', more);
             this.renderEntities();
+            this.renderLoadMore('entitiesTableBody', 'entities', () => this.loadEntities(true));
         } catch (error) {
             console.error('Failed to load entities:', error);
         }
     }
 
-    async loadAccounts() {
+    async loadAccounts(more = false) {
         try {
-            this.accounts = await this.apiCall('/accounts');
+            await this.loadPage('accounts', '/accounts', more);
             this.renderAccounts();
+            this.renderLoadMore('accountsTableBody', 'accounts', () => this.loadAccounts(true));
         } catch (error) {
             console.error('Failed to load accounts:', error);
         }
     }
 
-    async loadTasks() {
+    async loadTasks(more = false) {
         try {
-            this.tasks = await this.apiCall('/tasks');
+            await this.loadPage('tasks', '/tasks', more);
             this.renderTasks();
+            this.renderLoadMore('tasksTableBody', 'tasks', () => this.loadTasks(true));
         } catch (error) {
             console.error('Failed to load tasks:', error);
         }
     }
 
-    async loadTaskSteps() {
+    async loadTaskSteps(more = false) {
         try {
-            this.taskSteps = await this.apiCall('/task-steps');
+            await this.loadPage('taskSteps', '/task-steps', more);
             this.renderTaskSteps();
+            this.renderLoadMore('taskStepsTableBody', 'taskSteps', () => this.loadTaskSteps(true));
         } catch (error) {
             console.error('Failed to load task steps:', error);
         }
@@ -147,18 +259,17 @@ class LawmoxEntityTracker {
         });
     }
 
-    selectEntity(entityId) {
+    async selectEntity(entityId) {
         const entity = this.entities.find(e => e.id === entityId);
         if (entity) {
             this.selectedEntityId = entityId;
             document.getElementById('selectedEntityName').textContent = entity.entity_name;
             
-            // Filter related data
-            const entityAccounts = this.accounts.filter(a => a.entity_id === entityId);
-            const entityTasks = this.tasks.filter(t => t.entity_id === entityId);
+            // One request: the entity with its accounts and tasks nested
+            const full = await this.apiCall(`/entities/${entityId}/full`);
             
-            this.renderAccounts(entityAccounts);
-            this.renderTasks(entityTasks);
+            this.renderAccounts(full.accounts);
+            this.renderTasks(full.tasks);
             
             // Switch to accounts tab
             const accountsTab = new bootstrap.Tab(document.getElementById('accounts-tab'));
@@ -329,14 +440,14 @@ class LawmoxEntityTracker {
         });
     }
 
-    selectTask(taskId) {
+    async selectTask(taskId) {
         this.selectedTaskId = taskId;
         const task = this.tasks.find(t => t.id === taskId);
         if (task) {
             document.getElementById('selectedTaskName').textContent = task.task_name;
             
             // Load task steps
-            const taskSteps = this.taskSteps.filter(s => s.task_id === taskId);
+            const taskSteps = await this.apiCallAll(`/task-steps?task_id=${taskId}`);
             this.renderTaskSteps(taskSteps);
             
             // Switch to task steps tab
@@ -1,11 +1,17 @@
 // Lawmox Entity Tracker Frontend JavaScript
 
+// Entities per /dashboard request (the API's default and maximum page sizes)
+const DASHBOARD_PAGE_SIZE = 25;
+const DASHBOARD_MAX_PAGE_SIZE = 200;
+
 class EntityTracker {
     constructor() {
         this.apiBaseUrl = 'http://localhost:8000'; // Update this to your deployed API URL
         this.entities = [];
         this.accounts = [];
         this.tasks = [];
+        this.nextCursor = null;
+        this.loading = Promise.resolve();
         this.currentSection = 'entities';
         
         this.init();
@@ -13,8 +19,30 @@ class EntityTracker {
 
     init() {
         this.setupEventListeners();
-        this.loadEntities();
+        this.loadData();
         this.showSection('entities');
+        this.subscribeToChanges();
+    }
+
+    // Live updates: reload the loaded pages when another user changes them
+    subscribeToChanges() {
+        if (!window.EventSource) return;
+        const reloaders = {
+            entities: () => this.loadData(),
+            accounts: () => this.loadData()
+        };
+        const pending = {};
+        const events = new EventSource(`${this.apiBaseUrl}/events?topics=${Object.keys(reloaders).join(',')}`);
+        events.addEventListener('change', (message) => {
+            const { table } = JSON.parse(message.data);
+            // Coalesce bursts (e.g. a bulk import) into one reload per table
+            if (!reloaders[table] || pending[table]) return;
+            pending[table] = setTimeout(() => {
+                delete pending[table];
+                reloaders[table]();
+            }, 500);
+        });
+        events.addEventListener('resync', () => this.loadData());
     }
 
     setupEventListeners() {
@@ -65,7 +93,7 @@ class EntityTracker {
         });
     }
 
-    async apiCall(endpoint, method = 'GET', data = null) {
+    async apiCall(endpoint, method = 'GET', data = null, { compact = false } = {}) {
         try {
             const options = {
                 method,
@@ -74,6 +102,11 @@ class EntityTracker {
                 }
             };
 
+            // List pages can come back columnar: field names once per page, not once per row
+            if (compact) {
+                options.headers['Accept'] = 'application/vnd.lawmox.columnar+json, application/json;q=0.5';
+            }
+
             if (data) {
                 options.body = JSON.stringify(data);
             }
@@ -84,7 +117,9 @@ class EntityTracker {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            return await response.json();
+            const body = await response.json();
+            const contentType = response.headers.get('Content-Type') || '';
+            return contentType.startsWith('application/vnd.lawmox.columnar+json') ? this.decodeColumnar(body) : body;
         } catch (error) {
             console.error('API call failed:', error);
             this.showNotification('API call failed. Please check your connection.', 'error');
@@ -92,52 +127,87 @@ class EntityTracker {
         }
     }
 
-    async loadData() {
-        try {
-            await Promise.all([
-                this.loadEntities(),
-                this.loadAccounts(),
-                this.loadTasks(),
-                this.loadTaskSteps()
-            ]);
-        } catch (error) {
-            console.error('Failed to load data:', error);
+    // {columns, data: [[...column values], ...], next_cursor} -> {items, next_cursor}
+    decodeColumnar({ columns, data, next_cursor }) {
+        const count = data.length ? data[0].length : 0;
+        const items = new Array(count);
+        for (let i = 0; i < count; i++) {
+            const item = {};
+            columns.forEach((column, c) => { item[column] = data[c][i]; });
+            items[i] = item;
         }
+        return { items, next_cursor };
     }
 
-    async loadEntities() {
-        try {
-            this.entities = await this.apiCall('/entities');
-            this.renderEntities();
-        } catch (error) {
-            console.error('Failed to load entities:', error);
-        }
+    // List endpoints are cursor-paginated; follow next_cursor until exhausted.
+    // Only for lists scoped to one parent, such as a task's steps
+    async apiCallAll(endpoint, pageSize = 500) {
+        const items = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({ limit: pageSize });
+            if (cursor) params.set('cursor', cursor);
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const page = await this.apiCall(`${endpoint}${separator}${params}`, 'GET', null, { compact: true });
+            items.push(...page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
+        return items;
     }
 
-    async loadAccounts() {
-        try {
-            this.accounts = await this.apiCall('/accounts');
-            this.renderAccounts();
-        } catch (error) {
-            console.error('Failed to load accounts:', error);
-        }
+    // The tables fill from /dashboard, one page of entities with their accounts
+    // and tasks per request; further pages load on demand
+    loadData(more = false) {
+        // One request at a time, so a reload and a "load more" cannot interleave
+        this.loading = this.loading.then(() => this.loadDashboard(more));
+        return this.loading;
     }
 
-    async loadTasks() {
+    async loadDashboard(more) {
+        if (more && !this.nextCursor) return;
         try {
-            this.tasks = await this.apiCall('/tasks');
+            // A reload refetches every entity loaded so far, up to the largest page
+            const limit = more ? DASHBOARD_PAGE_SIZE : Math.min(Math.max(this.entities.length, DASHBOARD_PAGE_SIZE), DASHBOARD_MAX_PAGE_SIZE);
+            const params = new URLSearchParams({ limit });
+            if (more) params.set('cursor', this.nextCursor);
+            const page = await this.apiCall(`/dashboard?${params}`);
+            this.entities = more ? this.entities.concat(page.items) : page.items;
+            this.accounts = this.entities.flatMap(entity => entity.accounts);
+            this.tasks = this.entities.flatMap(entity => entity.tasks);
+            this.nextCursor = page.next_cursor;
+            this.renderEntities();
+            this.renderAccounts();
             this.renderTasks();
+            ['entitiesTableBody', 'accountsTableBody', 'tasksTableBody'].forEach(id => this.renderLoadMore(id));
         } catch (error) {
-            console.error('Failed to load tasks:', error);
+            console.error('Failed to load data:', error);
         }
     }
 
-    async loadTaskSteps() {
-        try {
-            this.taskSteps = await this.apiCall('/task-steps');
-            this.renderTaskSteps();
-        } catch (error) {
-            console.error('Failed to load task steps:', error);
+    // A "Load more" button under a table while there are further pages; it also
+    // fires when scrolled into view
+    renderLoadMore(tbodyId) {
+        const table = document.getElementById(tbodyId).closest('table');
+        let button = table.parentElement.querySelector('.load-more');
+        if (!this.nextCursor) {
+            if (button) {
+                if (this.moreObserver) this.moreObserver.unobserve(button);
+                button.remove();
+            }
+            return;
+        }
+        if (button) return;
+        button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'btn btn-outline-secondary btn-sm w-100 mt-2 load-more';
+        button.textContent = 'Load more';
+        button.addEventListener('click', () => this.loadData(true));
+        table.after(button);
+        if (window.IntersectionObserver) {
+            this.moreObserver = this.moreObserver || new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) this.loadData(true);
+            });
+            this.moreObserver.observe(button);
         }
     }
 
@@ -275,7 +345,7 @@ class EntityTracker {
             
             return `
                 <tr>
-                    <td><strong>${task.task_title}</strong></td>
+                    <td><strong>${task.task_name}</strong></td>
                     <td>${entity ? entity.entity_name : 'Unknown'}</td>
                     <td>${account ? account.account_name : '-'}</td>
                     <td>${task.deadline ? new Date(task.deadline).toLocaleDateString() : '-'}</td>
@@ -332,7 +402,7 @@ class EntityTracker {
             return `
                 <tr>
                     <td><strong>${step.step_name}</strong></td>
-                    <td>${task ? task.task_title : 'Unknown'}</td>
+                    <td>${task ? task.task_name : 'Unknown'}</td>
                     <td>${step.description || '-'}</td>
                     <td><span class="badge status-badge status-${step.status}">${step.status}</span></td>
                     <td>
@@ -374,9 +444,9 @@ class EntityTracker {
         taskEntitySelect.innerHTML = entityOptions;
     }
 
-    updateAccountsDropdown(entityId) {
+    async updateAccountsDropdown(entityId) {
         const taskAccountSelect = document.getElementById('taskAccount');
-        const entityAccounts = this.accounts.filter(account => account.entity_id === entityId);
+        const entityAccounts = entityId ? await this.apiCallAll(`/accounts?entity_id=${entityId}`) : [];
         
         const accountOptions = '<option value="">Select Account (Optional)</option>' + 
             entityAccounts.map(account => `<option value="${account.id}">${account.account_name}</option>`).join('');
@@ -410,7 +480,7 @@ class EntityTracker {
             bootstrap.Modal.getInstance(document.getElementById('entityModal')).hide();
             form.reset();
             document.getElementById('entityId').value = '';
-            this.loadEntities();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to save entity', 'error');
         }
@@ -442,7 +512,7 @@ class EntityTracker {
             bootstrap.Modal.getInstance(document.getElementById('accountModal')).hide();
             form.reset();
             document.getElementById('accountId').value = '';
-            this.loadAccounts();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to save account', 'error');
         }
@@ -452,36 +522,32 @@ class EntityTracker {
         const form = document.getElementById('taskForm');
         const taskId = document.getElementById('taskId').value;
         
-        // Get task steps
-        const steps = [];
-        document.querySelectorAll('.task-step').forEach((stepElement, index) => {
-            const description = stepElement.querySelector('.step-description').value;
-            if (description) {
-                steps.push({
-                    step_order: index + 1,
-                    step_description: description,
-                    completed: false
-                });
+        // Get task steps, in form order
+        const stepNames = [];
+        document.querySelectorAll('.task-step .step-description').forEach(input => {
+            if (input.value.trim()) {
+                stepNames.push(input.value.trim());
             }
         });
 
         const taskData = {
             entity_id: document.getElementById('taskEntity').value,
             account_id: document.getElementById('taskAccount').value || null,
-            task_title: document.getElementById('taskTitle').value,
+            task_name: document.getElementById('taskTitle').value,
             description: document.getElementById('taskDescription').value,
             deadline: document.getElementById('taskDeadline').value || null,
             priority: document.getElementById('taskPriority').value,
-            status: document.getElementById('taskStatus').value,
-            steps: steps
+            status: document.getElementById('taskStatus').value
         };
 
         try {
             if (taskId) {
                 await this.apiCall(`/tasks/${taskId}`, 'PUT', taskData);
+                await this.saveTaskSteps(taskId, stepNames);
                 this.showNotification('Task updated successfully', 'success');
             } else {
-                await this.apiCall('/tasks', 'POST', taskData);
+                const task = await this.apiCall('/tasks', 'POST', taskData);
+                await this.saveTaskSteps(task.id, stepNames);
                 this.showNotification('Task created successfully', 'success');
             }
             
@@ -489,12 +555,35 @@ class EntityTracker {
             form.reset();
             document.getElementById('taskId').value = '';
             this.resetTaskSteps();
-            this.loadTasks();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to save task', 'error');
         }
     }
 
+    // Task steps are their own resource: rename existing steps in place, add new
+    // ones and delete the ones removed from the form
+    async saveTaskSteps(taskId, stepNames) {
+        const existing = await this.loadStepsFor(taskId);
+        for (let i = 0; i < stepNames.length; i++) {
+            if (i < existing.length) {
+                if (existing[i].step_name !== stepNames[i]) {
+                    await this.apiCall(`/task-steps/${existing[i].id}`, 'PUT', { step_name: stepNames[i] });
+                }
+            } else {
+                // One at a time, so creation order is step order
+                await this.apiCall('/task-steps', 'POST', { task_id: taskId, step_name: stepNames[i] });
+            }
+        }
+        for (const step of existing.slice(stepNames.length)) {
+            await this.apiCall(`/task-steps/${step.id}`, 'DELETE');
+        }
+    }
+
+    loadStepsFor(taskId) {
+        return this.apiCallAll(`/task-steps?task_id=${taskId}&sort=created_at`);
+    }
+
     async editEntity(entityId) {
         const entity = this.entities.find(e => e.id === entityId);
         if (!entity) return;
@@ -533,22 +622,23 @@ class EntityTracker {
 
         document.getElementById('taskId').value = task.id;
         document.getElementById('taskEntity').value = task.entity_id;
-        this.updateAccountsDropdown(task.entity_id);
+        await this.updateAccountsDropdown(task.entity_id);
         document.getElementById('taskAccount').value = task.account_id || '';
-        document.getElementById('taskTitle').value = task.task_title;
+        document.getElementById('taskTitle').value = task.task_name;
         document.getElementById('taskDescription').value = task.description || '';
         document.getElementById('taskDeadline').value = task.deadline || '';
-        document.getElementById('taskPriority').value = task.priority;
+        document.getElementById('taskPriority').value = task.priority || 'medium';
         document.getElementById('taskStatus').value = task.status;
 
         // Load task steps
         this.resetTaskSteps();
-        if (task.steps && task.steps.length > 0) {
+        const steps = await this.loadStepsFor(task.id);
+        if (steps.length > 0) {
             const stepsContainer = document.getElementById('taskSteps');
             stepsContainer.innerHTML = '';
             
-            task.steps.forEach(step => {
-                const stepElement = this.createTaskStepElement(step.step_description);
+            steps.forEach(step => {
+                const stepElement = this.createTaskStepElement(step.step_name);
                 stepsContainer.appendChild(stepElement);
             });
         }
@@ -564,7 +654,7 @@ class EntityTracker {
         try {
             await this.apiCall(`/entities/${entityId}`, 'DELETE');
             this.showNotification('Entity deleted successfully', 'success');
-            this.loadEntities();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to delete entity', 'error');
         }
@@ -578,7 +668,7 @@ class EntityTracker {
         try {
             await this.apiCall(`/accounts/${accountId}`, 'DELETE');
             this.showNotification('Account deleted successfully', 'success');
-            this.loadAccounts();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to delete account', 'error');
         }
@@ -590,9 +680,11 @@ class EntityTracker {
         }
 
         try {
+            // Steps reference the task, so they go first
+            await this.saveTaskSteps(taskId, []);
             await this.apiCall(`/tasks/${taskId}`, 'DELETE');
             this.showNotification('Task deleted successfully', 'success');
-            this.loadTasks();
+            this.loadData();
         } catch (error) {
             this.showNotification('Failed to delete task', 'error');
         }
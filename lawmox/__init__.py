@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the Lawmox Entity Tracker backends
+"""
@@ -0,0 +1,639 @@
+"""
+The Lawmox Entity Tracker API
+
+One application for every deployment; backend/, backend-docker/ and
+backend-render/ only set defaults and import ``app`` from here. All storage
+goes through a Repository (lawmox.repository), chosen by configuration:
+
+    STORAGE         postgres | database_url | supabase | memory
+    FRONTEND_DIR    serve this directory's index.html at / and its files under /static
+    SERVICE_NAME    reported by /health
+    ENCRYPTION_KEY  Fernet key for account passwords (a random one if unset)
+    WARMUP_TIMEOUT  seconds startup waits for the storage before serving (0 skips)
+"""
+
+import os
+import time
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+from cryptography.fernet import Fernet
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from .bulk import UnsupportedFormat, detect_format, parse_rows, validate_rows
+from .cache import ResponseCache
+from .changes import CHANGE_FEED_MAX_PAGE_SIZE, CHANGE_FEED_PAGE_SIZE, ChangeFeedExpired
+from .crypto import BatchEncryptor
+from .dashboard import DASHBOARD_MAX_PAGE_SIZE, DASHBOARD_PAGE_SIZE
+from .etag import check_etag, collection_etag, content_etag, row_etag
+from .events import sse_stream
+from .export import EXPORT_MEDIA_TYPES, ExportResponse
+from .filters import DateRange, fields_param, sort_param
+from .metrics import CRYPTO_SECONDS, MetricsMiddleware, metrics_response, register_stats
+from .negotiate import VARY, negotiate
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, Page, paginate
+from .pool import PoolTimeout
+from .queries import QueryAccountingMiddleware
+from .readiness import DatabaseUnavailable
+from .repository import StorageError, Unsupported, public_columns, repository_from_env
+from .schema import CHANGE_FEED_TABLES
+from .serialize import InvalidFields, Timestamp, model_fields, paginate_tuples, parse_fields
+
+SERVICE_NAME = os.getenv("SERVICE_NAME", "Lawmox Entity Tracker API")
+FRONTEND_DIR = os.getenv("FRONTEND_DIR")
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 30))
+
+app = FastAPI(title="Lawmox Entity Tracker API", version="1.0.0")
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, specify your frontend URL
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Counts statements per request; X-DB-Queries / X-DB-Time-Ms headers with QUERY_DEBUG
+app.add_middleware(QueryAccountingMiddleware)
+# Outermost, so latency and status cover everything below it
+app.add_middleware(MetricsMiddleware)
+
+# Storage engine (STORAGE); Postgres engines size their pool via DB_POOL_*
+repository = repository_from_env()
+
+# Encryption for passwords
+encryption_key = os.getenv("ENCRYPTION_KEY")
+if not encryption_key:
+    # Generate a key if not provided
+    encryption_key = Fernet.generate_key().decode()
+cipher_suite = Fernet(encryption_key.encode())
+encryptor = BatchEncryptor(encryption_key.encode())
+
+# Read-through cache for list/detail responses (CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_URL)
+cache = ResponseCache.from_env()
+
+# Pydantic models
+class EntityBase(BaseModel):
+    entity_name: str
+    ein: Optional[str] = None
+    date_of_formation: Optional[date] = None
+    registered_address: Optional[str] = None
+    state_of_formation: Optional[str] = None
+    entity_type: Optional[str] = None
+    status: str = "active"
+
+class EntityCreate(EntityBase):
+    pass
+
+class EntityUpdate(BaseModel):
+    entity_name: Optional[str] = None
+    ein: Optional[str] = None
+    date_of_formation: Optional[date] = None
+    registered_address: Optional[str] = None
+    state_of_formation: Optional[str] = None
+    entity_type: Optional[str] = None
+    status: Optional[str] = None
+
+class EntityResponse(EntityBase):
+    id: str
+    created_at: Timestamp
+    updated_at: Timestamp
+
+class AccountBase(BaseModel):
+    account_name: str
+    username: str
+    password: str
+    entity_id: Optional[str] = None
+    login_url: Optional[str] = None
+    account_type: Optional[str] = None
+    notes: Optional[str] = None
+
+class AccountCreate(AccountBase):
+    pass
+
+class AccountUpdate(BaseModel):
+    account_name: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    entity_id: Optional[str] = None
+    login_url: Optional[str] = None
+    account_type: Optional[str] = None
+    notes: Optional[str] = None
+
+class AccountResponse(BaseModel):
+    id: str
+    account_name: str
+    username: str
+    entity_id: Optional[str]
+    login_url: Optional[str] = None
+    account_type: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Timestamp
+    updated_at: Timestamp
+
+class TaskBase(BaseModel):
+    task_name: str
+    description: Optional[str] = None
+    status: str = "pending"
+    entity_id: Optional[str] = None
+    account_id: Optional[str] = None
+    deadline: Optional[date] = None
+    priority: str = "medium"
+
+class TaskCreate(TaskBase):
+    pass
+
+class TaskUpdate(BaseModel):
+    task_name: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    entity_id: Optional[str] = None
+    account_id: Optional[str] = None
+    deadline: Optional[date] = None
+    priority: Optional[str] = None
+
+class TaskResponse(TaskBase):
+    id: str
+    created_at: Timestamp
+    updated_at: Timestamp
+
+class TaskStepBase(BaseModel):
+    step_name: str
+    description: Optional[str] = None
+    status: str = "pending"
+    task_id: str
+
+class TaskStepCreate(TaskStepBase):
+    pass
+
+class TaskStepUpdate(BaseModel):
+    step_name: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    task_id: Optional[str] = None
+
+class TaskStepResponse(TaskStepBase):
+    id: str
+    created_at: Timestamp
+    updated_at: Timestamp
+
+class TaskWithSteps(TaskResponse):
+    steps: List[TaskStepResponse] = []
+
+class EntityFull(EntityResponse):
+    accounts: List[AccountResponse] = []
+    tasks: List[TaskWithSteps] = []
+
+# Serve the frontend when FRONTEND_DIR is set (single-container deployments)
+if FRONTEND_DIR:
+    from fastapi.responses import HTMLResponse
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.templating import Jinja2Templates
+
+    app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
+    templates = Jinja2Templates(directory=FRONTEND_DIR)
+
+    @app.get("/", response_class=HTMLResponse, include_in_schema=False)
+    async def read_root(request: Request):
+        return templates.TemplateResponse("index.html", {"request": request})
+
+# Health check endpoint
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "service": SERVICE_NAME, "storage": repository.name, **repository.stats(), "cache": cache.stats()}
+
+# Prometheus metrics: request, database and crypto timings plus pool/cache/listener stats
+register_stats("lawmox_db_pool", lambda: repository.stats().get("pool", {}))
+register_stats("lawmox_cache", cache.stats)
+register_stats("lawmox_events", repository.broker.stats)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+# Readiness check endpoint: 503 with Retry-After while the database is down
+@app.get("/ready")
+async def ready_check():
+    if not repository.ready:
+        return JSONResponse(status_code=503, content=repository.status(), headers={"Retry-After": str(repository.retry_after)})
+    return repository.status()
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(InvalidFields)
+async def invalid_fields_handler(request: Request, exc: InvalidFields):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(StorageError)
+async def storage_error_handler(request: Request, exc: StorageError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(Unsupported)
+async def unsupported_handler(request: Request, exc: Unsupported):
+    return JSONResponse(status_code=501, content={"detail": str(exc)})
+
+@app.exception_handler(ChangeFeedExpired)
+async def change_feed_expired_handler(request: Request, exc: ChangeFeedExpired):
+    return JSONResponse(status_code=410, content={"detail": str(exc)})
+
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailable):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+if repository.name == "supabase":
+    from .supabase_rest import SupabaseError
+
+    @app.exception_handler(SupabaseError)
+    async def supabase_error_handler(request: Request, exc: SupabaseError):
+        status_code = exc.status_code if exc.status_code < 500 else 502
+        return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+# Postgres engines wait for the database in the background; the warm-up
+# runs before uvicorn accepts connections, so a new worker never serves cold
+@app.on_event("startup")
+async def startup_event():
+    print(f"Starting {SERVICE_NAME} ({repository.name} storage)")
+    repository.start()
+    if WARMUP_TIMEOUT > 0:
+        await repository.warm_up(WARMUP_TIMEOUT)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await repository.close()
+    encryptor.close()
+    await cache.close()
+
+# Shared by the resource endpoints below
+async def list_rows(table, model, request, response, limit, cursor, sort, fields, equals, dates):
+    representation = negotiate(request)
+    key, cached = await cache.lookup(request, table, representation=representation)
+    if cached is not None:
+        return cached
+    fields = parse_fields(model, fields)
+    etag = None
+    version = await repository.version(table, equals, dates)
+    if version is not None:
+        etag = representation.etag(collection_etag(table, version, request.url.query))
+        not_modified = check_etag(request, response, etag, VARY)
+        if not_modified:
+            return not_modified
+    # Fast path: only the requested columns as tuples, encoded once without re-validation
+    columns, rows = await repository.page(table, fields, cursor, limit, sort, equals, dates)
+    rows, next_cursor = paginate_tuples(columns, rows, limit, sort)
+    body = representation.encode_page(columns, rows, next_cursor, fields)
+    if etag is None:
+        # No cheap version for this storage; tag the page by its content
+        etag = representation.etag(content_etag(body))
+        not_modified = check_etag(request, response, etag, VARY)
+        if not_modified:
+            return not_modified
+    return await cache.store(key, body, etag, representation)
+
+def row_key(row_id, label):
+    """``row_id`` as a canonical UUID; anything else names no row, on every engine"""
+    try:
+        return str(UUID(row_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+
+async def read_row(table, model, row_id, request, response, fields, label):
+    row_id = row_key(row_id, label)
+    key, cached = await cache.lookup(request, table, row_id)
+    if cached is not None:
+        return cached
+    fields = parse_fields(model, fields)
+    # updated_at is always read for the ETag
+    row = await repository.get(table, row_id, fields + [name for name in ("id", "updated_at") if name not in fields])
+    if not row:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    etag = row_etag(table, row, request.url.query)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return await cache.store(key, {name: row[name] for name in fields}, etag)
+
+async def create_row(table, model, values):
+    result = await repository.insert(table, values, model_fields(model))
+    await cache.invalidate(table)
+    return model(**result)
+
+async def update_row(table, model, row_id, values, label):
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    row_id = row_key(row_id, label)
+    result = await repository.update(table, row_id, values, model_fields(model))
+    if not result:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    await cache.invalidate(table, row_id)
+    return model(**result)
+
+async def delete_row(table, row_id, label):
+    row_id = row_key(row_id, label)
+    if not await repository.delete(table, row_id):
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    await cache.invalidate(table, row_id)
+    return {"message": f"{label} deleted successfully"}
+
+# Entity endpoints
+@app.get("/entities", response_model=Page[EntityResponse])
+async def get_entities(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = sort_param("entities"),
+    fields: Optional[str] = fields_param(EntityResponse),
+    status: Optional[str] = None,
+    state_of_formation: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    dates: DateRange = Depends(),
+):
+    equals = {"status": status, "state_of_formation": state_of_formation, "entity_type": entity_type}
+    return await list_rows("entities", EntityResponse, request, response, limit, cursor, sort, fields, equals, dates)
+
+@app.post("/entities", response_model=EntityResponse)
+async def create_entity(entity: EntityCreate):
+    return await create_row("entities", EntityResponse, entity.model_dump())
+
+# Bulk import: CSV or NDJSON rows are validated, then upserted on ein in one
+# statement (Postgres stages them with COPY)
+ENTITY_IMPORT_COLUMNS = ("entity_name", "ein", "date_of_formation", "registered_address", "state_of_formation", "entity_type", "status")
+ENTITY_IMPORT_TYPES = {
+    "entity_name": "VARCHAR(255)", "ein": "VARCHAR(20)", "date_of_formation": "DATE", "registered_address": "TEXT",
+    "state_of_formation": "VARCHAR(100)", "entity_type": "VARCHAR(100)", "status": "VARCHAR(50)",
+}
+ENTITY_MAX_LENGTHS = {"entity_name": 255, "ein": 20, "state_of_formation": 100, "entity_type": 100, "status": 50}
+
+@app.post("/entities/bulk")
+async def bulk_import_entities(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    body = await request.body()
+
+    # Parsing and validation are CPU work; keep them off the event loop
+    valid, errors = await run_in_threadpool(
+        lambda: validate_rows(parse_rows(body, fmt), EntityCreate, ENTITY_IMPORT_COLUMNS, ENTITY_MAX_LENGTHS, unique_column="ein")
+    )
+    inserted = updated = 0
+    if valid:
+        inserted, updated = await repository.bulk_upsert("entities", ENTITY_IMPORT_COLUMNS, ENTITY_IMPORT_TYPES, valid, "ein")
+    if inserted or updated:
+        await cache.invalidate("entities", bulk=True)
+    return {
+        "received": len(valid) + len(errors),
+        "inserted": inserted,
+        "updated": updated,
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+@app.get("/entities/{entity_id}", response_model=EntityResponse)
+async def get_entity(entity_id: str, request: Request, response: Response, fields: Optional[str] = fields_param(EntityResponse)):
+    return await read_row("entities", EntityResponse, entity_id, request, response, fields, "Entity")
+
+@app.put("/entities/{entity_id}", response_model=EntityResponse)
+async def update_entity(entity_id: str, entity: EntityUpdate):
+    return await update_row("entities", EntityResponse, entity_id, entity.model_dump(exclude_unset=True), "Entity")
+
+@app.delete("/entities/{entity_id}")
+async def delete_entity(entity_id: str):
+    result = await delete_row("entities", entity_id, "Entity")
+    # Where the schema cascades (ON DELETE CASCADE), the entity's accounts, tasks
+    # and steps went with it, and tasks lost the deleted accounts (SET NULL)
+    for table in ("accounts", "tasks", "task_steps"):
+        await cache.invalidate(table, bulk=True)
+    return result
+
+# Entity dashboard: accounts, tasks and steps nested in a constant number of
+# storage calls (Postgres: one json_agg query) however many children there are
+@app.get("/entities/{entity_id}/full", response_model=EntityFull)
+async def get_entity_full(entity_id: UUID):
+    entity = await repository.entity_full(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return entity
+
+@app.get("/dashboard", response_model=Page[EntityFull])
+async def get_dashboard(
+    limit: int = Query(DASHBOARD_PAGE_SIZE, ge=1, le=DASHBOARD_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = sort_param("entities"),
+    status: Optional[str] = None,
+    state_of_formation: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    dates: DateRange = Depends(),
+):
+    equals = {"status": status, "state_of_formation": state_of_formation, "entity_type": entity_type}
+    entities, next_cursor = paginate(await repository.dashboard(cursor, limit, sort, equals, dates), limit, sort)
+    return Page(items=entities, next_cursor=next_cursor)
+
+# Account endpoints
+@app.get("/accounts", response_model=Page[AccountResponse])
+async def get_accounts(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = sort_param("accounts"),
+    fields: Optional[str] = fields_param(AccountResponse),
+    entity_id: Optional[UUID] = None,
+    dates: DateRange = Depends(),
+):
+    return await list_rows("accounts", AccountResponse, request, response, limit, cursor, sort, fields, {"entity_id": entity_id}, dates)
+
+def encrypt_password(password):
+    with CRYPTO_SECONDS.time("encrypt"):
+        return cipher_suite.encrypt(password.encode()).decode()
+
+@app.post("/accounts", response_model=AccountResponse)
+async def create_account(account: AccountCreate):
+    values = account.model_dump()
+    values["encrypted_password"] = encrypt_password(values.pop("password"))
+    return await create_row("accounts", AccountResponse, values)
+
+# Bulk account creation: passwords are encrypted in a worker pool, rows inserted in one transaction
+ACCOUNT_IMPORT_COLUMNS = ("account_name", "username", "password", "entity_id")
+ACCOUNT_INSERT_COLUMNS = ("account_name", "username", "encrypted_password", "entity_id")
+ACCOUNT_MAX_LENGTHS = {"account_name": 255, "username": 100}
+
+@app.post("/accounts/bulk")
+async def bulk_create_accounts(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    body = await request.body()
+    started = time.perf_counter()
+
+    valid, errors = await run_in_threadpool(
+        lambda: validate_rows(
+            parse_rows(body, fmt), AccountCreate, ACCOUNT_IMPORT_COLUMNS, ACCOUNT_MAX_LENGTHS,
+            unique_column="username", uuid_columns=("entity_id",),
+        )
+    )
+    received = len(valid) + len(errors)
+    with CRYPTO_SECONDS.time("encrypt_batch"):
+        encrypted = await encryptor.encrypt_all([row[3] for row in valid])
+    rows = [(row[0], row[1], row[2], token, row[4]) for row, token in zip(valid, encrypted)]
+
+    created = []
+    if rows:
+        created, rejected = await repository.bulk_insert(
+            "accounts", ACCOUNT_INSERT_COLUMNS, rows, "username", model_fields(AccountResponse),
+            references=("entity_id", "entities"),
+        )
+        errors = sorted(errors + rejected, key=lambda error: error["row"])
+    elapsed = time.perf_counter() - started
+    if created:
+        await cache.invalidate("accounts")
+    return {
+        "received": received,
+        "created": len(created),
+        "failed": len(errors),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(len(created) / elapsed, 1) if elapsed else None,
+    }
+
+@app.get("/accounts/{account_id}", response_model=AccountResponse)
+async def get_account(account_id: str, request: Request, response: Response, fields: Optional[str] = fields_param(AccountResponse)):
+    return await read_row("accounts", AccountResponse, account_id, request, response, fields, "Account")
+
+@app.put("/accounts/{account_id}", response_model=AccountResponse)
+async def update_account(account_id: str, account: AccountUpdate):
+    values = account.model_dump(exclude_unset=True)
+    password = values.pop("password", None)
+    if password is not None:
+        values["encrypted_password"] = encrypt_password(password)
+    return await update_row("accounts", AccountResponse, account_id, values, "Account")
+
+@app.delete("/accounts/{account_id}")
+async def delete_account(account_id: str):
+    result = await delete_row("accounts", account_id, "Account")
+    # Tasks that pointed at the account now have account_id NULL (ON DELETE SET NULL)
+    await cache.invalidate("tasks", bulk=True)
+    return result
+
+# Task endpoints
+@app.get("/tasks", response_model=Page[TaskResponse])
+async def get_tasks(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = sort_param("tasks"),
+    fields: Optional[str] = fields_param(TaskResponse),
+    entity_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    dates: DateRange = Depends(),
+):
+    equals = {"entity_id": entity_id, "status": status}
+    return await list_rows("tasks", TaskResponse, request, response, limit, cursor, sort, fields, equals, dates)
+
+@app.post("/tasks", response_model=TaskResponse)
+async def create_task(task: TaskCreate):
+    return await create_row("tasks", TaskResponse, task.model_dump())
+
+@app.get("/tasks/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: str, request: Request, response: Response, fields: Optional[str] = fields_param(TaskResponse)):
+    return await read_row("tasks", TaskResponse, task_id, request, response, fields, "Task")
+
+@app.put("/tasks/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: str, task: TaskUpdate):
+    return await update_row("tasks", TaskResponse, task_id, task.model_dump(exclude_unset=True), "Task")
+
+@app.delete("/tasks/{task_id}")
+async def delete_task(task_id: str):
+    result = await delete_row("tasks", task_id, "Task")
+    # Its steps, where the schema cascades (ON DELETE CASCADE)
+    await cache.invalidate("task_steps", bulk=True)
+    return result
+
+# Task step endpoints
+@app.get("/task-steps", response_model=Page[TaskStepResponse])
+async def get_task_steps(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = sort_param("task_steps"),
+    fields: Optional[str] = fields_param(TaskStepResponse),
+    task_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    dates: DateRange = Depends(),
+):
+    equals = {"task_id": task_id, "status": status}
+    return await list_rows("task_steps", TaskStepResponse, request, response, limit, cursor, sort, fields, equals, dates)
+
+@app.post("/task-steps", response_model=TaskStepResponse)
+async def create_task_step(step: TaskStepCreate):
+    return await create_row("task_steps", TaskStepResponse, step.model_dump())
+
+@app.get("/task-steps/{step_id}", response_model=TaskStepResponse)
+async def get_task_step(step_id: str, request: Request, response: Response, fields: Optional[str] = fields_param(TaskStepResponse)):
+    return await read_row("task_steps", TaskStepResponse, step_id, request, response, fields, "Task step")
+
+@app.put("/task-steps/{step_id}", response_model=TaskStepResponse)
+async def update_task_step(step_id: str, step: TaskStepUpdate):
+    return await update_row("task_steps", TaskStepResponse, step_id, step.model_dump(exclude_unset=True), "Task step")
+
+@app.delete("/task-steps/{step_id}")
+async def delete_task_step(step_id: str):
+    return await delete_row("task_steps", step_id, "Task step")
+
+# Change feed: rows upserted and deleted since a watermark, oldest first; pass the
+# returned watermark back as ?since= until has_more is false (Postgres storage only)
+@app.get("/changes")
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(CHANGE_FEED_PAGE_SIZE, ge=1, le=CHANGE_FEED_MAX_PAGE_SIZE),
+):
+    return await repository.changes(CHANGE_FEED_TABLES, since, limit)
+
+# Live change events over Server-Sent Events: ?topics=entities,accounts limits
+# the stream to those tables
+EVENT_TOPICS = CHANGE_FEED_TABLES
+
+@app.get("/events")
+async def stream_events(request: Request, topics: Optional[str] = None):
+    wanted = set(topics.split(",")) if topics else set(EVENT_TOPICS)
+    unknown = wanted - set(EVENT_TOPICS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+    return StreamingResponse(
+        sse_stream(repository.broker, request, wanted),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Export endpoints: stream whole tables as CSV or NDJSON in batches
+EXPORT_TABLES = {"entities": "entities", "accounts": "accounts", "tasks": "tasks", "task-steps": "task_steps"}
+
+@app.get("/export/{resource}")
+async def export_resource(
+    resource: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    dates: DateRange = Depends(),
+):
+    if resource not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    table = EXPORT_TABLES[resource]
+    return ExportResponse(
+        await repository.export(table, public_columns(table), format, dates),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'},
+    )
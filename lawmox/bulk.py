@@ -0,0 +1,224 @@
+"""
+Bulk import through COPY
+
+Uploads are parsed and validated row by row, the valid rows are COPYed into
+a temporary staging table, and a single INSERT ... ON CONFLICT moves them
+into the target table. Rows that fail validation are reported back by row
+number instead of failing the whole upload.
+"""
+
+import csv
+import io
+import json
+import uuid
+
+from psycopg2.extras import execute_values
+from pydantic import ValidationError
+
+
+class UnsupportedFormat(ValueError):
+    """The upload is neither CSV nor NDJSON"""
+
+
+def detect_format(content_type, requested=None):
+    if requested:
+        return requested
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json-seq" in content_type:
+        return "ndjson"
+    raise UnsupportedFormat("Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+
+
+def parse_rows(body, fmt):
+    """Yield (row number, dict or error message) for each data row"""
+    text = body.decode("utf-8-sig") if isinstance(body, bytes) else body
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for row_no, row in enumerate(reader, start=1):
+            # Empty cells mean "not given" so model defaults apply
+            yield row_no, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+    row_no = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_no, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield row_no, "each line must be a JSON object"
+            continue
+        yield row_no, row
+
+
+def _describe(error):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def validate_rows(rows, model, columns, max_lengths=None, unique_column=None, uuid_columns=()):
+    """Validate parsed rows against ``model``.
+
+    Returns (valid, errors): ``valid`` is a list of tuples (row number first,
+    then ``columns`` in order) and ``errors`` a list of {"row", "error"} dicts.
+    """
+    max_lengths = max_lengths or {}
+    valid = []
+    errors = []
+    first_seen = {}
+    for row_no, row in rows:
+        if isinstance(row, str):
+            errors.append({"row": row_no, "error": row})
+            continue
+        try:
+            item = model(**row)
+        except ValidationError as e:
+            errors.append({"row": row_no, "error": _describe(e)})
+            continue
+        values = tuple(getattr(item, column) for column in columns)
+        too_long = [
+            f"{column}: at most {max_lengths[column]} characters"
+            for column, value in zip(columns, values)
+            if column in max_lengths and value is not None and len(value) > max_lengths[column]
+        ]
+        not_uuid = [
+            f"{column}: not a valid UUID"
+            for column, value in zip(columns, values)
+            if column in uuid_columns and value is not None and not _is_uuid(value)
+        ]
+        if too_long or not_uuid:
+            errors.append({"row": row_no, "error": "; ".join(too_long + not_uuid)})
+            continue
+        if unique_column is not None:
+            key = getattr(item, unique_column)
+            if key is not None:
+                if key in first_seen:
+                    errors.append({
+                        "row": row_no,
+                        "error": f"{unique_column}: duplicate of row {first_seen[key]} in this upload",
+                    })
+                    continue
+                first_seen[key] = row_no
+        valid.append((row_no,) + values)
+    return valid, errors
+
+
+def copy_rows(cur, table, columns, rows):
+    """COPY ``rows`` (tuples matching ``columns``) into ``table``"""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def stage_rows(cur, table, columns, column_types, rows):
+    """COPY validate_rows() output into a temporary table; returns its name"""
+    staging = f"{table}_staging"
+    cur.execute(
+        f"CREATE TEMP TABLE {staging} (row_no integer, "
+        + ", ".join(f"{column} {column_types[column]}" for column in columns)
+        + ") ON COMMIT DROP"
+    )
+    copy_rows(cur, staging, ("row_no",) + tuple(columns), rows)
+    return staging
+
+
+def upsert_query(table, staging, columns, conflict_column):
+    """Upsert of the staged rows; counts the rows inserted and updated"""
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != conflict_column)
+    return f"""
+        WITH upserted AS (
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM {staging} ORDER BY row_no
+            ON CONFLICT ({conflict_column}) DO UPDATE SET {updates}, updated_at = NOW()
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) FILTER (WHERE NOT inserted) AS updated
+        FROM upserted
+    """
+
+
+def bulk_upsert(conn, table, columns, column_types, rows, conflict_column):
+    """Stage ``rows`` via COPY and upsert them into ``table`` on ``conflict_column``.
+
+    ``rows`` come from validate_rows(). Returns (inserted, updated). The
+    caller commits.
+    """
+    with conn.cursor() as cur:
+        staging = stage_rows(cur, table, columns, column_types, rows)
+        cur.execute(upsert_query(table, staging, columns, conflict_column))
+        result = cur.fetchone()
+    if isinstance(result, dict):
+        return result["inserted"], result["updated"]
+    return result[0], result[1]
+
+
+def references_query(table):
+    """The ids of ``table`` among one uuid[] parameter"""
+    return f"SELECT id::text AS id FROM {table} WHERE id = ANY(%s::uuid[])"
+
+
+def check_references(conn, rows, columns, column, table):
+    """Drop rows whose ``column`` points at a missing ``table`` row.
+
+    Returns (rows, errors) so one bad reference doesn't abort the batch.
+    """
+    index = columns.index(column) + 1
+    wanted = list({row[index] for row in rows if row[index] is not None})
+    if not wanted:
+        return rows, []
+    with conn.cursor() as cur:
+        cur.execute(references_query(table), (wanted,))
+        found = {row["id"] for row in cur.fetchall()}
+    kept, errors = [], []
+    for row in rows:
+        value = row[index]
+        if value is not None and str(uuid.UUID(str(value))) not in found:
+            errors.append({"row": row[0], "error": f"{column}: no {table} row with id {value}"})
+        else:
+            kept.append(row)
+    return kept, errors
+
+
+def insert_query(table, columns, conflict_column, returning):
+    """Multi-row INSERT for execute_values(), skipping ``conflict_column`` clashes"""
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+            f"ON CONFLICT ({conflict_column}) DO NOTHING RETURNING {returning}")
+
+
+def bulk_insert(conn, table, columns, rows, conflict_column, returning):
+    """Multi-row INSERT of ``rows`` (row number first) skipping ``conflict_column`` clashes.
+
+    ``returning`` must include ``conflict_column``. Returns (inserted rows,
+    errors for rows that already existed). The caller commits.
+    """
+    with conn.cursor() as cur:
+        inserted = execute_values(
+            cur,
+            insert_query(table, columns, conflict_column, returning),
+            [row[1:] for row in rows],
+            page_size=1000,
+            fetch=True,
+        )
+    key = columns.index(conflict_column) + 1
+    created = {row[conflict_column] for row in inserted}
+    errors = [
+        {"row": row[0], "error": f"{conflict_column}: {row[key]} already exists"}
+        for row in rows
+        if row[key] not in created
+    ]
+    return inserted, errors
@@ -0,0 +1,213 @@
+"""
+Read-through response cache for the list and detail endpoints
+
+Cached entries are the encoded JSON body plus its ETag, so a hit skips
+Postgres and Pydantic entirely (and a matching If-None-Match is a 304 with
+no database work at all).
+
+Invalidation is precise without scanning keys: list keys embed a per-table
+generation number that every write to the table bumps, and detail keys embed
+a per-row generation bumped by writes to that row. Bulk writes, which touch
+an unknown set of rows, bump a per-table detail generation instead. Keys are
+computed before the database read, so a read racing a write can only ever
+store under a generation that is already dead.
+
+The default backend is an in-process LRU with a TTL. Set CACHE_URL to a
+redis:// URL to share one cache (and its invalidations) between workers;
+any Redis-protocol server works as a local stand-in.
+"""
+
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from .etag import ETAG_CACHE_CONTROL, etag_matches
+from .negotiate import VARY
+from .serialize import dumps
+
+
+class MemoryCache:
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._generations = {}
+        self._expiring = OrderedDict()  # generation name -> expires_at, soonest first
+        self._counters = {"evictions": 0, "expirations": 0}
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    async def generations(self, *names):
+        self._prune_generations()
+        return [self._generations.get(name, 0) for name in names]
+
+    async def bump(self, name, expire=None):
+        self._prune_generations()
+        self._generations[name] = self._generations.get(name, 0) + 1
+        self._expiring.pop(name, None)
+        if expire:
+            # Callers pass one expire per cache, so appending keeps _expiring in expiry order
+            self._expiring[name] = time.monotonic() + expire
+
+    def _prune_generations(self):
+        # Like RedisCache's expiring keys: a row generation resets to 0 once every
+        # entry written under it has expired, so one per invalidated row doesn't pile up
+        now = time.monotonic()
+        while self._expiring:
+            name, expires_at = next(iter(self._expiring.items()))
+            if expires_at > now:
+                break
+            del self._expiring[name]
+            del self._generations[name]
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"backend": "memory", "entries": len(self._entries), "max_entries": self.max_entries,
+                "generations": len(self._generations), **self._counters}
+
+
+class RedisCache:
+    """Shared cache on a Redis-protocol server; eviction is left to the server's maxmemory policy"""
+
+    def __init__(self, url, prefix="lawmox:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL points at Redis but the 'redis' package is not installed")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key):
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def generations(self, *names):
+        values = await self.client.mget([f"{self.prefix}gen:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, name, expire=None):
+        key = f"{self.prefix}gen:{name}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            if expire:
+                # Entries written under older generations expire well before this resets
+                pipe.expire(key, int(expire))
+            await pipe.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self):
+        return {"backend": "redis"}
+
+
+def _response(body, headers, representation):
+    if representation is None:
+        return Response(content=body, media_type="application/json", headers=headers)
+    return Response(content=body, media_type=representation.media_type, headers={**headers, **representation.headers()})
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl=30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls):
+        """CACHE_TTL seconds (0 disables), CACHE_MAX_ENTRIES, optional CACHE_URL"""
+        url = os.getenv("CACHE_URL")
+        backend = RedisCache(url) if url else MemoryCache(int(os.getenv("CACHE_MAX_ENTRIES", 1024)))
+        return cls(backend, ttl=float(os.getenv("CACHE_TTL", 30)))
+
+    async def _key(self, request, table, row_id, representation):
+        if row_id is None:
+            generation, = await self.backend.generations(f"{table}:list")
+            return f"{table}:list:{generation}:{representation.tag if representation else ''}:{request.url.query}"
+        row_id = str(row_id).lower()
+        table_generation, row_generation = await self.backend.generations(f"{table}:item", f"{table}:item:{row_id}")
+        return f"{table}:item:{table_generation}.{row_generation}:{row_id}:{request.url.query}"
+
+    async def lookup(self, request, table, row_id=None, representation=None):
+        """Return (key, response); response is None on a miss and key is passed to store()"""
+        if self.ttl <= 0:
+            return None, None
+        try:
+            key = await self._key(request, table, row_id, representation)
+            value = await self.backend.get(key)
+        except Exception as e:
+            # A cache outage degrades to plain database reads
+            self._counters["errors"] += 1
+            print(f"Cache lookup failed: {e}")
+            return None, None
+        if value is None:
+            self._counters["misses"] += 1
+            return key, None
+        self._counters["hits"] += 1
+        etag, body = value.split(b"\n", 1)
+        etag = etag.decode()
+        headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL, "X-Cache": "HIT"}
+        if representation is not None:
+            headers["Vary"] = VARY
+        if etag_matches(request, etag):
+            return key, Response(status_code=304, headers=headers)
+        return key, _response(body, headers, representation)
+
+    async def store(self, key, data, etag, representation=None):
+        """Cache ``data`` (already encoded bytes, or anything jsonable) under ``key`` and return the response"""
+        body = data if isinstance(data, bytes) else dumps(jsonable_encoder(data))
+        headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL, "X-Cache": "MISS"}
+        if key is not None:
+            try:
+                await self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+                self._counters["stores"] += 1
+            except Exception as e:
+                self._counters["errors"] += 1
+                print(f"Cache store failed: {e}")
+        return _response(body, headers, representation)
+
+    async def invalidate(self, table, row_id=None, bulk=False):
+        """Drop cached pages of ``table`` and the cached row ``row_id`` (or every row if ``bulk``)"""
+        if self.ttl <= 0:
+            return
+        self._counters["invalidations"] += 1
+        try:
+            await self.backend.bump(f"{table}:list")
+            if bulk:
+                await self.backend.bump(f"{table}:item")
+            elif row_id is not None:
+                await self.backend.bump(f"{table}:item:{str(row_id).lower()}", expire=2 * self.ttl + 1)
+        except Exception as e:
+            self._counters["errors"] += 1
+            print(f"Cache invalidation failed: {e}")
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self):
+        return {"ttl": self.ttl, **self._counters, **self.backend.stats()}
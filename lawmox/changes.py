@@ -0,0 +1,161 @@
+"""
+Incremental change feed
+
+Upserts are read from each table's (changed_xid, id) index and deletes from
+the tombstones table, merged in (xid, id) order, where xid is the id of the
+transaction that made the change. The watermark is an opaque (xid, id) key,
+so a client that pages through the feed sees every change exactly once and a
+sync costs O(churn) rather than O(table).
+
+Timestamps can't order the feed: updated_at is a transaction's start time,
+and a slow transaction (a bulk upsert) commits rows stamped before changes
+that were already delivered. Instead each call only returns transactions
+below the oldest one still running (pg_snapshot_xmin), which have all
+finished, so nothing can later appear behind the watermark. A long-running
+transaction anywhere on the server holds the feed back until it ends.
+"""
+
+
+import base64
+import json
+import os
+from datetime import datetime
+from uuid import UUID
+
+from .pagination import InvalidCursor
+
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", 30))
+CHANGE_FEED_PAGE_SIZE = 1000
+CHANGE_FEED_MAX_PAGE_SIZE = 10000
+
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+# Below every recorded transaction (rows older than the feed have xid 1)
+FIRST_XID = "0"
+
+# Row payload per table; passwords and bookkeeping never leave the database
+ROW_JSON = {
+    "accounts": "to_jsonb(t) - 'encrypted_password' - 'changed_xid'",
+}
+
+
+class ChangeFeedExpired(Exception):
+    """The watermark is older than the retained tombstones; the client must resync"""
+
+
+def encode_watermark(xid, row_id, issued_at):
+    if isinstance(issued_at, datetime):
+        issued_at = issued_at.isoformat()
+    key = [str(xid), str(row_id), issued_at]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+
+
+def parse_since(since):
+    """Watermark token or ISO timestamp -> (xid, id, timestamp).
+
+    xid is None for a point in time (an ISO timestamp, or a watermark from
+    before the feed was ordered by transaction); timestamp is None for the
+    beginning and is what expiry is checked against.
+    """
+    if not since:
+        return FIRST_XID, MIN_UUID, None
+    try:
+        return None, MIN_UUID, _timestamp(since)
+    except ValueError:
+        pass
+    try:
+        padded = since + "=" * (-len(since) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(key) == 2:
+            return None, MIN_UUID, _timestamp(key[0])
+        xid, row_id, issued_at = key
+        return str(int(xid)), str(UUID(row_id)), _timestamp(issued_at)
+    except Exception:
+        raise InvalidCursor("since must be a watermark from /changes or an ISO timestamp")
+
+
+def start_query(tables):
+    """Oldest transaction that changed anything at or after %(since)s"""
+    branches = [
+        f"(SELECT changed_xid AS xid FROM {table} WHERE updated_at >= %(since)s ORDER BY changed_xid LIMIT 1)"
+        for table in tables
+    ]
+    branches.append(
+        "(SELECT xid FROM tombstones WHERE deleted_at >= %(since)s AND table_name = ANY(%(tables)s) ORDER BY xid LIMIT 1)"
+    )
+    return f"SELECT min(xid::text::numeric)::text AS xid FROM ({' UNION ALL '.join(branches)}) starts"
+
+
+def changes_query(tables):
+    branches = [
+        f"""(SELECT '{table}' AS table_name, 'upsert' AS op, id, changed_xid AS xid, updated_at AS changed_at,
+                    {ROW_JSON.get(table, "to_jsonb(t) - 'changed_xid'")} AS row
+             FROM {table} t
+             WHERE (changed_xid, id) > (%(since_xid)s::xid8, %(since_id)s::uuid) AND changed_xid < %(upper)s::xid8
+             ORDER BY changed_xid, id LIMIT %(fetch)s)"""
+        for table in tables
+    ]
+    branches.append(
+        """(SELECT table_name, 'delete' AS op, row_id AS id, xid, deleted_at AS changed_at, NULL::jsonb AS row
+             FROM tombstones
+             WHERE (xid, row_id) > (%(since_xid)s::xid8, %(since_id)s::uuid) AND xid < %(upper)s::xid8
+               AND table_name = ANY(%(tables)s)
+             ORDER BY xid, row_id LIMIT %(fetch)s)"""
+    )
+    return f"SELECT * FROM ({' UNION ALL '.join(branches)}) changes ORDER BY xid, id LIMIT %(fetch)s"
+
+
+def fetch_changes(conn, tables, since=None, limit=CHANGE_FEED_PAGE_SIZE, retention_days=TOMBSTONE_RETENTION_DAYS):
+    """Changes after ``since`` as a feed page: {"changes", "watermark", "has_more"}"""
+    since_xid, since_id, since_at = parse_since(since)
+    with conn.cursor() as cur:
+        # Every transaction below upper has finished, committed or not
+        cur.execute(
+            "SELECT pg_snapshot_xmin(pg_current_snapshot()) AS upper, now() AS now, "
+            "%s::timestamptz < now() - make_interval(days => %s) AS expired",
+            (since_at, retention_days),
+        )
+        bounds = cur.fetchone()
+        if bounds["expired"]:
+            raise ChangeFeedExpired(
+                f"Changes are only kept for {retention_days} days; re-download everything and start from the new watermark"
+            )
+        if since_xid is None:
+            cur.execute(start_query(tables), {"since": since_at, "tables": list(tables)})
+            since_xid = cur.fetchone()["xid"] or bounds["upper"]
+        cur.execute(changes_query(tables), {
+            "since_xid": since_xid,
+            "since_id": since_id,
+            "upper": bounds["upper"],
+            "tables": list(tables),
+            "fetch": limit + 1,
+        })
+        rows = cur.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        watermark = encode_watermark(rows[-1]["xid"], rows[-1]["id"], bounds["now"])
+    else:
+        # Caught up: next time start at the oldest transaction that was still running
+        watermark = encode_watermark(bounds["upper"], MIN_UUID, bounds["now"])
+    changes = [
+        {
+            "table": row["table_name"],
+            "op": row["op"],
+            "id": str(row["id"]),
+            "changed_at": row["changed_at"],
+            "row": row["row"],
+        }
+        for row in rows
+    ]
+    return {"changes": changes, "watermark": watermark, "has_more": has_more}
+
+
+def prune_tombstones(conn, retention_days=TOMBSTONE_RETENTION_DAYS):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM tombstones WHERE deleted_at < now() - make_interval(days => %s)", (retention_days,))
+        return cur.rowcount
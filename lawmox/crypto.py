@@ -0,0 +1,67 @@
+"""
+Batch Fernet encryption in a worker pool
+
+Encrypting thousands of passwords is CPU work that must not run on the event
+loop. Batches are split into chunks and encrypted in a process pool (real
+parallelism across cores) or, with CRYPTO_WORKERS=0, a single helper thread.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cryptography.fernet import Fernet
+
+_cipher = None
+
+
+def _init_worker(key):
+    global _cipher
+    _cipher = Fernet(key)
+
+
+def _encrypt_chunk(passwords):
+    return [_cipher.encrypt(password.encode()).decode() for password in passwords]
+
+
+class BatchEncryptor:
+    def __init__(self, key, workers=None, chunk_size=500):
+        self.key = key
+        if workers is None:
+            workers = int(os.getenv("CRYPTO_WORKERS", min(4, os.cpu_count() or 1)))
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def _get_executor(self):
+        # Created on first use so idle apps don't carry extra processes
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn: never fork a process that already runs threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.key,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="crypto", initializer=_init_worker, initargs=(self.key,)
+                )
+        return self._executor
+
+    async def encrypt_all(self, passwords):
+        """Encrypt ``passwords`` in order, off the event loop"""
+        if not passwords:
+            return []
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = [passwords[i:i + self.chunk_size] for i in range(0, len(passwords), self.chunk_size)]
+        results = await asyncio.gather(*(loop.run_in_executor(executor, _encrypt_chunk, chunk) for chunk in chunks))
+        return [token for chunk in results for token in chunk]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
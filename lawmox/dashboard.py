@@ -0,0 +1,57 @@
+"""
+Entities with their accounts, tasks and steps nested, built in one query
+
+Postgres assembles the nested JSON itself with json_agg over LATERAL
+subqueries, so the dashboard and the entity detail view are a single
+round trip however many children an entity has. The page of entities is
+picked first and the children are only aggregated for that page.
+"""
+
+from .pagination import DEFAULT_PAGE_SIZE, keyset_query, parse_sort
+
+DASHBOARD_PAGE_SIZE = 25
+DASHBOARD_MAX_PAGE_SIZE = 200
+
+_ACCOUNTS = """
+    LEFT JOIN LATERAL (
+        SELECT json_agg(to_jsonb(account) - 'encrypted_password' ORDER BY account.created_at DESC, account.id DESC) AS accounts
+        FROM accounts account
+        WHERE account.entity_id = e.id
+    ) entity_accounts ON true"""
+
+_TASKS = """
+    LEFT JOIN LATERAL (
+        SELECT json_agg(
+            to_jsonb(task) || jsonb_build_object('steps', COALESCE(task_steps.steps, '[]'::json))
+            ORDER BY task.created_at DESC, task.id DESC
+        ) AS tasks
+        FROM tasks task
+        LEFT JOIN LATERAL (
+            SELECT json_agg(step ORDER BY step.created_at, step.id) AS steps
+            FROM task_steps step
+            WHERE step.task_id = task.id
+        ) task_steps ON true
+        WHERE task.entity_id = e.id
+    ) entity_tasks ON true"""
+
+
+def _nest(entities_sql, with_tasks=True):
+    columns = "e.*, COALESCE(entity_accounts.accounts, '[]'::json) AS accounts"
+    joins = _ACCOUNTS
+    if with_tasks:
+        columns += ", COALESCE(entity_tasks.tasks, '[]'::json) AS tasks"
+        joins += _TASKS
+    return f"SELECT {columns} FROM ({entities_sql}) e{joins}"
+
+
+def entity_full_query(entity_id, with_tasks=True):
+    """One entity with nested accounts (and tasks with their steps)"""
+    return _nest("SELECT * FROM entities WHERE id = %s", with_tasks), (str(entity_id),)
+
+
+def dashboard_query(cursor=None, limit=DEFAULT_PAGE_SIZE, conditions=(), params=(), sort="-created_at", with_tasks=True):
+    """A keyset page of entities with their children nested; paginate() the result"""
+    page_sql, params = keyset_query("SELECT * FROM entities", cursor, limit, conditions, params, sort)
+    column, descending = parse_sort(sort)
+    direction = "DESC" if descending else "ASC"
+    return f"{_nest(page_sql, with_tasks)} ORDER BY e.{column} {direction}, e.id {direction}", params
@@ -0,0 +1,110 @@
+"""
+Awaitable data-access layer over the shared connection pool
+
+psycopg2 is a blocking driver, so every unit of work runs on a dedicated
+thread pool sized to the connection pool. Handlers await the result and
+the event loop keeps serving other requests while Postgres works.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from psycopg2 import extensions
+
+from .metrics import DB_SECONDS, DB_WAIT_SECONDS, current_route
+from .readiness import DatabaseUnavailable
+
+
+class AsyncDatabase:
+    def __init__(self, connect, max_workers, readiness=None):
+        # connect() returns a pooled connection whose close() releases it
+        self._connect = connect
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self.readiness = readiness
+
+    def _call(self, fn, args, commit):
+        started = time.perf_counter()
+        conn = self._connect()
+        checked_out = time.perf_counter()
+        DB_WAIT_SECONDS.observe(checked_out - started)
+        try:
+            result = fn(conn, *args)
+            if commit:
+                conn.commit()
+            return result
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if not conn.closed:
+                conn.rollback()
+                raise
+            # The server went away mid-query; stop routing requests to it
+            if self.readiness is None:
+                raise
+            self.readiness.mark_unavailable(e)
+            raise DatabaseUnavailable(f"Database unavailable: {e}", self.readiness.retry_after) from e
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+            DB_SECONDS.observe(time.perf_counter() - checked_out, current_route.get())
+
+    async def run(self, fn, *args, commit=False):
+        """Run ``fn(conn, *args)`` on a pooled connection off the event loop"""
+        loop = asyncio.get_running_loop()
+        # Executor threads don't inherit context variables; run in a copy so the
+        # route and the request's query stats follow the work
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self._call, fn, args, commit)
+
+    async def acquire(self):
+        """Check out a connection without blocking the loop; the caller releases it"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._connect)
+
+    async def call(self, fn, *args):
+        """Run ``fn(*args)``, blocking work on a connection from acquire(), off the event loop"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, fn, *args)
+
+    def release(self, conn):
+        """Return a connection from acquire() to the pool without waiting for its rollback"""
+        # Not awaited, so it happens even from code that is being cancelled
+        self._executor.submit(conn.close)
+
+    async def fetch_all(self, query, params=None):
+        def work(conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchall()
+        return await self.run(work)
+
+    async def fetch_tuples(self, query, params=None):
+        """(column names, rows as plain tuples): no per-row dicts"""
+        def work(conn):
+            with conn.cursor(cursor_factory=extensions.cursor) as cur:
+                cur.execute(query, params)
+                return [column.name for column in cur.description], cur.fetchall()
+        return await self.run(work)
+
+    async def fetch_one(self, query, params=None, commit=False):
+        def work(conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchone()
+        return await self.run(work, commit=commit)
+
+    async def execute(self, query, params=None):
+        """Execute a write statement and commit; returns the row count"""
+        def work(conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.rowcount
+        return await self.run(work, commit=True)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
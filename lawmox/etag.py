@@ -0,0 +1,71 @@
+"""
+Conditional GET support (ETag / If-None-Match)
+
+List ETags come from (row count, max(updated_at)) of the filtered set plus
+the page parameters, which Postgres answers with an index-only scan of a
+narrow (updated_at) or (filter column, updated_at) index without touching
+the rows themselves; storage without a cheap version (Supabase) tags pages
+by their content instead. Detail ETags come from the
+row's id and updated_at. A matching If-None-Match gets an empty 304 before
+anything is serialized.
+"""
+
+import hashlib
+import json
+
+from fastapi import Response
+
+ETAG_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def row_etag(table, row, query=""):
+    """``query`` tells ?fields= projections of the same row version apart"""
+    return make_etag(table, row["id"], row["updated_at"], query)
+
+
+def content_etag(data):
+    """ETag for payloads without a cheap version, e.g. rows from Supabase; bytes are hashed as is"""
+    if isinstance(data, bytes):
+        return make_etag(hashlib.sha1(data).hexdigest())
+    return make_etag(json.dumps(data, sort_keys=True, default=str))
+
+
+def collection_version_query(table, conditions=()):
+    """(row count, latest updated_at) of ``table`` under ``conditions``"""
+    query = f"SELECT count(*) AS count, max(updated_at) AS version FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query
+
+
+def collection_etag(table, version, query=""):
+    """ETag for one page of ``table``, from the (count, latest updated_at) version of its filtered rows"""
+    count, latest = version
+    return make_etag(table, count, latest, query)
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def check_etag(request, response, etag, vary=None):
+    """Return a 304 response if the client already has ``etag``; otherwise tag ``response``"""
+    headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+    if vary:
+        headers["Vary"] = vary
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
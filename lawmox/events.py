@@ -0,0 +1,179 @@
+"""
+Live change events: Postgres NOTIFY fanned out over Server-Sent Events
+
+Statement triggers publish {"table", "op", "id"} on one NOTIFY channel, or
+{"table", "op", "count"} for a statement that changed several rows. Each app
+process holds a single LISTEN connection, driven by the event loop (no
+thread, no polling), and copies every notification into the queues of the
+SSE clients subscribed to that table.
+
+A client whose queue overflows, and every client after the listener
+reconnects, gets a "resync" event instead: notifications may have been
+missed, so it should reload rather than trust its incremental state.
+"""
+
+import asyncio
+import json
+
+import psycopg2
+from psycopg2 import extensions
+
+CHANNEL = "lawmox_changes"
+EVENT_QUEUE_SIZE = 1000
+HEARTBEAT_INTERVAL = 15.0
+
+
+class Subscription:
+    def __init__(self, broker, topics, queue_size):
+        self.broker = broker
+        self.topics = topics
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "reason": "overflow"})
+            return False
+
+    def __enter__(self):
+        self.broker._subscribers.add(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.broker._subscribers.discard(self)
+
+
+class ChangeBroker:
+    def __init__(self, dsn=None, channel=CHANNEL, queue_size=EVENT_QUEUE_SIZE,
+                 initial_backoff=0.5, max_backoff=30.0, **connect_kwargs):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        # Dead peers are noticed through TCP keepalives; the connection is otherwise idle
+        connect_kwargs.pop("cursor_factory", None)
+        self.connect_kwargs = {"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, **connect_kwargs}
+
+        self.connected = False
+        self._subscribers = set()
+        self._conn = None
+        self._fd = None
+        self._lost = None
+        self._task = None
+        self._counters = {"notifications": 0, "delivered": 0, "overflows": 0, "reconnects": 0}
+
+    def _connect(self):
+        if self.dsn:
+            conn = psycopg2.connect(self.dsn, **self.connect_kwargs)
+        else:
+            conn = psycopg2.connect(**self.connect_kwargs)
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def subscribe(self, topics):
+        """Context manager yielding a Subscription to the given tables"""
+        return Subscription(self, frozenset(topics), self.queue_size)
+
+    def publish(self, event):
+        for subscriber in list(self._subscribers):
+            if event["type"] == "change" and event["table"] not in subscriber.topics:
+                continue
+            if subscriber.push(event):
+                self._counters["delivered"] += 1
+            else:
+                self._counters["overflows"] += 1
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            # Stop watching the socket now, or a dead fd would spin the loop
+            asyncio.get_running_loop().remove_reader(self._fd)
+            if not self._lost.done():
+                self._lost.set_result(e)
+            return
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            self._counters["notifications"] += 1
+            try:
+                payload = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self.publish({"type": "change", **payload})
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        backoff = self.initial_backoff
+        first = True
+        while True:
+            try:
+                self._conn = await loop.run_in_executor(None, self._connect)
+            except psycopg2.Error as e:
+                print(f"Change listener cannot connect ({str(e).strip()}); retrying in {backoff:g}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = self.initial_backoff
+            self.connected = True
+            if not first:
+                self._counters["reconnects"] += 1
+                # Anything sent while we were away is gone
+                self.publish({"type": "resync", "reason": "reconnect"})
+            first = False
+
+            self._lost = loop.create_future()
+            self._fd = self._conn.fileno()
+            loop.add_reader(self._fd, self._on_readable)
+            try:
+                error = await self._lost
+                print(f"Change listener lost its connection ({str(error).strip()})")
+            finally:
+                loop.remove_reader(self._fd)
+                self.connected = False
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {"connected": self.connected, "subscribers": len(self._subscribers), **self._counters}
+
+
+def _sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+async def sse_stream(broker, request, topics, heartbeat=HEARTBEAT_INTERVAL):
+    """Server-Sent Events for ``topics`` until the client goes away"""
+    with broker.subscribe(topics) as subscription:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line keeps proxies from closing an idle stream
+                yield b": keepalive\n\n"
+                continue
+            yield _sse(event)
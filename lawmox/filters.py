@@ -0,0 +1,71 @@
+"""
+Server-side filters and whitelisted sort orders for the list endpoints
+
+Every sort key listed here has a matching (column, id) index in
+lawmox.schema (a partial one WHERE column IS NOT NULL for the nullable
+deadline), and every equality filter a (column, created_at, id) index, so
+filtered pages stay index range scans.
+"""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Query
+
+# Allowed ?sort= values per endpoint; a leading '-' means descending
+SORT_KEYS = {
+    "entities": ("created_at", "updated_at", "entity_name"),
+    "accounts": ("created_at", "updated_at", "account_name"),
+    "tasks": ("created_at", "updated_at", "task_name", "deadline"),
+    "task_steps": ("created_at", "updated_at", "step_name"),
+}
+
+
+def sort_param(table):
+    """Query parameter that only accepts the whitelisted keys for ``table``"""
+    keys = "|".join(SORT_KEYS[table])
+    return Query("-created_at", pattern=f"^-?({keys})$", description=f"One of {', '.join(SORT_KEYS[table])}, prefixed with '-' for descending")
+
+
+def fields_param(model):
+    """?fields= restricting the response (and the SELECT) to some of ``model``'s fields"""
+    names = ", ".join(getattr(model, "model_fields", None) or model.__fields__)
+    return Query(None, pattern=r"^\w+(,\w+)*$", description=f"Comma-separated subset of: {names}")
+
+
+class DateRange:
+    """created/updated date range filters shared by all list endpoints"""
+
+    def __init__(
+        self,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+    ):
+        self.created_after = created_after
+        self.created_before = created_before
+        self.updated_after = updated_after
+        self.updated_before = updated_before
+
+
+def filter_conditions(equals=None, dates=None):
+    """Build WHERE conditions and params, skipping filters that were not given"""
+    conditions = []
+    params = []
+    for column, value in (equals or {}).items():
+        if value is not None:
+            conditions.append(f"{column} = %s")
+            params.append(str(value) if isinstance(value, UUID) else value)
+    if dates is not None:
+        for column, op, value in (
+            ("created_at", ">=", dates.created_after),
+            ("created_at", "<", dates.created_before),
+            ("updated_at", ">=", dates.updated_after),
+            ("updated_at", "<", dates.updated_before),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {op} %s")
+                params.append(value)
+    return conditions, params
@@ -0,0 +1,214 @@
+"""
+In-memory storage engine for tests and benchmarks
+
+Rows live in one dict per table, keyed by id, in this process only: every
+worker has its own data and nothing survives a restart. The engine keeps
+the Postgres schema's behaviour that the API relies on (defaults, unique
+ein and username, references between tables, keyset order on (sort column,
+id)) so the same requests give the same answers, and publishes its own
+writes to /events. There is no change feed.
+
+Each operation runs on the event loop without awaiting, so it is atomic.
+A page costs one pass over the table (heapq.nsmallest keeps only limit + 1
+rows), which is fine for test data and for benchmarking the HTTP layer.
+"""
+
+import heapq
+import uuid
+from datetime import datetime, timezone
+from functools import cmp_to_key
+
+from .pagination import NULLABLE_SORTS, cursor_value, decode_cursor, parse_sort
+from .repository import PRIVATE_COLUMNS, Repository, StorageError, date_bounds, given, public_columns
+
+# Column -> default, per the migrations' base tables
+TABLES = {
+    "entities": {
+        "entity_name": None, "ein": None, "date_of_formation": None, "registered_address": None,
+        "state_of_formation": None, "entity_type": None, "status": "active",
+    },
+    "accounts": {
+        "account_name": None, "username": None, "encrypted_password": None, "entity_id": None,
+        "login_url": None, "account_type": None, "notes": None,
+    },
+    "tasks": {
+        "task_name": None, "description": None, "status": "pending", "entity_id": None,
+        "account_id": None, "deadline": None, "priority": "medium",
+    },
+    "task_steps": {"step_name": None, "description": None, "status": "pending", "task_id": None},
+}
+UNIQUE = {"entities": ("ein",), "accounts": ("username",)}
+REQUIRED = {
+    "entities": ("entity_name",),
+    "accounts": ("account_name", "username", "encrypted_password"),
+    "tasks": ("task_name",),
+    "task_steps": ("step_name",),
+}
+# Column -> referenced table
+REFERENCES = {
+    "accounts": {"entity_id": "entities"},
+    "tasks": {"entity_id": "entities", "account_id": "accounts"},
+    "task_steps": {"task_id": "tasks"},
+}
+# References cleared when the referenced row is deleted (ON DELETE SET NULL)
+SET_NULL = {("tasks", "account_id")}
+
+_OPERATORS = {">=": lambda a, b: a >= b, "<": lambda a, b: a < b}
+
+
+def _uuid(value, column):
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        raise StorageError(f'invalid input syntax for type uuid: "{value}" ({column})')
+
+
+def _compare(a, b):
+    # NULLs sort last ascending, as in Postgres
+    if a == b:
+        return 0
+    if a is None:
+        return 1
+    if b is None:
+        return -1
+    return -1 if a < b else 1
+
+
+class MemoryRepository(Repository):
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.tables = {table: {} for table in TABLES}
+        # (table, column) -> {value: id} for the unique columns
+        self.unique = {(table, column): {} for table, columns in UNIQUE.items() for column in columns}
+
+    def stats(self):
+        return {"rows": {table: len(rows) for table, rows in self.tables.items()}, "events": self.broker.stats()}
+
+    def _public(self, table, row, columns=None):
+        if columns is None:
+            private = PRIVATE_COLUMNS.get(table, ())
+            return {name: value for name, value in row.items() if name not in private}
+        return {name: row[name] for name in columns}
+
+    def _matching(self, table, equals=None, dates=None):
+        equals = given(equals)
+        # Naive bounds are UTC, as for a Postgres session in UTC
+        bounds = [(column, op, value if value.tzinfo else value.replace(tzinfo=timezone.utc))
+                  for column, op, value in date_bounds(dates)]
+        for row in self.tables[table].values():
+            if any(row[column] != value for column, value in equals.items()):
+                continue
+            if any(not _OPERATORS[op](row[column], value) for column, op, value in bounds):
+                continue
+            yield row
+
+    async def version(self, table, equals=None, dates=None):
+        count, latest = 0, None
+        for row in self._matching(table, equals, dates):
+            count += 1
+            if latest is None or row["updated_at"] > latest:
+                latest = row["updated_at"]
+        return count, latest
+
+    async def page(self, table, columns, cursor=None, limit=100, sort="-created_at", equals=None, dates=None):
+        column, descending = parse_sort(sort)
+        rows = self._matching(table, equals, dates)
+        if column in NULLABLE_SORTS:
+            rows = (row for row in rows if row[column] is not None)
+        if cursor:
+            value, row_id = decode_cursor(cursor, sort)
+            value = cursor_value(column, value)
+            after = (lambda row: (row[column], row["id"]) < (value, row_id)) if descending else \
+                (lambda row: (row[column], row["id"]) > (value, row_id))
+            rows = filter(after, rows)
+
+        def order(a, b):
+            result = _compare(a[column], b[column]) or _compare(a["id"], b["id"])
+            return -result if descending else result
+
+        page = heapq.nsmallest(limit + 1, rows, key=cmp_to_key(order))
+        if columns is None:
+            names = public_columns(table)
+        else:
+            names = list(columns) + [name for name in (column, "id") if name not in columns]
+        return names, [tuple(row[name] for name in names) for row in page]
+
+    async def get(self, table, row_id, columns=None):
+        row = self.tables[table].get(str(row_id))
+        return None if row is None else self._public(table, row, columns)
+
+    async def related(self, table, column, values, columns=None, sort="-created_at"):
+        wanted = {str(value) for value in values}
+        rows = [row for row in self.tables[table].values() if row[column] is not None and str(row[column]) in wanted]
+        if sort is not None:
+            key, descending = parse_sort(sort)
+            rows.sort(key=lambda row: (row[key], row["id"]), reverse=descending)
+        return [self._public(table, row, columns) for row in rows]
+
+    def _check(self, table, row, row_id=None):
+        for column in REQUIRED[table]:
+            if row[column] is None:
+                raise StorageError(f'null value in column "{column}" of relation "{table}" violates not-null constraint')
+        for column, target in REFERENCES.get(table, {}).items():
+            if row[column] is not None:
+                row[column] = _uuid(row[column], column)
+                if row[column] not in self.tables[target]:
+                    raise StorageError(f'insert or update on table "{table}" violates foreign key constraint: '
+                                       f"no {target} row with id {row[column]}")
+        for column in UNIQUE.get(table, ()):
+            owner = self.unique[table, column].get(row[column])
+            if row[column] is not None and owner not in (None, row_id):
+                raise StorageError(f'duplicate key value violates unique constraint "{table}_{column}_key"')
+
+    def _store(self, table, row, previous=None):
+        for column in UNIQUE.get(table, ()):
+            index = self.unique[table, column]
+            if previous is not None and previous[column] is not None:
+                del index[previous[column]]
+            if row is not None and row[column] is not None:
+                index[row[column]] = row["id"]
+        if row is None:
+            del self.tables[table][previous["id"]]
+        else:
+            self.tables[table][row["id"]] = row
+
+    async def insert(self, table, values, columns):
+        now = datetime.now(timezone.utc)
+        row = {"id": str(uuid.uuid4()), **TABLES[table], **values, "created_at": now, "updated_at": now}
+        self._check(table, row)
+        self._store(table, row)
+        self.publish(table, "insert", row["id"])
+        return self._public(table, row, columns)
+
+    async def update(self, table, row_id, values, columns):
+        row_id = str(row_id)
+        current = self.tables[table].get(row_id)
+        if current is None:
+            return None
+        row = {**current, **values, "updated_at": datetime.now(timezone.utc)}
+        self._check(table, row, row_id)
+        self._store(table, row, current)
+        self.publish(table, "update", row_id)
+        return self._public(table, row, columns)
+
+    async def delete(self, table, row_id):
+        row_id = str(row_id)
+        if row_id not in self.tables[table]:
+            return False
+        cleared = []
+        for child, references in REFERENCES.items():
+            for column, target in references.items():
+                rows = [row for row in self.tables[child].values() if target == table and row[column] == row_id]
+                if rows and (child, column) not in SET_NULL:
+                    raise StorageError(f'update or delete on table "{table}" violates foreign key constraint on table "{child}"')
+                cleared += [(child, column, row) for row in rows]
+        self._store(table, None, self.tables[table][row_id])
+        now = datetime.now(timezone.utc)
+        for child, column, row in cleared:
+            row[column] = None
+            row["updated_at"] = now
+            self.publish(child, "update", row["id"])
+        self.publish(table, "delete", row_id)
+        return True
@@ -0,0 +1,195 @@
+"""
+Prometheus metrics for the request, database and crypto hot paths
+
+A small in-process registry rendered in the Prometheus text format at
+/metrics, so no client library is needed. Metrics are per process: with
+several workers, scrape each one (or label them by pod).
+
+Requests are labelled by route template (/entities/{entity_id}), never by
+raw path, so cardinality stays bounded. The route is also kept in a context
+variable so database work done on its behalf can be attributed to it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import Response
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CRYPTO_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1.0)
+
+# Route template of the request being served; "background" outside requests
+current_route = ContextVar("current_route", default="background")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = self._header()
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+REGISTRY = []
+_STATS = []
+
+HTTP_REQUESTS = Counter("lawmox_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_ERRORS = Counter("lawmox_http_errors_total", "HTTP responses with status >= 400, and unhandled exceptions as 500", ("method", "route", "status"))
+HTTP_SECONDS = Histogram("lawmox_http_request_duration_seconds", "Request latency until the response is fully sent", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("lawmox_http_requests_in_flight", "Requests being served", ("method", "route"))
+DB_QUERIES = Counter("lawmox_db_queries_total", "Database statements (and Supabase round trips) run on behalf of a route", ("route",))
+DB_SECONDS = Histogram("lawmox_db_query_duration_seconds", "Time spent in the database per unit of work", ("route",))
+DB_WAIT_SECONDS = Histogram("lawmox_db_pool_wait_seconds", "Time waiting to check a connection out of the pool")
+DB_CONNECT_SECONDS = Histogram("lawmox_db_connect_seconds", "Time to open a new database connection")
+CRYPTO_SECONDS = Histogram("lawmox_crypto_seconds", "Fernet encryption time", ("operation",), buckets=CRYPTO_BUCKETS)
+
+
+def register_stats(prefix, stats):
+    """Expose the numeric values of ``stats()`` (a dict) as ``{prefix}_{key}`` at scrape time"""
+    _STATS.append((prefix, stats))
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for prefix, stats in _STATS:
+        try:
+            values = stats()
+        except Exception:
+            continue
+        for key, value in values.items():
+            if isinstance(value, (bool, int, float)):
+                lines.append(f"# TYPE {prefix}_{key} untyped")
+                lines.append(f"{prefix}_{key} {_number(int(value) if isinstance(value, bool) else value)}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response():
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+def _route(scope):
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (streaming responses pass straight through)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method, route = scope["method"], _route(scope)
+        status = 500
+        token = current_route.set(route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_SECONDS.observe(time.perf_counter() - started, method, route)
+            HTTP_IN_FLIGHT.dec(method, route)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            if status >= 400:
+                HTTP_ERRORS.inc(method, route, str(status))
+            current_route.reset(token)
@@ -0,0 +1,189 @@
+"""
+Versioned schema migrations for the Postgres backends
+
+Applied migrations are recorded in schema_version, so startup costs one
+version query once the database is current. Pending migrations run in
+order under an advisory lock (several workers may start at once). Each
+migration's statements run in one transaction together with its
+schema_version row; its indexes are then built with CREATE INDEX
+CONCURRENTLY, outside any transaction, so writes continue while they build.
+
+Migrations are append-only: never edit one that has shipped, add a new
+version instead. Every statement is idempotent (IF NOT EXISTS, OR REPLACE)
+so databases created by the old startup DDL adopt the history cleanly.
+
+database_schema.sql is the Supabase schema. Migration 2 adds its columns
+to the tables created here; the API keeps the names it has always used
+(encrypted_password, task_name).
+"""
+
+from typing import NamedTuple, Sequence
+
+import psycopg2
+from psycopg2 import extensions
+
+from .schema import (
+    CHANGE_FEED_DDL, COMMIT_ORDER_DDL, COMMIT_ORDER_INDEXES, INDEXES, NOTIFY_DDL, PARTIAL_INDEXES,
+    STATEMENT_NOTIFY_DDL, STEP_ORDER_INDEXES, VERSION_INDEXES, create_index,
+)
+
+LOCK_ID = 0x6C61776D6F78  # "lawmox"
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+    )
+"""
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    statements: Sequence[str] = ()
+    # (name, table, columns[, where]) built CONCURRENTLY after the statements
+    indexes: Sequence[tuple] = ()
+
+
+BASE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS entities (
+        id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+        entity_name VARCHAR(255) NOT NULL,
+        ein VARCHAR(20) UNIQUE,
+        date_of_formation DATE,
+        registered_address TEXT,
+        state_of_formation VARCHAR(100),
+        entity_type VARCHAR(100),
+        status VARCHAR(50) DEFAULT 'active',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS accounts (
+        id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+        account_name VARCHAR(255) NOT NULL,
+        username VARCHAR(100) UNIQUE NOT NULL,
+        encrypted_password TEXT NOT NULL,
+        entity_id UUID REFERENCES entities(id),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+        task_name VARCHAR(255) NOT NULL,
+        description TEXT,
+        status VARCHAR(50) DEFAULT 'pending',
+        entity_id UUID REFERENCES entities(id),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_steps (
+        id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+        step_name VARCHAR(255) NOT NULL,
+        description TEXT,
+        status VARCHAR(50) DEFAULT 'pending',
+        task_id UUID REFERENCES tasks(id),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+]
+
+# Columns database_schema.sql has that the tables above lacked; all nullable
+SUPABASE_COLUMNS = [
+    "ALTER TABLE accounts ADD COLUMN IF NOT EXISTS login_url TEXT",
+    "ALTER TABLE accounts ADD COLUMN IF NOT EXISTS account_type VARCHAR(100)",
+    "ALTER TABLE accounts ADD COLUMN IF NOT EXISTS notes TEXT",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS account_id UUID REFERENCES accounts(id) ON DELETE SET NULL",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS deadline DATE",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS priority VARCHAR(20) DEFAULT 'medium'",
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completion_date TIMESTAMP WITH TIME ZONE",
+    "ALTER TABLE task_steps ADD COLUMN IF NOT EXISTS step_order INTEGER",
+    "ALTER TABLE task_steps ADD COLUMN IF NOT EXISTS completion_date TIMESTAMP WITH TIME ZONE",
+]
+
+MIGRATIONS = [
+    Migration(1, "Base tables", BASE_TABLES),
+    Migration(2, "Columns from database_schema.sql", SUPABASE_COLUMNS),
+    Migration(3, "List endpoint indexes", indexes=INDEXES),
+    Migration(4, "updated_at triggers and change feed tombstones", CHANGE_FEED_DDL),
+    Migration(5, "Row change NOTIFY triggers", NOTIFY_DDL),
+    Migration(6, "Narrow indexes for list ETag counts", indexes=VERSION_INDEXES),
+    Migration(7, "Change feed in commit order", COMMIT_ORDER_DDL, COMMIT_ORDER_INDEXES),
+    Migration(8, "One change NOTIFY per statement", STATEMENT_NOTIFY_DDL),
+    Migration(9, "Partial indexes for tasks by deadline and by account", indexes=PARTIAL_INDEXES),
+    Migration(10, "Task steps by (task_id, step_order)", indexes=STEP_ORDER_INDEXES),
+]
+
+
+def current_version(conn):
+    """Highest applied migration; 0 for a database that was never migrated"""
+    with conn.cursor(cursor_factory=extensions.cursor) as cur:
+        try:
+            cur.execute("SELECT coalesce(max(version), 0) FROM schema_version")
+            return cur.fetchone()[0]
+        except psycopg2.errors.UndefinedTable:
+            return 0
+
+
+def _build_index(cur, name, table, columns, where=None):
+    # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+    cur.execute("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,))
+    row = cur.fetchone()
+    if row and row[0]:
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cur.execute(create_index(name, table, columns, where, concurrently=True))
+
+
+def _apply(cur, migration):
+    record = ("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+              (migration.version, migration.description))
+    cur.execute("BEGIN")
+    try:
+        for statement in migration.statements:
+            cur.execute(statement)
+        if not migration.indexes:
+            cur.execute(*record)
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    if migration.indexes:
+        for index in migration.indexes:
+            _build_index(cur, *index)
+        cur.execute(*record)
+
+
+def migrate(conn, migrations=MIGRATIONS):
+    """Apply pending migrations; returns the schema version afterwards"""
+    version = current_version(conn)
+    if all(migration.version <= version for migration in migrations):
+        return version
+    conn.rollback()
+    autocommit = conn.autocommit
+    # Autocommit: CONCURRENTLY can't run in a transaction, so _apply manages its own
+    conn.autocommit = True
+    try:
+        with conn.cursor(cursor_factory=extensions.cursor) as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_ID,))
+            try:
+                cur.execute(SCHEMA_VERSION_DDL)
+                # Another worker may have migrated while we waited for the lock
+                version = current_version(conn)
+                for migration in sorted(migrations, key=lambda migration: migration.version):
+                    if migration.version > version:
+                        _apply(cur, migration)
+                        version = migration.version
+                        print(f"Applied migration {migration.version}: {migration.description}")
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_ID,))
+    finally:
+        conn.autocommit = autocommit
+    return version
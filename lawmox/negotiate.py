@@ -0,0 +1,117 @@
+"""
+Content negotiation for list pages
+
+Accept picks the page shape and encoding:
+
+    application/json                          {"items": [{...}, ...], "next_cursor"}  (default)
+    application/vnd.lawmox.columnar+json      {"columns": [...], "data": [[...], ...], "next_cursor"}
+    application/msgpack                       row shape as MessagePack
+    application/vnd.lawmox.columnar+msgpack   columnar shape as MessagePack
+
+The columnar shape holds one array per column, so field names are sent once
+per page instead of once per row. Accept-Encoding then picks br (when the
+brotli package is installed) or gzip. MessagePack needs the msgpack package;
+without it those types fall back to JSON. The body is compressed once, before
+it is cached, so cache hits cost no CPU.
+"""
+
+import gzip
+from typing import NamedTuple, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .serialize import _default, dumps, page_data
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.lawmox.columnar+json"
+MSGPACK = "application/msgpack"
+COLUMNAR_MSGPACK = "application/vnd.lawmox.columnar+msgpack"
+MEDIA_TYPES = {
+    JSON: (False, False),
+    COLUMNAR_JSON: (True, False),
+    MSGPACK: (False, True),
+    "application/x-msgpack": (False, True),
+    COLUMNAR_MSGPACK: (True, True),
+}
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+VARY = "Accept, Accept-Encoding"
+
+
+class Representation(NamedTuple):
+    media_type: str = JSON
+    columnar: bool = False
+    msgpack: bool = False
+    encoding: Optional[str] = None
+
+    @property
+    def tag(self):
+        """Short name for cache keys and ETags; empty for plain JSON"""
+        parts = [name for name, flag in (("columnar", self.columnar), ("msgpack", self.msgpack)) if flag]
+        if self.encoding:
+            parts.append(self.encoding)
+        return ".".join(parts)
+
+    def etag(self, etag):
+        # Each representation is a different byte sequence, so it needs its own strong tag
+        return f'{etag[:-1]}-{self.tag}"' if self.tag else etag
+
+    def headers(self):
+        headers = {"Vary": VARY}
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+    def encode_page(self, columns, rows, next_cursor=None, fields=None):
+        data = page_data(columns, rows, next_cursor, fields, columnar=self.columnar)
+        body = msgpack.packb(data, default=_default) if self.msgpack else dumps(data)
+        if self.encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        if self.encoding == "gzip":
+            return gzip.compress(body, compresslevel=GZIP_LEVEL)
+        return body
+
+
+def _accepted(header):
+    """Header values with q > 0, in the client's order of preference"""
+    values = []
+    for position, part in enumerate(header.split(",")):
+        value, *params = [piece.strip() for piece in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if value and q > 0:
+            values.append((-q, position, value.lower()))
+    return [value for _, _, value in sorted(values)]
+
+
+def negotiate(request):
+    """The Representation a list endpoint should answer ``request`` with"""
+    media_type, columnar, packed = JSON, False, False
+    for value in _accepted(request.headers.get("accept", "")):
+        if value in MEDIA_TYPES:
+            columnar, packed = MEDIA_TYPES[value]
+            if packed and msgpack is None:
+                # Same shape in the encoding everyone can read
+                packed = False
+            media_type = [name for name, flags in MEDIA_TYPES.items() if flags == (columnar, packed)][0]
+            break
+    encoding = None
+    for value in _accepted(request.headers.get("accept-encoding", "")):
+        if (value == "br" and brotli is not None) or value == "gzip":
+            encoding = value
+            break
+    return Representation(media_type, columnar, packed, encoding)
@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) pagination for the list endpoints
+
+Pages are ordered by (sort column, id), newest first by default, and the
+cursor carries the last row's key, so fetching page N costs the same index
+range scan as page 1.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Generic, List, Optional, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this API or is malformed"""
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+# SQL casts for cursor values of sortable columns; anything else is text
+SORT_CASTS = {
+    "created_at": "timestamptz",
+    "updated_at": "timestamptz",
+    "deadline": "date",
+}
+
+# Sortable columns that may be NULL: pages in their order only list the rows
+# that have a value, since a keyset comparison can't step past NULLs
+NULLABLE_SORTS = ("deadline",)
+
+
+def cursor_value(column, value):
+    """A cursor's text value as the Python type of ``column``"""
+    cast = SORT_CASTS.get(column)
+    if cast == "timestamptz":
+        return datetime.fromisoformat(value)
+    if cast == "date":
+        return date.fromisoformat(value)
+    return value
+
+
+def parse_sort(sort):
+    """'-created_at' -> ('created_at', True); 'entity_name' -> ('entity_name', False)"""
+    if sort.startswith("-"):
+        return sort[1:], True
+    return sort, False
+
+
+def encode_cursor(row, sort="-created_at"):
+    column, _ = parse_sort(sort)
+    value = row[column]
+    if isinstance(value, date):
+        value = value.isoformat()
+    key = [sort, value, str(row["id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort="-created_at"):
+    """(sort value, id) from a cursor, checked so every engine can compare them"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor("Pagination cursor does not match the requested sort order")
+    column, _ = parse_sort(sort)
+    if not isinstance(value, str) or not isinstance(row_id, str):
+        raise InvalidCursor("Invalid pagination cursor")
+    try:
+        parsed = cursor_value(column, value)
+    except ValueError:
+        raise InvalidCursor("Invalid pagination cursor")
+    if isinstance(parsed, datetime) and parsed.tzinfo is None:
+        raise InvalidCursor("Invalid pagination cursor")
+    try:
+        row_id = str(UUID(row_id))
+    except ValueError:
+        raise InvalidCursor("Invalid pagination cursor")
+    return value, row_id
+
+
+def keyset_query(select_sql, cursor=None, limit=DEFAULT_PAGE_SIZE, conditions=(), params=(), sort="-created_at"):
+    """Append the keyset predicate, ordering and limit to ``select_sql``.
+
+    ``sort`` must already be whitelisted by the caller. One extra row is
+    fetched so paginate() can tell whether a next page exists.
+    """
+    column, descending = parse_sort(sort)
+    direction = "DESC" if descending else "ASC"
+    conditions = list(conditions)
+    params = list(params)
+    if column in NULLABLE_SORTS:
+        conditions.append(f"{column} IS NOT NULL")
+    if cursor:
+        cast = SORT_CASTS.get(column, "text")
+        conditions.append(f"({column}, id) {'<' if descending else '>'} (%s::{cast}, %s::uuid)")
+        params.extend(decode_cursor(cursor, sort))
+    query = select_sql
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {column} {direction}, id {direction} LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+def paginate(rows, limit, sort="-created_at"):
+    """Split the over-fetched rows into (page rows, next cursor)"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1], sort)
+    return rows, None
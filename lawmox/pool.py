@@ -0,0 +1,265 @@
+"""
+Bounded psycopg2 connection pool shared by the backends
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+from .metrics import DB_CONNECT_SECONDS
+from .queries import TracedConnection
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time"""
+
+
+class PooledConnection:
+    """Proxy around a pooled connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # conn.autocommit = True etc. apply to the wrapped connection
+        if name in ("_pool", "_conn"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+
+class ConnectionPool:
+    """Thread-safe pool with a hard upper bound on open connections.
+
+    Connections are created lazily up to ``maxconn``. Idle connections are
+    pinged on checkout once they have been idle for ``health_check_interval``
+    seconds, and broken or expired connections are discarded and replaced.
+    """
+
+    def __init__(self, dsn=None, minconn=1, maxconn=10, timeout=10.0,
+                 health_check_interval=30.0, max_lifetime=3600.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("pool size must satisfy 0 <= minconn <= maxconn and maxconn >= 1")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        # Traced cursors count statements per request and log slow ones
+        connect_kwargs.setdefault("connection_factory", TracedConnection)
+        self.connect_kwargs = connect_kwargs
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used)
+        self._born = {}  # id(conn) -> created_at for checked out connections
+        self._size = 0
+        self._closed = False
+        self._counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "connect_errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls, dsn=None, **connect_kwargs):
+        """Build a pool sized from the DB_POOL_* environment variables"""
+        return cls(
+            dsn=dsn,
+            minconn=int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            maxconn=int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            health_check_interval=float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30)),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", 3600)),
+            **connect_kwargs,
+        )
+
+    def _connect(self):
+        started = time.perf_counter()
+        try:
+            if self.dsn:
+                conn = psycopg2.connect(self.dsn, **self.connect_kwargs)
+            else:
+                conn = psycopg2.connect(**self.connect_kwargs)
+        except Exception:
+            with self._lock:
+                self._counters["connect_errors"] += 1
+            raise
+        DB_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        with self._lock:
+            self._counters["connections_created"] += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def open(self):
+        """Pre-create ``minconn`` connections"""
+        conns = []
+        with self._lock:
+            missing = max(0, self.minconn - self._size)
+            self._size += missing
+        try:
+            for _ in range(missing):
+                conns.append(self._connect())
+        finally:
+            with self._lock:
+                self._size -= missing - len(conns)
+                now = time.monotonic()
+                for conn in conns:
+                    self._idle.append((conn, now, now))
+                self._lock.notify_all()
+
+    def getconn(self, timeout=None):
+        """Check out a healthy connection, waiting up to ``timeout`` seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"no database connection available within {timeout:g}s "
+                            f"(pool size {self.maxconn})"
+                        )
+                    if not waited:
+                        waited = True
+                        self._counters["waits"] += 1
+                    self._lock.wait(remaining)
+                if self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                created_at = time.monotonic()
+            elif not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                with self._lock:
+                    self._size -= 1
+                    self._counters["health_check_failures"] += 1
+                    self._counters["connections_recycled"] += 1
+                    self._lock.notify()
+                continue
+
+            with self._lock:
+                self._counters["checkouts"] += 1
+                self._born[id(conn)] = created_at
+            return PooledConnection(self, conn)
+
+    def putconn(self, conn, discard=False):
+        """Return a raw connection, resetting or recycling it as needed"""
+        if isinstance(conn, PooledConnection):
+            conn.close()
+            return
+        with self._lock:
+            created_at = self._born.pop(id(conn), time.monotonic())
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        expired = self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+        if discard or conn.closed or expired or self._closed:
+            self._discard(conn)
+            with self._lock:
+                self._size -= 1
+                self._counters["connections_recycled"] += 1
+                self._lock.notify()
+            return
+
+        with self._lock:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def reset(self):
+        """Close every idle connection, e.g. after the server restarted"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._counters["connections_recycled"] += len(idle)
+            self._lock.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def closeall(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Snapshot of pool gauges and cumulative counters"""
+        with self._lock:
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                **self._counters,
+            }
@@ -0,0 +1,227 @@
+"""
+Postgres storage engine: local Postgres or DATABASE_URL
+
+Everything the endpoints need runs as SQL on the shared connection pool
+through AsyncDatabase: list pages are fetched as tuples, ETag versions are
+index-only counts, dashboards are nested by json_agg in one query, bulk
+writes go through COPY, exports stream from a server-side cursor and row
+triggers feed /changes and /events. The schema is migrated once the
+readiness monitor first reaches the database.
+"""
+
+import asyncio
+import functools
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from .bulk import bulk_insert, bulk_upsert, check_references
+from .changes import fetch_changes, prune_tombstones
+from .dashboard import dashboard_query, entity_full_query
+from .db import AsyncDatabase
+from .etag import collection_version_query
+from .events import ChangeBroker
+from .export import export_select_list, stream_export
+from .filters import filter_conditions
+from .migrations import migrate
+from .pagination import keyset_query
+from .pool import ConnectionPool
+from .readiness import DatabaseUnavailable, ReadinessMonitor
+from .repository import PRIVATE_COLUMNS, Repository, StorageError
+from .serialize import page_columns, select_list
+
+
+def _public(table, row):
+    for name in PRIVATE_COLUMNS.get(table, ()):
+        row.pop(name, None)
+    return row
+
+
+def related_query(table, column, columns=None, sort="-created_at"):
+    """SELECT of ``table`` rows whose ``column`` is any of one array parameter"""
+    select = select_list(columns) if columns is not None else "*"
+    # A list of str adapts to text[], which doesn't compare with uuid columns
+    cast = "::uuid[]" if column == "id" or column.endswith("_id") else ""
+    query = f"SELECT {select} FROM {table} WHERE {column} = ANY(%s{cast})"
+    if sort is None:
+        return query
+    direction = "DESC" if sort.startswith("-") else "ASC"
+    sort = sort.lstrip("-")
+    return f"{query} ORDER BY {sort} {direction}, id {direction}"
+
+
+def _storage_errors(fn):
+    # Constraint violations and bad values are the client's fault (400);
+    # connection failures keep their own meaning
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            raise
+        except psycopg2.Error as e:
+            raise StorageError(str(e).strip()) from e
+    return wrapper
+
+
+class PostgresRepository(Repository):
+    name = "postgres"
+
+    def __init__(self, dsn=None, **connect_kwargs):
+        super().__init__()
+        # Sized via DB_POOL_* environment variables
+        self.pool = ConnectionPool.from_env(dsn, cursor_factory=RealDictCursor, **connect_kwargs)
+        self.readiness = ReadinessMonitor(self.pool, on_ready=self._prepare)
+        # Awaitable query layer; handlers never block the event loop on psycopg2
+        self.db = AsyncDatabase(self._connect, max_workers=self.pool.maxconn, readiness=self.readiness)
+        # One LISTEN connection per process fans change events out to SSE clients
+        self.broker = ChangeBroker(self.pool.dsn, **self.pool.connect_kwargs)
+
+    def _prepare(self):
+        # Schema setup runs once the readiness monitor first reaches the database
+        conn = self.pool.getconn()
+        try:
+            # One version check; only pending migrations (tables, indexes, triggers) run
+            version = migrate(conn)
+            prune_tombstones(conn)
+            conn.commit()
+            print(f"Database schema at version {version}")
+        finally:
+            conn.close()
+        self.pool.open()
+
+    def _connect(self):
+        # close() returns the connection to the pool. Never waits for a down
+        # database: the readiness monitor makes requests fail fast with 503
+        self.readiness.check()
+        try:
+            return self.pool.getconn()
+        except psycopg2.OperationalError as e:
+            self.readiness.mark_unavailable(e)
+            raise DatabaseUnavailable(f"Database unavailable: {e}", self.readiness.retry_after)
+
+    def start(self):
+        self.readiness.start()
+        self.broker.start()
+
+    async def close(self):
+        await self.readiness.stop()
+        await self.broker.stop()
+        self.db.close()
+        self.pool.closeall()
+
+    def check(self):
+        self.readiness.check()
+
+    @property
+    def ready(self):
+        return self.readiness.ready
+
+    @property
+    def retry_after(self):
+        return self.readiness.retry_after
+
+    def status(self):
+        return self.readiness.status()
+
+    async def _warm_up(self):
+        # Readiness runs the migrations and opens DB_POOL_MIN_SIZE connections
+        while not self.readiness.ready:
+            await asyncio.sleep(0.05)
+        await super()._warm_up()
+
+    def stats(self):
+        return {"pool": self.pool.stats(), "events": self.broker.stats()}
+
+    @_storage_errors
+    async def version(self, table, equals=None, dates=None):
+        conditions, params = filter_conditions(equals, dates)
+        row = await self.db.fetch_one(collection_version_query(table, conditions), params)
+        return row["count"], row["version"]
+
+    @_storage_errors
+    async def page(self, table, columns, cursor=None, limit=100, sort="-created_at", equals=None, dates=None):
+        conditions, params = filter_conditions(equals, dates)
+        select = f"SELECT * FROM {table}" if columns is None else f"SELECT {page_columns(columns, sort)} FROM {table}"
+        query, params = keyset_query(select, cursor, limit, conditions, params, sort)
+        names, rows = await self.db.fetch_tuples(query, params)
+        private = PRIVATE_COLUMNS.get(table, ())
+        if columns is None and private:
+            keep = [index for index, name in enumerate(names) if name not in private]
+            names, rows = [names[index] for index in keep], [tuple(row[index] for index in keep) for row in rows]
+        return names, rows
+
+    @_storage_errors
+    async def get(self, table, row_id, columns=None):
+        if columns is None:
+            row = await self.db.fetch_one(f"SELECT * FROM {table} WHERE id = %s", (row_id,))
+            return row and _public(table, row)
+        return await self.db.fetch_one(f"SELECT {select_list(columns)} FROM {table} WHERE id = %s", (row_id,))
+
+    @_storage_errors
+    async def related(self, table, column, values, columns=None, sort="-created_at"):
+        values = [str(value) for value in values]
+        if not values:
+            return []
+        rows = await self.db.fetch_all(related_query(table, column, columns, sort), (values,))
+        return rows if columns is not None else [_public(table, row) for row in rows]
+
+    @_storage_errors
+    async def insert(self, table, values, columns):
+        return await self.db.fetch_one(
+            f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join(['%s'] * len(values))}) RETURNING {select_list(columns)}",
+            list(values.values()), commit=True,
+        )
+
+    @_storage_errors
+    async def update(self, table, row_id, values, columns):
+        assignments = "".join(f"{name} = %s, " for name in values)
+        return await self.db.fetch_one(
+            f"UPDATE {table} SET {assignments}updated_at = NOW() WHERE id = %s RETURNING {select_list(columns)}",
+            [*values.values(), row_id], commit=True,
+        )
+
+    @_storage_errors
+    async def delete(self, table, row_id):
+        return await self.db.fetch_one(f"DELETE FROM {table} WHERE id = %s RETURNING id", (row_id,), commit=True) is not None
+
+    async def entity_full(self, entity_id):
+        # Accounts, tasks and steps nested by Postgres (json_agg over LATERAL joins)
+        query, params = entity_full_query(entity_id)
+        return await self.db.fetch_one(query, params)
+
+    async def dashboard(self, cursor=None, limit=25, sort="-created_at", equals=None, dates=None):
+        conditions, params = filter_conditions(equals, dates)
+        query, params = dashboard_query(cursor, limit, conditions, params, sort)
+        return await self.db.fetch_all(query, params)
+
+    @_storage_errors
+    async def bulk_upsert(self, table, columns, column_types, rows, conflict_column):
+        # Staged with COPY and upserted in one statement
+        return await self.db.run(bulk_upsert, table, columns, column_types, rows, conflict_column, commit=True)
+
+    @_storage_errors
+    async def bulk_insert(self, table, columns, rows, conflict_column, returning, references=None):
+        def work(conn):
+            kept, missing = rows, []
+            if references is not None:
+                kept, missing = check_references(conn, rows, columns, *references)
+            if not kept:
+                return [], missing
+            created, conflicts = bulk_insert(conn, table, columns, kept, conflict_column, ", ".join(returning))
+            return created, sorted(missing + conflicts, key=lambda error: error["row"])
+        return await self.db.run(work, commit=True)
+
+    async def changes(self, tables, since=None, limit=1000):
+        return await self.db.run(fetch_changes, tables, since, limit)
+
+    async def export(self, table, columns, fmt="csv", dates=None, batch_size=None):
+        # Server-side cursor; the connection goes back to the pool when the stream ends
+        conditions, params = filter_conditions(dates=dates)
+        query = f"SELECT {export_select_list(columns)} FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # The stream checks out its connection once the response has started; a
+        # database that is known to be down is still a 503
+        self.readiness.check()
+        return stream_export(self.db, query, params, fmt)
@@ -0,0 +1,214 @@
+"""
+Per-request query accounting and slow-query capture
+
+Pooled connections are opened with TracedConnection, whose cursors time
+every statement. Each request gets a QueryStats in a context variable, so
+statements are counted against the request that issued them even though
+they run on the database thread pool. With QUERY_DEBUG on (it defaults to
+DEBUG) responses carry the totals:
+
+    X-DB-Queries: 3
+    X-DB-Time-Ms: 4.2
+    Server-Timing: db;dur=4.2;desc="3 queries"
+
+Any statement slower than SLOW_QUERY_MS is logged with its SQL. With
+SLOW_QUERY_EXPLAIN=true the log also carries its EXPLAIN (ANALYZE, BUFFERS)
+plan. ANALYZE runs the statement a second time, inside a savepoint that is
+rolled back so writes are not applied twice, but a slow query then costs
+twice over on a database that is already struggling: turn it on while
+investigating, not by default.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+import psycopg2
+from psycopg2 import extensions
+
+from .metrics import DB_QUERIES, Histogram, current_route
+
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+EXPLAINABLE = ("select", "with", "insert", "update", "delete", "values")
+
+DEBUG = os.getenv("QUERY_DEBUG", os.getenv("DEBUG", "false")).lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "yes")
+
+DB_STATEMENTS = Histogram("lawmox_db_statements_per_request", "Database statements issued per request", ("route",), buckets=STATEMENT_BUCKETS)
+
+
+class QueryStats:
+    """Statement count and database time for one request"""
+
+    __slots__ = ("count", "seconds", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, elapsed):
+        with self._lock:
+            self.count += 1
+            self.seconds += elapsed
+
+
+# Stats of the request being served; None outside requests
+current_queries = ContextVar("current_queries", default=None)
+
+
+def record_query(elapsed, describe=None):
+    """Count one statement (or Supabase round trip) against the current request"""
+    stats = current_queries.get()
+    if stats is not None:
+        stats.add(elapsed)
+    DB_QUERIES.inc(current_route.get())
+    if describe is not None and elapsed * 1000 >= SLOW_QUERY_MS:
+        print(f"Slow query ({elapsed * 1000:.0f} ms, {current_route.get()}): {describe}")
+
+
+def _explain(cursor, sql):
+    """EXPLAIN (ANALYZE, BUFFERS) in a savepoint that is always rolled back"""
+    conn = cursor.connection
+    if conn.autocommit or conn.info.transaction_status != extensions.TRANSACTION_STATUS_INTRANS:
+        return None
+    # A plain cursor: the EXPLAIN itself isn't traced or counted
+    with extensions.cursor(conn) as cur:
+        cur.execute("SAVEPOINT lawmox_explain")
+        try:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql)
+            return "\n".join(row[0] for row in cur.fetchall())
+        except psycopg2.Error as e:
+            return f"(EXPLAIN failed: {str(e).strip()})"
+        finally:
+            cur.execute("ROLLBACK TO SAVEPOINT lawmox_explain")
+            cur.execute("RELEASE SAVEPOINT lawmox_explain")
+
+
+def _log_slow_query(cursor, elapsed):
+    sql = cursor.query.decode(errors="replace") if cursor.query else ""
+    plan = None
+    if SLOW_QUERY_EXPLAIN and sql.lstrip().lower().startswith(EXPLAINABLE):
+        try:
+            plan = _explain(cursor, sql)
+        except psycopg2.Error as e:
+            plan = f"(EXPLAIN failed: {str(e).strip()})"
+    print(f"Slow query ({elapsed * 1000:.0f} ms, {current_route.get()}):\n{sql}" + (f"\n{plan}" if plan else ""))
+
+
+class _TracedCursor:
+    """Mixed into a cursor class to time execute() and executemany()"""
+
+    def _traced(self, method, query, args):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = method(query, args)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            record_query(elapsed)
+            if not failed and elapsed * 1000 >= SLOW_QUERY_MS:
+                _log_slow_query(self, elapsed)
+
+    def execute(self, query, vars=None):
+        return self._traced(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._traced(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(time.perf_counter() - started)
+
+
+_traced_factories = {}
+
+
+def traced_cursor_factory(factory):
+    """The traced subclass of a cursor class (created once per class)"""
+    if issubclass(factory, _TracedCursor):
+        return factory
+    traced = _traced_factories.get(factory)
+    if traced is None:
+        traced = _traced_factories[factory] = type(f"Traced{factory.__name__}", (_TracedCursor, factory), {})
+    return traced
+
+
+class TracedConnection(extensions.connection):
+    """Connection whose cursors, whatever their cursor_factory, are traced"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or extensions.cursor
+        kwargs["cursor_factory"] = traced_cursor_factory(factory)
+        return super().cursor(*args, **kwargs)
+
+
+class QueryAccountingMiddleware:
+    """Pure ASGI middleware: one QueryStats per request, debug headers on the response"""
+
+    def __init__(self, app, debug=None):
+        self.app = app
+        self.debug = DEBUG if debug is None else debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = current_queries.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.debug:
+                ms = f"{stats.seconds * 1000:.1f}"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"x-db-time-ms", ms.encode()),
+                    (b"server-timing", f'db;dur={ms};desc="{stats.count} queries"'.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            DB_STATEMENTS.observe(stats.count, current_route.get())
+            current_queries.reset(token)
+
+
+def assert_max_queries(client, max_queries, method, url, **kwargs):
+    """Issue a request through a TestClient and fail if it ran more than ``max_queries`` statements
+
+        assert_max_queries(client, 2, "GET", "/tasks?limit=50")
+
+    Statements are counted whether or not debug headers are enabled. Returns
+    the response for further assertions.
+    """
+    middleware = _find_middleware(client.app)
+    previous, middleware.debug = middleware.debug, True
+    try:
+        response = client.request(method, url, **kwargs)
+    finally:
+        middleware.debug = previous
+    count = int(response.headers["x-db-queries"])
+    assert count <= max_queries, (
+        f"{method} {url} ran {count} queries (max {max_queries}, {response.headers['x-db-time-ms']} ms)"
+    )
+    return response
+
+
+def _find_middleware(app):
+    # Walk the built middleware stack down to the accounting middleware
+    if getattr(app, "middleware_stack", None) is None:
+        app.middleware_stack = app.build_middleware_stack()
+    layer = app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, QueryAccountingMiddleware):
+            return layer
+        layer = getattr(layer, "app", None)
+    raise LookupError("QueryAccountingMiddleware is not installed on this app")
@@ -0,0 +1,124 @@
+"""
+Background database readiness monitor
+
+Requests never wait for Postgres to come back. While the database is
+unreachable, check() raises DatabaseUnavailable straight away and a single
+background task probes with exponential backoff until it answers again.
+"""
+
+import asyncio
+import math
+import time
+
+import psycopg2
+
+
+class DatabaseUnavailable(Exception):
+    """The database is known to be down; retry after ``retry_after`` seconds"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ReadinessMonitor:
+    def __init__(self, pool, on_ready=None, initial_backoff=0.5, max_backoff=30.0,
+                 check_interval=10.0, probe_timeout=5.0):
+        self.pool = pool
+        # Runs once, off the event loop, after the first successful probe
+        self.on_ready = on_ready
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+
+        self.ready = False
+        self.last_error = "database not checked yet"
+        self.last_change = time.time()
+        self._backoff = initial_backoff
+        self._initialized = False
+        self._task = None
+        self._wakeup = None
+        self._loop = None
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self._backoff))
+
+    def check(self):
+        """Fail fast when the database is known to be unavailable"""
+        if not self.ready:
+            raise DatabaseUnavailable(f"Database unavailable: {self.last_error}", self.retry_after)
+
+    def mark_unavailable(self, error):
+        """Called from request paths that hit a dead connection; safe from any thread"""
+        self._set_unavailable(error)
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _set_unavailable(self, error):
+        was_ready = self.ready
+        self.ready = False
+        self.last_error = str(error).strip() or error.__class__.__name__
+        if was_ready:
+            self.last_change = time.time()
+            self._backoff = self.initial_backoff
+            # Idle connections died with the server; don't hand them out again
+            self.pool.reset()
+
+    def _probe(self):
+        with self.pool.connection(timeout=self.probe_timeout) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        if not self._initialized and self.on_ready is not None:
+            self.on_ready()
+        self._initialized = True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            try:
+                await loop.run_in_executor(None, self._probe)
+            except (psycopg2.Error, OSError) as e:
+                self._set_unavailable(e)
+                delay = self._backoff
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+                print(f"Database not ready ({self.last_error}); retrying in {delay:g}s")
+            except Exception as e:
+                # e.g. PoolTimeout: the database is up but saturated
+                self.last_error = str(e)
+                delay = self.check_interval
+            else:
+                if not self.ready:
+                    print("Database ready")
+                    self.last_change = time.time()
+                self.ready = True
+                self._backoff = self.initial_backoff
+                delay = self.check_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self):
+        return {
+            "status": "ready" if self.ready else "unavailable",
+            "error": None if self.ready else self.last_error,
+            "since": self.last_change,
+        }
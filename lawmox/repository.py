@@ -0,0 +1,332 @@
+"""
+Storage engines behind the API
+
+lawmox.app talks to a Repository, never to a driver, so every endpoint and
+every performance fix exists once. STORAGE picks the engine:
+
+    postgres       Postgres on PGHOST/PGPORT/PGDATABASE/PGUSER/PGPASSWORD
+                   (defaults: the single-container database)
+    database_url   Postgres at DATABASE_URL (Render, managed Postgres)
+    supabase       Supabase's REST API at SUPABASE_URL with SUPABASE_SERVICE_KEY
+    memory         Plain dicts in this process, for tests and benchmarks
+
+Without STORAGE, database_url is used when DATABASE_URL is set and postgres
+otherwise. Rows cross the interface as dicts (single rows) or as column
+names plus tuples (list pages), already over-fetched by one row for
+paginate_tuples(). Filters are given as column -> value equalities plus a
+DateRange, and each engine turns them into SQL, PostgREST parameters or a
+Python predicate.
+
+The base class implements the nested dashboard, bulk writes and exports on
+top of the primitive operations. The dashboard and the duplicate and
+reference checks of bulk writes take a constant number of calls, but the
+writes themselves are one insert or update per row and exports one page per
+batch: fine for the memory engine, which has no round trips. Postgres and
+Supabase override the bulk writes (COPY, one batched request) and Postgres
+the dashboard (json_agg) and exports (a server-side cursor).
+"""
+
+import asyncio
+import csv
+import io
+import os
+import time
+from uuid import UUID
+
+from .events import ChangeBroker
+from .pagination import encode_cursor
+from .serialize import dumps
+
+ENGINES = ("postgres", "database_url", "supabase", "memory")
+
+# Columns the API reads and writes, per table
+COLUMNS = {
+    "entities": ("id", "entity_name", "ein", "date_of_formation", "registered_address", "state_of_formation",
+                 "entity_type", "status", "created_at", "updated_at"),
+    "accounts": ("id", "account_name", "username", "encrypted_password", "entity_id", "login_url", "account_type",
+                 "notes", "created_at", "updated_at"),
+    "tasks": ("id", "task_name", "description", "status", "entity_id", "account_id", "deadline", "priority",
+              "created_at", "updated_at"),
+    "task_steps": ("id", "step_name", "description", "status", "task_id", "created_at", "updated_at"),
+}
+
+# Never returned by the API
+PRIVATE_COLUMNS = {"accounts": ("encrypted_password",)}
+
+EXPORT_BATCH_SIZE = 5000
+
+
+class Unsupported(Exception):
+    """The configured storage engine cannot serve this endpoint"""
+
+
+class StorageError(ValueError):
+    """A write the storage rejected: constraint violation, bad reference or bad value"""
+
+
+def date_bounds(dates):
+    """(column, operator, value) for the bounds a DateRange sets"""
+    if dates is None:
+        return []
+    bounds = (
+        ("created_at", ">=", dates.created_after),
+        ("created_at", "<", dates.created_before),
+        ("updated_at", ">=", dates.updated_after),
+        ("updated_at", "<", dates.updated_before),
+    )
+    return [bound for bound in bounds if bound[2] is not None]
+
+
+def given(equals):
+    """Equality filters that were actually passed, UUIDs as text"""
+    return {column: str(value) if isinstance(value, UUID) else value
+            for column, value in (equals or {}).items() if value is not None}
+
+
+def public_columns(table):
+    return [column for column in COLUMNS[table] if column not in PRIVATE_COLUMNS.get(table, ())]
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class Repository:
+    """What the API needs from storage"""
+
+    name = "abstract"
+
+    def __init__(self):
+        # Engines without database notifications publish their own writes
+        self.broker = ChangeBroker()
+
+    # Lifecycle and health
+
+    def start(self):
+        """Called on the event loop at startup"""
+
+    async def close(self):
+        """Called at shutdown"""
+
+    def check(self):
+        """Raise DatabaseUnavailable when requests should fail fast"""
+
+    @property
+    def ready(self):
+        return True
+
+    @property
+    def retry_after(self):
+        return 1
+
+    def status(self):
+        return {"status": "ready", "error": None, "since": None}
+
+    def stats(self):
+        return {"events": self.broker.stats()}
+
+    async def warm_up(self, timeout):
+        """Reach the storage and read every table once before taking traffic.
+
+        Gives up after ``timeout`` seconds; requests then fail fast as usual.
+        """
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._warm_up(), timeout)
+        except Exception as e:
+            print(f"Warm-up incomplete ({str(e) or e.__class__.__name__}); serving anyway")
+        else:
+            print(f"Warmed up in {(time.monotonic() - started) * 1000:.0f} ms")
+
+    async def _warm_up(self):
+        # Connections, the query path and the encoders, one small read per table
+        for table in COLUMNS:
+            await self.version(table)
+            await self.page(table, None, limit=1)
+
+    def publish(self, table, op, row_id):
+        # Same payload as the Postgres NOTIFY triggers
+        self.broker.publish({"type": "change", "table": table, "op": op, "id": row_id})
+
+    # Primitive operations every engine implements
+
+    async def version(self, table, equals=None, dates=None):
+        """(row count, latest updated_at) of the filtered rows, or None to tag pages by content"""
+        raise NotImplementedError
+
+    async def page(self, table, columns, cursor=None, limit=100, sort="-created_at", equals=None, dates=None):
+        """(column names, tuple rows) of one keyset page plus one extra row.
+
+        ``columns`` None means all public columns; the sort column and id are
+        always included for the cursor.
+        """
+        raise NotImplementedError
+
+    async def get(self, table, row_id, columns=None):
+        """One row's ``columns`` (all public columns when None), or None"""
+        raise NotImplementedError
+
+    async def related(self, table, column, values, columns=None, sort="-created_at"):
+        """Rows whose ``column`` is one of ``values`` (all public columns by default)
+
+        ``sort=None`` leaves them unordered: an existence check on an indexed
+        column is then an index-only scan, with no table rows to read for the sort.
+        """
+        raise NotImplementedError
+
+    async def insert(self, table, values, columns):
+        """Insert one row and return ``columns`` of it"""
+        raise NotImplementedError
+
+    async def update(self, table, row_id, values, columns):
+        """Update one row (bumping updated_at); None if it doesn't exist"""
+        raise NotImplementedError
+
+    async def delete(self, table, row_id):
+        """True if the row existed"""
+        raise NotImplementedError
+
+    # Composite operations, built on the primitives
+
+    async def entity_full(self, entity_id):
+        """One entity with its accounts and its tasks with their steps nested"""
+        entity = await self.get("entities", str(entity_id), None)
+        if entity is None:
+            return None
+        return (await self._nest([entity]))[0]
+
+    async def dashboard(self, cursor=None, limit=25, sort="-created_at", equals=None, dates=None):
+        """A page (plus one extra row) of entities with their children nested"""
+        columns, rows = await self.page("entities", None, cursor, limit, sort, equals, dates)
+        return await self._nest([dict(zip(columns, row)) for row in rows])
+
+    async def _nest(self, entities):
+        # Three more calls for the whole page, not three per entity
+        ids = [entity["id"] for entity in entities]
+        accounts = await self.related("accounts", "entity_id", ids) if ids else []
+        tasks = await self.related("tasks", "entity_id", ids) if ids else []
+        task_ids = [task["id"] for task in tasks]
+        steps = await self.related("task_steps", "task_id", task_ids, sort="created_at") if task_ids else []
+        by_task = {task_id: [] for task_id in task_ids}
+        for step in steps:
+            by_task[step["task_id"]].append(step)
+        by_entity = {entity_id: ([], []) for entity_id in ids}
+        for account in accounts:
+            by_entity[account["entity_id"]][0].append(account)
+        for task in tasks:
+            by_entity[task["entity_id"]][1].append({**task, "steps": by_task[task["id"]]})
+        return [{**entity, "accounts": by_entity[entity["id"]][0], "tasks": by_entity[entity["id"]][1]}
+                for entity in entities]
+
+    async def bulk_upsert(self, table, columns, column_types, rows, conflict_column):
+        """Insert ``rows`` from validate_rows(), updating rows whose ``conflict_column`` exists.
+
+        Returns (inserted, updated).
+        """
+        key = columns.index(conflict_column) + 1
+        existing = await self.related(table, conflict_column, [row[key] for row in rows if row[key] is not None], ("id", conflict_column))
+        ids = {row[conflict_column]: row["id"] for row in existing}
+        inserted = updated = 0
+        for row in rows:
+            values = dict(zip(columns, row[1:]))
+            if row[key] in ids:
+                await self.update(table, ids[row[key]], values, ("id",))
+                updated += 1
+            else:
+                await self.insert(table, values, ("id",))
+                inserted += 1
+        return inserted, updated
+
+    async def bulk_insert(self, table, columns, rows, conflict_column, returning, references=None):
+        """Insert ``rows`` from validate_rows(), skipping ``conflict_column`` clashes.
+
+        ``references`` is (column, table): rows pointing at a missing row are
+        rejected too. Returns (inserted rows, errors).
+        """
+        rows, errors = await self._check_references(columns, rows, references)
+        key = columns.index(conflict_column) + 1
+        taken = {row[conflict_column] for row in await self.related(table, conflict_column, [row[key] for row in rows], (conflict_column,), None)}
+        created = []
+        for row in rows:
+            if row[key] in taken:
+                errors.append({"row": row[0], "error": f"{conflict_column}: {row[key]} already exists"})
+                continue
+            created.append(await self.insert(table, dict(zip(columns, row[1:])), returning))
+            taken.add(row[key])
+        return created, sorted(errors, key=lambda error: error["row"])
+
+    async def _check_references(self, columns, rows, references):
+        if references is None:
+            return rows, []
+        column, table = references
+        index = columns.index(column) + 1
+        wanted = list({str(row[index]) for row in rows if row[index] is not None})
+        found = {row["id"] for row in await self.related(table, "id", wanted, ("id",), None)} if wanted else set()
+        kept, errors = [], []
+        for row in rows:
+            if row[index] is not None and str(row[index]) not in found:
+                errors.append({"row": row[0], "error": f"{column}: no {table} row with id {row[index]}"})
+            else:
+                kept.append(row)
+        return kept, errors
+
+    async def changes(self, tables, since=None, limit=1000):
+        raise Unsupported(f"The {self.name} storage engine has no change feed")
+
+    async def export(self, table, columns, fmt="csv", dates=None, batch_size=EXPORT_BATCH_SIZE):
+        """Async iterator of CSV / NDJSON chunks of ``columns`` for an ExportResponse"""
+        return self._export_pages(table, columns, fmt, dates, batch_size)
+
+    async def _export_pages(self, table, columns, fmt, dates, batch_size):
+        # One keyset page at a time, so memory stays flat
+        cursor = None
+        if fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf).writerow(columns)
+            yield buf.getvalue().encode()
+        while True:
+            names, rows = await self.page(table, columns, cursor, batch_size, "created_at", dates=dates)
+            page = rows[:batch_size]
+            if fmt == "csv":
+                buf = io.StringIO()
+                csv.writer(buf).writerows([_csv_value(row[names.index(name)]) for name in columns] for row in page)
+                yield buf.getvalue().encode()
+            else:
+                yield b"".join(dumps({name: row[names.index(name)] for name in columns}) + b"\n" for row in page)
+            if len(rows) <= batch_size:
+                break
+            cursor = encode_cursor(dict(zip(names, page[-1])), "created_at")
+
+
+def storage_engine():
+    """The engine name STORAGE selects, or its default"""
+    engine = os.getenv("STORAGE") or ("database_url" if os.getenv("DATABASE_URL") else "postgres")
+    if engine not in ENGINES:
+        raise ValueError(f"STORAGE must be one of {', '.join(ENGINES)}, not {engine!r}")
+    return engine
+
+
+def repository_from_env():
+    """The storage engine STORAGE names (see the module docstring)"""
+    engine = storage_engine()
+    if engine == "memory":
+        from .memory import MemoryRepository
+        return MemoryRepository()
+    if engine == "supabase":
+        from .supabase_rest import SupabaseRepository
+        return SupabaseRepository.from_env()
+    from .postgres import PostgresRepository
+    if engine == "database_url":
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise ValueError("STORAGE=database_url needs DATABASE_URL")
+        return PostgresRepository(database_url)
+    return PostgresRepository(
+        host=os.getenv("PGHOST", "localhost"),
+        port=os.getenv("PGPORT", "5432"),
+        database=os.getenv("PGDATABASE", "lawmox_entity_tracker"),
+        user=os.getenv("PGUSER", "lawmox_user"),
+        password=os.getenv("PGPASSWORD", "lawmox_password"),
+    )
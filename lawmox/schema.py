@@ -0,0 +1,232 @@
+"""
+Indexes backing the list endpoints' orderings and filters, the triggers and
+tombstone table behind the change feed, and the NOTIFY triggers behind
+live change events
+"""
+
+# (table, sort/sortable columns, equality filter columns)
+_LIST_QUERIES = {
+    "entities": (("updated_at", "entity_name"), ("status", "state_of_formation", "entity_type")),
+    "accounts": (("updated_at", "account_name"), ("entity_id",)),
+    "tasks": (("updated_at", "task_name"), ("entity_id", "status")),
+    "task_steps": (("updated_at", "step_name"), ("task_id", "status")),
+}
+
+
+def create_index(name, table, columns, where=None, concurrently=False):
+    """CREATE INDEX statement for one entry of INDEXES"""
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} ON {table} ({columns})"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
+def _indexes():
+    indexes = []
+    for table, (sort_columns, filter_columns) in _LIST_QUERIES.items():
+        # Default order: created_at DESC, id DESC (keyset pagination)
+        indexes.append((f"idx_{table}_created_at_id", table, "created_at DESC, id DESC"))
+        for column in sort_columns:
+            indexes.append((f"idx_{table}_{column}_id", table, f"{column}, id"))
+        for column in filter_columns:
+            indexes.append((f"idx_{table}_{column}_created_at_id", table, f"{column}, created_at DESC, id DESC"))
+    return indexes
+
+
+# (name, table, columns[, where])
+INDEXES = _indexes()
+
+# Low-cardinality filters: a page's (column, created_at, id) index is too wide
+# for the planner to count most of a table through it
+_VERSION_FILTERS = {
+    "entities": ("status", "entity_type"),
+    "tasks": ("status",),
+    "task_steps": ("status",),
+}
+
+
+def _version_indexes():
+    # count(*) and max(updated_at) behind list ETags, as index-only scans
+    indexes = [(f"idx_{table}_updated_at", table, "updated_at") for table in _LIST_QUERIES]
+    for table, columns in _VERSION_FILTERS.items():
+        for column in columns:
+            indexes.append((f"idx_{table}_{column}_updated_at", table, f"{column}, updated_at"))
+    return indexes
+
+
+VERSION_INDEXES = _version_indexes()
+
+# Predicates only a small share of a table matches, indexed over that share
+PARTIAL_INDEXES = [
+    # ?sort=deadline pages through the tasks that have a deadline
+    ("idx_tasks_deadline_id", "tasks", "deadline, id", "deadline IS NOT NULL"),
+    # Active tasks by deadline (?status=pending&sort=deadline): finished tasks pile up, open ones don't
+    ("idx_tasks_open_deadline_id", "tasks", "status, deadline, id", "deadline IS NOT NULL AND status <> 'completed'"),
+    # Deleting an account sets its tasks' account_id to NULL (ON DELETE SET NULL)
+    ("idx_tasks_account_id", "tasks", "account_id", "account_id IS NOT NULL"),
+]
+
+# database_schema.sql numbers each task's steps; the next number is the
+# task's highest step_order (SupabaseRepository._next_step_order)
+STEP_ORDER_INDEXES = [("idx_task_steps_task_id_step_order", "task_steps", "task_id, step_order")]
+
+
+CHANGE_FEED_TABLES = ("entities", "accounts", "tasks", "task_steps")
+
+
+def _change_feed_ddl():
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS tombstones (
+            table_name TEXT NOT NULL,
+            row_id UUID NOT NULL,
+            deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_tombstones_deleted_at_row_id ON tombstones (deleted_at, row_id)",
+        """
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql'
+        """,
+        """
+        CREATE OR REPLACE FUNCTION record_tombstone()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO tombstones (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+            RETURN OLD;
+        END;
+        $$ language 'plpgsql'
+        """,
+    ]
+    for table in CHANGE_FEED_TABLES:
+        statements += [
+            f"DROP TRIGGER IF EXISTS update_{table}_updated_at ON {table}",
+            f"CREATE TRIGGER update_{table}_updated_at BEFORE UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()",
+            f"DROP TRIGGER IF EXISTS record_{table}_tombstone ON {table}",
+            f"CREATE TRIGGER record_{table}_tombstone AFTER DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION record_tombstone()",
+        ]
+    return statements
+
+
+CHANGE_FEED_DDL = _change_feed_ddl()
+
+
+def _commit_order_ddl():
+    # Rows and tombstones record the writing transaction's id. updated_at is the
+    # transaction's start time, so it can commit out of order; the change feed
+    # pages by xid instead and stops below the oldest transaction still running.
+    # Existing rows get xid 1 without a table rewrite (constant default first).
+    statements = [
+        "ALTER TABLE tombstones ADD COLUMN IF NOT EXISTS xid xid8 NOT NULL DEFAULT '1'",
+        "ALTER TABLE tombstones ALTER COLUMN xid SET DEFAULT pg_current_xact_id()",
+        """
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            NEW.changed_xid = pg_current_xact_id();
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql'
+        """,
+    ]
+    for table in CHANGE_FEED_TABLES:
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS changed_xid xid8 NOT NULL DEFAULT '1'",
+            f"ALTER TABLE {table} ALTER COLUMN changed_xid SET DEFAULT pg_current_xact_id()",
+        ]
+    return statements
+
+
+COMMIT_ORDER_DDL = _commit_order_ddl()
+
+# The change feed's (xid, id) order
+COMMIT_ORDER_INDEXES = [(f"idx_{table}_changed_xid_id", table, "changed_xid, id") for table in CHANGE_FEED_TABLES] + [
+    ("idx_tombstones_xid_row_id", "tombstones", "xid, row_id"),
+]
+
+
+def _notify_ddl(channel="lawmox_changes"):
+    statements = [
+        f"""
+        CREATE OR REPLACE FUNCTION notify_change()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            changed RECORD;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed := OLD;
+            ELSE
+                changed := NEW;
+            END IF;
+            PERFORM pg_notify('{channel}', json_build_object(
+                'table', TG_TABLE_NAME, 'op', lower(TG_OP), 'id', changed.id
+            )::text);
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql'
+        """,
+    ]
+    for table in CHANGE_FEED_TABLES:
+        statements += [
+            f"DROP TRIGGER IF EXISTS notify_{table}_change ON {table}",
+            f"CREATE TRIGGER notify_{table}_change AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION notify_change()",
+        ]
+    return statements
+
+
+NOTIFY_DDL = _notify_ddl()
+
+
+def _statement_notify_ddl(channel="lawmox_changes"):
+    # One NOTIFY per statement and table instead of one per row: a bulk import
+    # of 100k rows no longer queues 100k notifications in the committing
+    # transaction. A single row keeps the {"table", "op", "id"} event; larger
+    # statements send {"table", "op", "count"} and subscribers reload.
+    # Transition tables allow one event per trigger, hence three triggers each.
+    statements = [
+        f"""
+        CREATE OR REPLACE FUNCTION notify_changes()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            changed_count BIGINT;
+            changed_id UUID;
+        BEGIN
+            SELECT count(*) INTO changed_count FROM changed_rows;
+            IF changed_count = 1 THEN
+                SELECT id INTO changed_id FROM changed_rows;
+                PERFORM pg_notify('{channel}', json_build_object(
+                    'table', TG_TABLE_NAME, 'op', lower(TG_OP), 'id', changed_id
+                )::text);
+            ELSIF changed_count > 1 THEN
+                PERFORM pg_notify('{channel}', json_build_object(
+                    'table', TG_TABLE_NAME, 'op', lower(TG_OP), 'count', changed_count
+                )::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql'
+        """,
+    ]
+    for table in CHANGE_FEED_TABLES:
+        statements.append(f"DROP TRIGGER IF EXISTS notify_{table}_change ON {table}")
+        for op, transition in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            statements += [
+                f"DROP TRIGGER IF EXISTS notify_{table}_{op} ON {table}",
+                f"CREATE TRIGGER notify_{table}_{op} AFTER {op.upper()} ON {table} "
+                f"REFERENCING {transition} TABLE AS changed_rows "
+                "FOR EACH STATEMENT EXECUTE FUNCTION notify_changes()",
+            ]
+    statements.append("DROP FUNCTION IF EXISTS notify_change()")
+    return statements
+
+
+STATEMENT_NOTIFY_DDL = _statement_notify_ddl()
@@ -0,0 +1,105 @@
+"""
+Fast JSON path for list responses
+
+The list endpoints select exactly the response model's columns (or the
+?fields= subset of them), fetch plain tuples and encode them straight to
+bytes. Postgres already enforces the
+column types the models declare (uuid, text, date, timestamptz), so rows
+are not validated again through Pydantic, and FastAPI's response_model pass
+is skipped by returning the encoded Response. orjson is used when installed,
+the stdlib json module otherwise.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import PlainSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .pagination import encode_cursor, parse_sort
+
+
+class InvalidFields(ValueError):
+    """?fields= named something the response model doesn't have"""
+
+
+def model_fields(model):
+    return list(getattr(model, "model_fields", None) or model.__fields__)
+
+
+def parse_fields(model, fields=None):
+    """Validate a comma-separated ?fields= value; returns names in model order"""
+    names = model_fields(model)
+    if not fields:
+        return names
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(wanted - set(names))
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(names)})")
+    return [name for name in names if name in wanted]
+
+
+def select_list(fields, *required):
+    """SELECT column list for ``fields`` plus columns the server itself needs"""
+    return ", ".join(list(fields) + [name for name in required if name not in fields])
+
+
+def page_columns(fields, sort="-created_at"):
+    """select_list() for a keyset page: the cursor needs the sort column and id"""
+    column, _ = parse_sort(sort)
+    return select_list(fields, column, "id")
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Response-model type for timestamps. Pydantic writes UTC as "Z"; this keeps
+# created/updated responses in the "+00:00" form the list fast path, the caches
+# and the exports write, so clients see one format for the same row
+Timestamp = Annotated[datetime, PlainSerializer(_default, return_type=str, when_used="json")]
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode()
+
+
+def paginate_tuples(columns, rows, limit, sort="-created_at"):
+    """paginate() for tuple rows"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        column, _ = parse_sort(sort)
+        last = rows[-1]
+        return rows, encode_cursor({column: last[columns.index(column)], "id": last[columns.index("id")]}, sort)
+    return rows, None
+
+
+def page_data(columns, rows, next_cursor=None, fields=None, columnar=False):
+    """Tuple rows as a Page, or as one list per column; ``fields`` drops columns fetched only for the cursor"""
+    if fields is None:
+        fields = columns
+    picks = [(name, columns.index(name)) for name in fields]
+    if columnar:
+        return {"columns": list(fields), "data": [[row[index] for row in rows] for _, index in picks], "next_cursor": next_cursor}
+    if len(fields) == len(columns):
+        items = [dict(zip(columns, row)) for row in rows]
+    else:
+        items = [{name: row[index] for name, index in picks} for row in rows]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def encode_page(columns, rows, next_cursor=None, fields=None):
+    return dumps(page_data(columns, rows, next_cursor, fields))
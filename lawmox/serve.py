@@ -0,0 +1,242 @@
+"""
+Multi-process server: one uvicorn worker per CPU on a shared socket
+
+    python -m lawmox.serve backend.app:app --port 8991
+
+The supervisor binds the port once and starts WEB_CONCURRENCY workers
+(default: the CPUs this process may use, cgroup quota included). Each
+worker imports the app itself and calls accept() only after its startup,
+which warms the storage engine (see WARMUP_TIMEOUT in lawmox.app), so
+connections queue in the kernel instead of reaching a cold worker.
+
+DB_MAX_CONNECTIONS is the Postgres connection budget for the whole
+service. Every worker gets an equal share, less one for its LISTEN
+connection, as DB_POOL_MAX_SIZE; one spare share covers the extra worker
+alive during a reload. With Postgres storage the worker count is capped so
+each pool keeps at least MIN_POOL_SIZE connections.
+
+SIGHUP reloads without dropping requests: workers are replaced one at a
+time, each new one warmed up before its predecessor is sent SIGTERM and
+finishes its in-flight requests (up to GRACEFUL_TIMEOUT seconds; long-lived
+/events streams are then closed and the browser reconnects). If a new
+worker fails to start, the reload stops and the old workers keep serving.
+Workers that die are restarted; SIGTERM or SIGINT stops everything.
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+
+import uvicorn
+from cryptography.fernet import Fernet
+
+from .repository import storage_engine
+
+DEFAULT_DB_MAX_CONNECTIONS = 40
+# One long /export or bulk request must not starve a worker's other requests
+MIN_POOL_SIZE = 2
+# Importing the app and running migrations, on top of the warm-up itself
+STARTUP_ALLOWANCE = 60
+RESTART_DELAY = 1.0
+
+
+def available_cpus():
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def max_workers(budget):
+    """Most workers ``budget`` connections serve with MIN_POOL_SIZE each, plus the reload spare"""
+    # Each worker also holds one LISTEN connection for /events
+    return max(1, budget // (MIN_POOL_SIZE + 1) - 1)
+
+
+def pool_size(budget, workers, requested=None):
+    """Per-worker DB_POOL_MAX_SIZE that keeps ``workers`` + 1 processes within ``budget``"""
+    share = max(MIN_POOL_SIZE, budget // (workers + 1) - 1)
+    return share if requested is None else min(share, requested)
+
+
+def worker_count(workers=None, budget=DEFAULT_DB_MAX_CONNECTIONS, postgres=True):
+    """``workers``, else WEB_CONCURRENCY, else one per CPU; Postgres engines stay within ``budget``"""
+    requested = workers or int(os.getenv("WEB_CONCURRENCY", 0))
+    workers = requested or available_cpus()
+    if postgres and workers > max_workers(budget):
+        if requested:
+            print(f"DB_MAX_CONNECTIONS={budget} leaves fewer than {MIN_POOL_SIZE} connections per worker "
+                  f"for {workers} workers; starting {max_workers(budget)}")
+        workers = max_workers(budget)
+    return workers
+
+
+def configure(workers, budget=DEFAULT_DB_MAX_CONNECTIONS):
+    """Environment the workers inherit: pool size, crypto processes, cache and key"""
+    requested = os.getenv("DB_POOL_MAX_SIZE")
+    maxconn = pool_size(budget, workers, int(requested) if requested else None)
+    os.environ["DB_POOL_MAX_SIZE"] = str(maxconn)
+    os.environ["DB_POOL_MIN_SIZE"] = str(min(int(os.getenv("DB_POOL_MIN_SIZE", 1)), maxconn))
+    # The workers already use every core; bulk encryption gets what is left over
+    spare = available_cpus() // workers
+    os.environ.setdefault("CRYPTO_WORKERS", str(spare if spare > 1 else 0))
+    print(f"{workers} workers, up to {maxconn} database connections each (budget {budget})")
+    if storage_engine() == "memory" and workers > 1:
+        print("STORAGE=memory keeps separate data in every worker")
+    if workers > 1 and not os.getenv("CACHE_URL") and float(os.getenv("CACHE_TTL", 30)) > 0:
+        # A write only clears the cache of the worker that served it
+        os.environ["CACHE_TTL"] = "0"
+        print("Response cache off: set CACHE_URL so workers share one cache and its invalidations")
+    if not os.getenv("ENCRYPTION_KEY"):
+        # One key for every worker and reload; a per-worker random key could not
+        # decrypt passwords another worker stored
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+        print("ENCRYPTION_KEY is not set; account passwords stored now are unreadable after a restart")
+
+
+class _WorkerServer(uvicorn.Server):
+    def __init__(self, config, ready):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets=None):
+        # The app's startup (and its warm-up) has run and the socket is being served
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.ready.set()
+
+
+def _run_worker(config, sock, ready):
+    config.configure_logging()
+    _WorkerServer(config, ready).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, config, workers, ready_timeout, graceful_timeout):
+        self.config = config
+        self.workers = workers
+        self.ready_timeout = ready_timeout
+        self.graceful_timeout = graceful_timeout
+        # spawn: every worker imports the current code, so a reload picks up changes
+        self.context = multiprocessing.get_context("spawn")
+        self.processes = []
+        self.sock = None
+        self.should_exit = False
+        self.should_reload = False
+
+    def _signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self.should_reload = True
+        else:
+            self.should_exit = True
+
+    def _spawn(self):
+        """A new worker once it is serving, or None if it failed to get there"""
+        started = time.monotonic()
+        ready = self.context.Event()
+        process = self.context.Process(target=_run_worker, args=(self.config, self.sock, ready), name="lawmox-worker")
+        process.start()
+        while not ready.wait(0.1):
+            if self.should_exit or not process.is_alive() or time.monotonic() - started > self.ready_timeout:
+                print(f"Worker {process.pid} did not start")
+                self._stop([process])
+                return None
+        print(f"Worker {process.pid} serving after {time.monotonic() - started:.1f}s")
+        return process
+
+    def _stop(self, processes):
+        # uvicorn finishes in-flight requests on SIGTERM, for up to graceful_timeout
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def _reload(self):
+        print(f"Reloading {len(self.processes)} workers")
+        for old in list(self.processes):
+            if self.should_exit:
+                return
+            new = self._spawn()
+            if new is None:
+                print("Reload aborted; the remaining workers keep serving")
+                return
+            self.processes[self.processes.index(old)] = new
+            self._stop([old])
+        print("Reload complete")
+
+    def _restart_dead(self):
+        for process in list(self.processes):
+            if process.is_alive() or self.should_exit:
+                continue
+            print(f"Worker {process.pid} exited with {process.exitcode}; restarting")
+            time.sleep(RESTART_DELAY)
+            new = self._spawn()
+            if new is not None:
+                self.processes[self.processes.index(process)] = new
+
+    def run(self):
+        """Serve until SIGTERM/SIGINT; returns the exit status"""
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._signal)
+        self.sock = self.config.bind_socket()
+        try:
+            for _ in range(self.workers):
+                process = self._spawn()
+                if process is None:
+                    return 1
+                self.processes.append(process)
+            while not self.should_exit:
+                wait([process.sentinel for process in self.processes], timeout=0.5)
+                if self.should_reload:
+                    self.should_reload = False
+                    self._reload()
+                self._restart_dead()
+            return 0
+        finally:
+            print(f"Stopping {len(self.processes)} workers")
+            self._stop(self.processes)
+            self.sock.close()
+
+
+def serve(app, host="0.0.0.0", port=8000, workers=None, **uvicorn_kwargs):
+    """Run ``app`` (an import string such as "backend.app:app") in several worker processes"""
+    budget = int(os.getenv("DB_MAX_CONNECTIONS", DEFAULT_DB_MAX_CONNECTIONS))
+    workers = worker_count(workers, budget, postgres=storage_engine() in ("postgres", "database_url"))
+    configure(workers, budget)
+    graceful_timeout = float(os.getenv("GRACEFUL_TIMEOUT", 10))
+    ready_timeout = float(os.getenv("WARMUP_TIMEOUT", 30)) + STARTUP_ALLOWANCE
+    config = uvicorn.Config(app, host=host, port=port, timeout_graceful_shutdown=graceful_timeout, **uvicorn_kwargs)
+    return Supervisor(config, workers, ready_timeout, graceful_timeout).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("app", nargs="?", default="lawmox.app:app", help="Import string of the ASGI app")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, help="Default: WEB_CONCURRENCY, else the available CPUs")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    raise SystemExit(serve(args.app, args.host, args.port, args.workers, log_level=args.log_level))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Supabase storage engine: PostgREST over a keep-alive async client
+
+One httpx.AsyncClient is shared by every request so TCP/TLS connections to
+Supabase are kept alive and reused. SupabaseRepository maps the API's
+columns onto database_schema.sql (task_title, password_encrypted, steps
+with step_order and a completed flag) and filters, pages and nests with
+PostgREST query parameters, so every call is a constant number of round
+trips.
+"""
+
+import os
+import time
+
+import httpx
+
+from .pagination import NULLABLE_SORTS, decode_cursor, parse_sort
+from .queries import record_query
+from .repository import Repository, date_bounds, given, public_columns
+
+
+class SupabaseError(Exception):
+    """PostgREST answered with an error status"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SupabaseRest:
+    def __init__(self, url, key, max_connections=20, max_keepalive=10, timeout=10.0):
+        self.client = httpx.AsyncClient(
+            base_url=url.rstrip("/") + "/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=timeout,
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Build a client from SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_KEY)"""
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+        if not url or not key:
+            return None
+        return cls(
+            url,
+            key,
+            max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20)),
+            max_keepalive=int(os.getenv("SUPABASE_MAX_KEEPALIVE", 10)),
+            timeout=float(os.getenv("SUPABASE_TIMEOUT", 10)),
+        )
+
+    async def request(self, method, table, params=None, json=None, prefer=None):
+        headers = {"Prefer": prefer} if prefer else None
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"/{table}", params=params, json=json, headers=headers)
+        finally:
+            record_query(time.perf_counter() - started, f"{method} /{table}")
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message") or response.text
+            except ValueError:
+                message = response.text
+            raise SupabaseError(response.status_code, message)
+        if not response.content:
+            return []
+        return response.json()
+
+    async def select(self, table, params):
+        return await self.request("GET", table, params=params)
+
+    async def insert(self, table, rows):
+        return await self.request("POST", table, json=rows, prefer="return=representation")
+
+    async def update(self, table, data, params):
+        return await self.request("PATCH", table, params=params, json=data, prefer="return=representation")
+
+    async def delete(self, table, params):
+        return await self.request("DELETE", table, params=params, prefer="return=representation")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+# API column -> column in database_schema.sql, where the names differ
+# (None: the Supabase table has no such column and it reads as null)
+SUPABASE_COLUMNS = {
+    "accounts": {"encrypted_password": "password_encrypted"},
+    "tasks": {"task_name": "task_title"},
+    "task_steps": {"step_name": "step_description", "status": "completed", "description": None, "updated_at": "created_at"},
+}
+
+# Values stored differently: (to Supabase, from Supabase)
+SUPABASE_VALUES = {
+    ("task_steps", "status"): (lambda status: status == "completed", lambda completed: "completed" if completed else "pending"),
+}
+
+_OPERATORS = {"=": "eq", ">=": "gte", "<": "lt", ">": "gt"}
+
+
+def _quote(value):
+    # Double-quoted, so commas and parentheses in values don't break the filter syntax
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class SupabaseRepository(Repository):
+    """Storage engine over PostgREST, against the tables in database_schema.sql
+
+    Every operation is one round trip (inserting a task step is two: its
+    step_order comes first). Supabase pages have no cheap version query, so
+    they are tagged by content, and there is no change feed; /events carries
+    the writes made through this process.
+    """
+
+    name = "supabase"
+
+    def __init__(self, rest):
+        super().__init__()
+        self.rest = rest
+
+    @classmethod
+    def from_env(cls):
+        rest = SupabaseRest.from_env()
+        if rest is None:
+            raise ValueError("STORAGE=supabase needs SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_KEY)")
+        return cls(rest)
+
+    async def close(self):
+        await self.rest.close()
+
+    def _column(self, table, column):
+        return SUPABASE_COLUMNS.get(table, {}).get(column, column)
+
+    def _select(self, table, columns):
+        names = []
+        for column in columns:
+            stored = self._column(table, column)
+            if stored is not None:
+                names.append(column if stored == column else f"{column}:{stored}")
+        return ",".join(names)
+
+    def _to_supabase(self, table, values):
+        row = {}
+        for column, value in values.items():
+            stored = self._column(table, column)
+            if stored is None:
+                continue
+            convert = SUPABASE_VALUES.get((table, column))
+            row[stored] = convert[0](value) if convert else value.isoformat() if hasattr(value, "isoformat") else value
+        return row
+
+    def _from_supabase(self, table, row, columns):
+        result = {}
+        for column in columns:
+            value = row.get(column)
+            convert = SUPABASE_VALUES.get((table, column))
+            result[column] = convert[1](value) if convert else value
+        return result
+
+    def _condition(self, table, column, op, value):
+        convert = SUPABASE_VALUES.get((table, column))
+        if convert:
+            value = convert[0](value)
+        return f"{self._column(table, column)}.{_OPERATORS[op]}.{_quote(value)}"
+
+    def _filters(self, table, equals=None, dates=None):
+        conditions = [self._condition(table, column, "=", value) for column, value in given(equals).items()]
+        conditions += [self._condition(table, column, op, value) for column, op, value in date_bounds(dates)]
+        return {"and": f"({','.join(conditions)})"} if conditions else {}
+
+    async def _select_rows(self, table, columns, params):
+        rows = await self.rest.select(table, {**params, "select": self._select(table, columns)})
+        return [self._from_supabase(table, row, columns) for row in rows]
+
+    async def version(self, table, equals=None, dates=None):
+        return None
+
+    async def page(self, table, columns, cursor=None, limit=100, sort="-created_at", equals=None, dates=None):
+        column, descending = parse_sort(sort)
+        direction = "desc" if descending else "asc"
+        names = public_columns(table) if columns is None else list(columns) + [name for name in (column, "id") if name not in columns]
+        params = self._filters(table, equals, dates)
+        stored = self._column(table, column)
+        if column in NULLABLE_SORTS:
+            params[stored] = "not.is.null"
+        params["order"] = f"{stored}.{direction},id.{direction}"
+        params["limit"] = str(limit + 1)
+        if cursor:
+            value, row_id = decode_cursor(cursor, sort)
+            op = "lt" if descending else "gt"
+            params["or"] = f"({stored}.{op}.{_quote(value)},and({stored}.eq.{_quote(value)},id.{op}.{row_id}))"
+        rows = await self._select_rows(table, names, params)
+        return names, [tuple(row[name] for name in names) for row in rows]
+
+    async def get(self, table, row_id, columns=None):
+        rows = await self._select_rows(table, columns or public_columns(table), {"id": f"eq.{row_id}"})
+        return rows[0] if rows else None
+
+    async def related(self, table, column, values, columns=None, sort="-created_at"):
+        values = list(values)
+        if not values:
+            return []
+        params = {self._column(table, column): f"in.({','.join(_quote(value) for value in values)})"}
+        if sort is not None:
+            key, descending = parse_sort(sort)
+            direction = "desc" if descending else "asc"
+            params["order"] = f"{self._column(table, key)}.{direction},id.{direction}"
+        return await self._select_rows(table, columns or public_columns(table), params)
+
+    async def _next_step_order(self, task_id):
+        rows = await self.rest.select("task_steps", {
+            "select": "step_order", "task_id": f"eq.{task_id}", "order": "step_order.desc", "limit": "1",
+        })
+        return (rows[0]["step_order"] or 0) + 1 if rows else 1
+
+    async def insert(self, table, values, columns):
+        row = self._to_supabase(table, values)
+        if table == "task_steps":
+            # database_schema.sql orders steps explicitly; new steps go last
+            row["step_order"] = await self._next_step_order(values.get("task_id"))
+        created = await self.rest.request("POST", table, params={"select": self._select(table, columns)},
+                                          json=[row], prefer="return=representation")
+        self.publish(table, "insert", created[0].get("id"))
+        return self._from_supabase(table, created[0], columns)
+
+    async def update(self, table, row_id, values, columns):
+        # Supabase's triggers bump updated_at
+        updated = await self.rest.request("PATCH", table, params={"id": f"eq.{row_id}", "select": self._select(table, columns)},
+                                          json=self._to_supabase(table, values), prefer="return=representation")
+        if not updated:
+            return None
+        self.publish(table, "update", str(row_id))
+        return self._from_supabase(table, updated[0], columns)
+
+    async def delete(self, table, row_id):
+        deleted = await self.rest.delete(table, {"id": f"eq.{row_id}", "select": "id"})
+        if deleted:
+            self.publish(table, "delete", str(row_id))
+        return bool(deleted)
+
+    async def bulk_upsert(self, table, columns, column_types, rows, conflict_column):
+        # One lookup to count updates, one upserting POST for every row
+        key = columns.index(conflict_column) + 1
+        existing = await self.related(table, conflict_column, [row[key] for row in rows if row[key] is not None], (conflict_column,), None)
+        await self.rest.request(
+            "POST", table, params={"on_conflict": self._column(table, conflict_column)},
+            json=[self._to_supabase(table, dict(zip(columns, row[1:]))) for row in rows],
+            prefer="resolution=merge-duplicates,return=minimal",
+        )
+        updated = len(existing)
+        return len(rows) - updated, updated
+
+    async def bulk_insert(self, table, columns, rows, conflict_column, returning, references=None):
+        rows, errors = await self._check_references(columns, rows, references)
+        key = columns.index(conflict_column) + 1
+        taken = {row[conflict_column] for row in await self.related(table, conflict_column, [row[key] for row in rows], (conflict_column,), None)}
+        errors += [{"row": row[0], "error": f"{conflict_column}: {row[key]} already exists"} for row in rows if row[key] in taken]
+        rows = [row for row in rows if row[key] not in taken]
+        created = []
+        if rows:
+            created = await self.rest.request(
+                "POST", table, params={"select": self._select(table, returning)},
+                json=[self._to_supabase(table, dict(zip(columns, row[1:]))) for row in rows], prefer="return=representation",
+            )
+            created = [self._from_supabase(table, row, returning) for row in created]
+        return created, sorted(errors, key=lambda error: error["row"])
@@ -0,0 +1,83 @@
+"""
+Shared fixtures: the API under TestClient on each storage engine
+
+Every test that takes ``client`` runs against STORAGE=memory and, when
+TEST_DATABASE_URL names a disposable Postgres database, against Postgres
+too. The Postgres tests migrate that database and empty its tables before
+each test:
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/lawmox_test python -m pytest
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["STORAGE"] = "memory"
+os.environ.setdefault("CACHE_TTL", "30")
+os.environ.setdefault("WARMUP_TIMEOUT", "10")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import lawmox.app as api  # noqa: E402
+from lawmox.cache import ResponseCache  # noqa: E402
+from lawmox.memory import MemoryRepository  # noqa: E402
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+TABLES = "task_steps, tasks, accounts, entities, tombstones"
+
+postgres_only = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+def empty_database(dsn):
+    import psycopg2
+
+    from lawmox.migrations import migrate
+
+    conn = psycopg2.connect(dsn)
+    try:
+        migrate(conn)
+        with conn.cursor() as cur:
+            cur.execute(f"TRUNCATE {TABLES}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def make_repository(engine):
+    if engine == "memory":
+        return MemoryRepository()
+    from lawmox.postgres import PostgresRepository
+    empty_database(TEST_DATABASE_URL)
+    return PostgresRepository(TEST_DATABASE_URL)
+
+
+@pytest.fixture(params=["memory", pytest.param("postgres", marks=postgres_only)])
+def client(request, monkeypatch):
+    """A TestClient on a fresh repository and response cache"""
+    monkeypatch.setattr(api, "repository", make_repository(request.param))
+    monkeypatch.setattr(api, "cache", ResponseCache.from_env())
+    with TestClient(api.app) as client:
+        yield client
+
+
+@pytest.fixture
+def pg_client(monkeypatch):
+    """A TestClient on an empty Postgres database"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    monkeypatch.setattr(api, "repository", make_repository("postgres"))
+    monkeypatch.setattr(api, "cache", ResponseCache.from_env())
+    with TestClient(api.app) as client:
+        yield client
+
+
+def create_entities(client, count, **values):
+    """POST ``count`` entities named entity-000, entity-001, ...; returns them in creation order"""
+    return [
+        client.post("/entities", json={"entity_name": f"entity-{i:03d}", **values}).json()
+        for i in range(count)
+    ]
@@ -0,0 +1,74 @@
+"""The API's CRUD endpoints, answering alike on every storage engine"""
+
+from conftest import create_entities
+
+
+# CRUD
+
+def test_entities_round_trip(client):
+    entity = client.post("/entities", json={"entity_name": "Acme", "ein": "12-3456789", "date_of_formation": "2020-02-29"}).json()
+    assert (entity["status"], entity["date_of_formation"], entity["created_at"]) == ("active", "2020-02-29", entity["updated_at"])
+    url = f"/entities/{entity['id']}"
+    updated = client.put(url, json={"entity_name": "Acme Inc"}).json()
+    assert (updated["entity_name"], updated["ein"]) == ("Acme Inc", "12-3456789")
+    assert updated["updated_at"] > entity["updated_at"]
+    assert client.get(url).json() == updated
+    assert client.put(url, json={}).status_code == 400
+    assert client.delete(url).json() == {"message": "Entity deleted successfully"}
+    assert client.get(url).status_code == 404
+    assert client.delete(url).status_code == 404
+
+
+def test_accounts_never_return_passwords(client):
+    entity, = create_entities(client, 1)
+    account = client.post("/accounts", json={
+        "account_name": "bank", "username": "user", "password": "secret", "entity_id": entity["id"],
+    }).json()
+    url = f"/accounts/{account['id']}"
+    updated = client.put(url, json={"password": "changed"}).json()
+    for body in (account, updated, client.get(url).json()):
+        assert not any("password" in key for key in body)
+    assert updated["updated_at"] > account["updated_at"]
+
+
+def test_tasks_and_steps_round_trip(client):
+    entity, = create_entities(client, 1)
+    task = client.post("/tasks", json={"task_name": "file", "entity_id": entity["id"], "deadline": "2026-04-15"}).json()
+    assert (task["status"], task["deadline"], task["account_id"]) == ("pending", "2026-04-15", None)
+    step = client.post("/task-steps", json={"task_id": task["id"], "step_name": "sign"}).json()
+    assert client.put(f"/task-steps/{step['id']}", json={"status": "completed"}).json()["status"] == "completed"
+    assert [item["id"] for item in client.get(f"/task-steps?task_id={task['id']}").json()["items"]] == [step["id"]]
+    assert client.put(f"/tasks/{task['id']}", json={"status": "completed"}).json()["status"] == "completed"
+    client.delete(f"/task-steps/{step['id']}")
+    assert client.get(f"/task-steps/{step['id']}").status_code == 404
+
+
+def test_rows_must_reference_existing_parents(client):
+    missing = "00000000-0000-0000-0000-000000000000"
+    response = client.post("/tasks", json={"task_name": "file", "entity_id": missing})
+    assert response.status_code == 400
+    assert "foreign key" in response.json()["detail"]
+    assert client.get("/tasks").json()["items"] == []
+
+
+def test_health_names_the_storage_engine(client):
+    health = client.get("/health").json()
+    assert health["status"] == "healthy"
+    assert health["storage"] in ("memory", "postgres")
+    assert client.get("/ready").status_code == 200
+
+
+# Rows
+
+def test_malformed_ids_are_not_found(client):
+    for resource, name in (("entities", "entity_name"), ("accounts", "account_name"), ("tasks", "task_name"),
+                           ("task-steps", "step_name")):
+        url = f"/{resource}/not-a-uuid"
+        assert client.get(url).status_code == 404
+        assert client.put(url, json={name: "renamed"}).status_code == 404
+        assert client.delete(url).status_code == 404
+
+
+def test_ids_are_not_case_sensitive(client):
+    entity, = create_entities(client, 1)
+    assert client.get(f"/entities/{entity['id'].upper()}").json()["id"] == entity["id"]
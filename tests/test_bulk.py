@@ -0,0 +1,98 @@
+"""Bulk uploads: row-level validation, upserts and duplicate checks on every engine"""
+
+from conftest import create_entities
+
+CSV = {"Content-Type": "text/csv"}
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def entity_names(client):
+    return sorted(item["entity_name"] for item in client.get("/entities").json()["items"])
+
+
+def test_bulk_import_reports_invalid_rows(client):
+    body = "entity_name,ein\nAcme,12-3456789\n,98-7654321\nCopy,12-3456789\n"
+    result = client.post("/entities/bulk", content=body, headers={"Content-Type": "text/csv"}).json()
+    assert (result["received"], result["inserted"], result["failed"]) == (3, 1, 2)
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert "entity_name" in result["errors"][0]["error"]
+
+
+def test_bulk_import_upserts_by_ein(client):
+    headers = {"Content-Type": "application/x-ndjson"}
+    client.post("/entities/bulk", content='{"entity_name": "Acme", "ein": "1"}\n', headers=headers)
+    result = client.post("/entities/bulk", content='{"entity_name": "Acme Inc", "ein": "1"}\n', headers=headers).json()
+    assert (result["inserted"], result["updated"]) == (0, 1)
+    assert [item["entity_name"] for item in client.get("/entities").json()["items"]] == ["Acme Inc"]
+
+
+def test_bulk_import_rejects_unknown_formats(client):
+    assert client.post("/entities/bulk", content="<xml/>", headers={"Content-Type": "application/xml"}).status_code == 415
+
+
+def test_bulk_import_reports_malformed_ndjson_lines(client):
+    body = '{"entity_name": "Acme"}\n\n{"entity_name": \n["Globex"]\n{"entity_name": "Initech", "ein": "' + "9" * 21 + '"}\n'
+    result = client.post("/entities/bulk", content=body, headers=NDJSON).json()
+    assert (result["received"], result["inserted"], result["failed"]) == (4, 1, 3)
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4]
+    assert "invalid JSON" in result["errors"][0]["error"]
+    assert "JSON object" in result["errors"][1]["error"]
+    assert "ein: at most 20 characters" in result["errors"][2]["error"]
+    assert entity_names(client) == ["Acme"]
+
+
+def test_bulk_import_format_parameter_overrides_the_content_type(client):
+    body = "\ufeffentity_name,ein,state_of_formation\nAcme,1,\nGlobex,,DE\n"
+    result = client.post("/entities/bulk?format=csv", content=body.encode(), headers={"Content-Type": "text/plain"}).json()
+    assert (result["inserted"], result["failed"]) == (2, 0)
+    entities = {item["entity_name"]: item for item in client.get("/entities").json()["items"]}
+    # Empty cells fall back to the model defaults
+    assert (entities["Acme"]["state_of_formation"], entities["Globex"]["ein"]) == (None, None)
+    assert entities["Acme"]["status"] == "active"
+
+
+def test_bulk_import_keeps_entities_without_an_ein_apart(client):
+    create_entities(client, 1)
+    body = "entity_name\nentity-000\nentity-000\n"
+    result = client.post("/entities/bulk", content=body, headers=CSV).json()
+    assert (result["inserted"], result["updated"]) == (2, 0)
+    assert entity_names(client) == ["entity-000"] * 3
+
+
+def test_bulk_accounts_report_bad_references_and_taken_usernames(client):
+    entity, = create_entities(client, 1)
+    client.post("/accounts", json={"account_name": "bank", "username": "taken", "password": "secret", "entity_id": entity["id"]})
+    missing = "00000000-0000-0000-0000-000000000000"
+    body = (
+        "account_name,username,password,entity_id\n"
+        f"bank,alice,pw1,{entity['id']}\n"
+        f"bank,bob,pw2,{missing}\n"
+        "bank,carol,pw3,not-a-uuid\n"
+        f"bank,alice,pw4,{entity['id']}\n"
+        f"bank,taken,pw5,{entity['id']}\n"
+        f"bank,dave,pw6,{entity['id']}\n"
+    )
+    result = client.post("/accounts/bulk", content=body, headers=CSV).json()
+    assert (result["received"], result["created"], result["failed"]) == (6, 2, 4)
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4, 5]
+    assert "taken" in result["errors"][3]["error"]
+    accounts = client.get("/accounts").json()["items"]
+    assert sorted(account["username"] for account in accounts) == ["alice", "dave", "taken"]
+    assert all("password" not in key for account in accounts for key in account)
+
+
+def test_batch_encryption_keeps_order_across_workers():
+    import asyncio
+
+    from cryptography.fernet import Fernet
+
+    from lawmox.crypto import BatchEncryptor
+
+    key = Fernet.generate_key()
+    encryptor = BatchEncryptor(key, workers=2, chunk_size=3)
+    passwords = [f"password-{i}" for i in range(10)]
+    try:
+        tokens = asyncio.run(encryptor.encrypt_all(passwords))
+    finally:
+        encryptor.close()
+    assert [Fernet(key).decrypt(token.encode()).decode() for token in tokens] == passwords
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from conftest import TEST_DATABASE_URL, create_entities
+from lawmox import cache
+from lawmox.cache import MemoryCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_row_generations_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    backend = MemoryCache()
+
+    async def scenario():
+        for i in range(100):
+            await backend.bump(f"entities:item:{i}", expire=61)
+        await backend.bump("entities:list")
+        assert await backend.generations("entities:item:0", "entities:list") == [1, 1]
+        clock.now += 30
+        await backend.bump("entities:item:0", expire=61)
+        clock.now += 40
+        # Row 0 was bumped again 40 s ago; the other rows' generations are gone
+        assert await backend.generations("entities:item:0", "entities:item:1", "entities:list") == [2, 0, 1]
+        assert backend.stats()["generations"] == 2
+        clock.now += 30
+        assert await backend.generations("entities:item:0", "entities:list") == [0, 1]
+        assert backend.stats()["generations"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_entries_expire_and_evict(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    backend = MemoryCache(max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await backend.set(key, key.encode(), ttl=30)
+        assert await backend.get("a") is None
+        assert await backend.get("c") == b"c"
+        clock.now += 31
+        assert await backend.get("c") is None
+        assert backend.stats()["evictions"] == 1
+        assert backend.stats()["expirations"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_writes_invalidate_cached_responses(client):
+    entity, = create_entities(client, 1)
+    url = f"/entities/{entity['id']}"
+    assert client.get(url).json()["status"] == "active"
+    assert client.get("/entities").json()["items"][0]["status"] == "active"
+    client.put(url, json={"status": "inactive"})
+    assert client.get(url).json()["status"] == "inactive"
+    assert client.get("/entities").json()["items"][0]["status"] == "inactive"
+    client.delete(url)
+    assert client.get(url).status_code == 404
+    assert client.get("/entities").json()["items"] == []
+
+
+def test_account_delete_invalidates_cached_tasks(client):
+    entity, = create_entities(client, 1)
+    account = client.post("/accounts", json={
+        "account_name": "bank", "username": "user", "password": "secret", "entity_id": entity["id"],
+    }).json()
+    task = client.post("/tasks", json={"task_name": "file", "entity_id": entity["id"], "account_id": account["id"]}).json()
+    assert client.get(f"/tasks/{task['id']}").json()["account_id"] == account["id"]
+    assert client.get("/tasks").json()["items"][0]["account_id"] == account["id"]
+    client.delete(f"/accounts/{account['id']}")
+    assert client.get(f"/tasks/{task['id']}").json()["account_id"] is None
+    assert client.get("/tasks").json()["items"][0]["account_id"] is None
+
+
+def test_bulk_import_invalidates_cached_lists(client):
+    assert client.get("/entities").json()["items"] == []
+    client.post("/entities/bulk", content="entity_name,ein\nAcme,12-3456789\n", headers={"Content-Type": "text/csv"})
+    assert [item["entity_name"] for item in client.get("/entities").json()["items"]] == ["Acme"]
+
+
+def test_repeat_reads_are_cache_hits(client):
+    entity, = create_entities(client, 1)
+    for url in ("/entities", f"/entities/{entity['id']}"):
+        assert client.get(url).headers["x-cache"] == "MISS"
+        assert client.get(url).headers["x-cache"] == "HIT"
+    # Each representation and query is its own entry
+    assert client.get("/entities", headers={"Accept": "application/msgpack"}).headers["x-cache"] == "MISS"
+    assert client.get("/entities?limit=1").headers["x-cache"] == "MISS"
+
+
+def test_writes_only_invalidate_what_they_touch(client):
+    first, second = create_entities(client, 2)
+    urls = ["/entities", f"/entities/{first['id']}", f"/entities/{second['id']}", "/tasks"]
+    for url in urls:
+        client.get(url)
+    client.put(f"/entities/{first['id']}", json={"status": "inactive"})
+    assert [client.get(url).headers["x-cache"] for url in urls] == ["MISS", "MISS", "HIT", "HIT"]
+
+
+@pytest.fixture
+def cascading(pg_client):
+    """pg_client with database_schema.sql's foreign keys: deleting a row deletes its children"""
+    import psycopg2
+
+    cascades = {
+        "accounts": ("entity_id", "entities"), "tasks": ("entity_id", "entities"), "task_steps": ("task_id", "tasks"),
+    }
+
+    def reference(action):
+        conn = psycopg2.connect(TEST_DATABASE_URL)
+        try:
+            with conn.cursor() as cur:
+                for table, (column, target) in cascades.items():
+                    cur.execute(
+                        f"ALTER TABLE {table} DROP CONSTRAINT {table}_{column}_fkey, "
+                        f"ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column}) REFERENCES {target}(id) {action}"
+                    )
+            conn.commit()
+        finally:
+            conn.close()
+
+    reference("ON DELETE CASCADE")
+    try:
+        yield pg_client
+    finally:
+        reference("")
+
+
+def test_deletes_invalidate_cascaded_rows(cascading):
+    entity, = create_entities(cascading, 1)
+    account = cascading.post("/accounts", json={
+        "account_name": "bank", "username": "user", "password": "secret", "entity_id": entity["id"],
+    }).json()
+    task = cascading.post("/tasks", json={"task_name": "file", "entity_id": entity["id"], "account_id": account["id"]}).json()
+    step = cascading.post("/task-steps", json={"task_id": task["id"], "step_name": "sign"}).json()
+    urls = [f"/accounts/{account['id']}", f"/tasks/{task['id']}", f"/task-steps/{step['id']}"]
+    for url in urls:
+        assert cascading.get(url).status_code == 200
+    assert len(cascading.get("/task-steps").json()["items"]) == 1
+
+    cascading.delete(f"/tasks/{task['id']}")
+    assert cascading.get(urls[2]).status_code == 404
+    assert cascading.get("/task-steps").json()["items"] == []
+    cascading.delete(f"/entities/{entity['id']}")
+    assert cascading.get(urls[0]).status_code == 404
+    assert cascading.get("/accounts").json()["items"] == []
@@ -0,0 +1,49 @@
+"""Nested entity views: /entities/{id}/full and /dashboard on every engine"""
+
+from conftest import create_entities
+from lawmox.dashboard import DASHBOARD_MAX_PAGE_SIZE
+
+
+def seed_children(client, entity):
+    """An account, a task with two steps and a task without any for ``entity``"""
+    account = client.post("/accounts", json={
+        "account_name": "bank", "username": f"user-{entity['id']}", "password": "secret", "entity_id": entity["id"],
+    }).json()
+    task = client.post("/tasks", json={"task_name": "file", "entity_id": entity["id"], "account_id": account["id"]}).json()
+    for name in ("gather", "submit"):
+        client.post("/task-steps", json={"task_id": task["id"], "step_name": name})
+    client.post("/tasks", json={"task_name": "renew", "entity_id": entity["id"]})
+
+
+def test_full_entity_nests_accounts_tasks_and_steps(client):
+    entity, other = create_entities(client, 2)
+    seed_children(client, entity)
+    full = client.get(f"/entities/{entity['id']}/full").json()
+    assert full["entity_name"] == entity["entity_name"]
+    assert [account["username"] for account in full["accounts"]] == [f"user-{entity['id']}"]
+    assert "encrypted_password" not in full["accounts"][0]
+    tasks = {task["task_name"]: task for task in full["tasks"]}
+    assert [step["step_name"] for step in tasks["file"]["steps"]] == ["gather", "submit"]
+    assert tasks["renew"]["steps"] == []
+    empty = client.get(f"/entities/{other['id']}/full").json()
+    assert (empty["accounts"], empty["tasks"]) == ([], [])
+
+
+def test_full_entity_of_unknown_id_is_404(client):
+    assert client.get("/entities/00000000-0000-0000-0000-000000000000/full").status_code == 404
+
+
+def test_dashboard_pages_and_filters_nested_entities(client):
+    entities = create_entities(client, 3)
+    for entity in entities:
+        seed_children(client, entity)
+    client.put(f"/entities/{entities[1]['id']}", json={"status": "inactive"})
+    first = client.get("/dashboard?limit=2").json()
+    second = client.get("/dashboard", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    listed = first["items"] + second["items"]
+    assert [item["id"] for item in listed] == [entity["id"] for entity in reversed(entities)]
+    assert second["next_cursor"] is None
+    assert all(len(item["accounts"]) == 1 and len(item["tasks"]) == 2 for item in listed)
+    active = client.get("/dashboard?status=active").json()["items"]
+    assert [item["entity_name"] for item in active] == ["entity-002", "entity-000"]
+    assert client.get(f"/dashboard?limit={DASHBOARD_MAX_PAGE_SIZE + 1}").status_code == 422
@@ -0,0 +1,78 @@
+"""AsyncDatabase: pooled work off the event loop"""
+
+import asyncio
+import time
+
+import pytest
+
+from conftest import TEST_DATABASE_URL, postgres_only
+from lawmox.db import AsyncDatabase
+from lawmox.pool import ConnectionPool
+from lawmox.readiness import DatabaseUnavailable, ReadinessMonitor
+
+pytestmark = postgres_only
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(TEST_DATABASE_URL, minconn=0, maxconn=4)
+    yield pool
+    pool.closeall()
+
+
+def run(pool, scenario, readiness=None):
+    """asyncio.run(scenario(db)) on an AsyncDatabase over ``pool``"""
+    db = AsyncDatabase(pool.getconn, pool.maxconn, readiness)
+    try:
+        return asyncio.run(scenario(db))
+    finally:
+        db.close()
+
+
+def test_queries_do_not_block_the_event_loop(pool):
+    async def scenario(db):
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        started = time.perf_counter()
+        await asyncio.gather(*(db.fetch_one("SELECT pg_sleep(0.3)") for _ in range(4)))
+        elapsed = time.perf_counter() - started
+        ticker.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = run(pool, scenario)
+    # The four sleeps ran side by side while the loop kept ticking
+    assert elapsed < 1
+    assert ticks >= 10
+
+
+def test_failed_work_is_rolled_back_and_released(pool):
+    import psycopg2
+
+    async def scenario(db):
+        await db.execute("CREATE TEMP TABLE IF NOT EXISTS scratch (n int)")
+        with pytest.raises(psycopg2.errors.DivisionByZero):
+            await db.execute("INSERT INTO scratch VALUES (1 / 0)")
+        return await db.fetch_one("SELECT 1")
+
+    assert run(pool, scenario) == (1,)
+    assert pool.stats()["in_use"] == 0
+
+
+def test_a_dropped_connection_marks_the_database_unavailable(pool):
+    readiness = ReadinessMonitor(pool)
+    readiness.ready = True
+
+    async def scenario(db):
+        with pytest.raises(DatabaseUnavailable):
+            await db.fetch_one("SELECT pg_terminate_backend(pg_backend_pid())")
+
+    run(pool, scenario, readiness)
+    assert not readiness.ready
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,52 @@
+"""Conditional GET: ETags on list and detail responses, 304 on a match"""
+
+from conftest import create_entities
+
+
+def test_list_etag_revalidates_until_a_write(client):
+    create_entities(client, 2)
+    first = client.get("/entities")
+    etag = first.headers["etag"]
+    assert client.get("/entities", headers={"If-None-Match": etag}).status_code == 304
+    create_entities(client, 1)
+    changed = client.get("/entities", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()["items"]) == 3
+
+
+def test_detail_etag_revalidates_until_a_write(client):
+    entity, = create_entities(client, 1)
+    url = f"/entities/{entity['id']}"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    client.put(url, json={"status": "inactive"})
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["status"] == "inactive"
+
+
+def test_deleting_a_row_changes_the_list_etag(client):
+    entities = create_entities(client, 2)
+    etag = client.get("/entities").headers["etag"]
+    # The newest updated_at is unchanged; the count is not
+    client.delete(f"/entities/{entities[0]['id']}")
+    assert client.get("/entities", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_etags_differ_by_query(client):
+    create_entities(client, 2)
+    etags = {client.get(url).headers["etag"] for url in ("/entities", "/entities?limit=1", "/entities?status=active")}
+    assert len(etags) == 3
+
+
+def test_if_none_match_lists_weak_and_wildcard_tags(client):
+    create_entities(client, 1)
+    response = client.get("/entities")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+    for header in (f'"other", W/{etag}', "*"):
+        not_modified = client.get("/entities", headers={"If-None-Match": header})
+        assert not_modified.status_code == 304, header
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+    assert client.get("/entities", headers={"If-None-Match": '"other"'}).status_code == 200
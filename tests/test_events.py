@@ -0,0 +1,134 @@
+"""Change events: NOTIFY triggers, the broker's fan-out and the SSE stream"""
+
+import asyncio
+import json
+
+import pytest
+
+from conftest import TEST_DATABASE_URL, empty_database, postgres_only
+from lawmox.events import CHANNEL, ChangeBroker, sse_stream
+
+
+class Request:
+    """Just enough of a Starlette request for sse_stream()"""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def change(table, row_id="1"):
+    return {"type": "change", "table": table, "op": "insert", "id": row_id}
+
+
+@pytest.fixture
+def conn():
+    import psycopg2
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    yield conn
+    conn.close()
+
+
+def test_events_reach_only_their_topics_subscribers():
+    broker = ChangeBroker(queue_size=10)
+    with broker.subscribe({"entities"}) as entities, broker.subscribe({"entities", "tasks"}) as both:
+        broker.publish(change("entities"))
+        broker.publish(change("tasks"))
+        broker.publish({"type": "resync", "reason": "reconnect"})
+        assert [entities.queue.get_nowait()["type"] for _ in range(entities.queue.qsize())] == ["change", "resync"]
+        assert both.queue.qsize() == 3
+    assert broker.stats()["subscribers"] == 0
+
+
+def test_a_subscriber_that_falls_behind_is_told_to_resync():
+    broker = ChangeBroker(queue_size=2)
+    with broker.subscribe({"entities"}) as subscription:
+        for i in range(3):
+            broker.publish(change("entities", str(i)))
+        assert subscription.queue.get_nowait() == {"type": "resync", "reason": "overflow"}
+        assert subscription.queue.empty()
+    assert broker.stats()["overflows"] == 1
+
+
+def test_sse_stream_sends_events_and_keepalives():
+    broker = ChangeBroker()
+    request = Request()
+
+    async def scenario():
+        stream = sse_stream(broker, request, {"entities"}, heartbeat=0.05)
+        chunks = [await stream.__anext__()]
+        broker.publish(change("entities"))
+        chunks.append(await stream.__anext__())
+        chunks.append(await stream.__anext__())
+        request.disconnected = True
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0] == b"retry: 3000\n\n"
+    assert chunks[1] == b"event: change\ndata: " + json.dumps(change("entities")).encode() + b"\n\n"
+    assert chunks[2:] == [b": keepalive\n\n"]
+    assert broker.stats()["subscribers"] == 0
+
+
+def test_unknown_event_topics_are_rejected(client):
+    assert client.get("/events?topics=entities,users").status_code == 400
+
+
+@postgres_only
+def test_the_broker_delivers_database_writes(conn):
+    empty_database(TEST_DATABASE_URL)
+    broker = ChangeBroker(TEST_DATABASE_URL)
+
+    async def scenario():
+        broker.start()
+        try:
+            while not broker.connected:
+                await asyncio.sleep(0.01)
+            with broker.subscribe({"entities"}) as subscription:
+                with conn.cursor() as cur:
+                    cur.execute("INSERT INTO entities (entity_name) VALUES ('Acme') RETURNING id")
+                    entity_id = str(cur.fetchone()[0])
+                conn.commit()
+                return entity_id, await asyncio.wait_for(subscription.queue.get(), 5)
+        finally:
+            await broker.stop()
+
+    entity_id, event = asyncio.run(scenario())
+    assert event == {"type": "change", "table": "entities", "op": "insert", "id": entity_id}
+
+
+@postgres_only
+def test_one_notification_per_statement(conn):
+    import select
+
+    import psycopg2
+
+    empty_database(TEST_DATABASE_URL)
+    listener = psycopg2.connect(TEST_DATABASE_URL)
+    listener.autocommit = True
+    try:
+        with listener.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO entities (entity_name) SELECT 'entity-' || i FROM generate_series(1, 50) i")
+            cur.execute("UPDATE entities SET status = 'inactive' WHERE entity_name = 'entity-1' RETURNING id")
+            entity_id = cur.fetchone()[0]
+            cur.execute("UPDATE entities SET status = 'inactive' WHERE false")
+            cur.execute("DELETE FROM entities")
+        conn.commit()
+        notifications = []
+        # Until the channel has been quiet for a second
+        while select.select([listener], [], [], 1) != ([], [], []):
+            listener.poll()
+            notifications += [json.loads(notify.payload) for notify in listener.notifies]
+            listener.notifies.clear()
+    finally:
+        listener.close()
+    assert notifications == [
+        {"table": "entities", "op": "insert", "count": 50},
+        {"table": "entities", "op": "update", "id": entity_id},
+        {"table": "entities", "op": "delete", "count": 50},
+    ]
@@ -0,0 +1,93 @@
+"""Streaming CSV/NDJSON exports"""
+
+import csv
+import io
+import json
+
+from conftest import TEST_DATABASE_URL, create_entities, empty_database, postgres_only
+
+
+def exported_csv(client, url, **params):
+    with client.stream("GET", url, params=params) as response:
+        assert response.status_code == 200, response.read()
+        return list(csv.DictReader(io.StringIO("".join(response.iter_text()))))
+
+
+def test_export_csv_streams_every_row(client):
+    entities = create_entities(client, 3)
+    with client.stream("GET", "/export/entities") as response:
+        assert response.headers["content-type"].startswith("text/csv")
+        text = "".join(response.iter_text())
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert sorted(row["id"] for row in rows) == sorted(entity["id"] for entity in entities)
+
+
+def test_export_ndjson_hides_encrypted_passwords(client):
+    entity, = create_entities(client, 1)
+    client.post("/accounts", json={"account_name": "bank", "username": "user", "password": "secret", "entity_id": entity["id"]})
+    with client.stream("GET", "/export/accounts?format=ndjson") as response:
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+    assert [row["account_name"] for row in rows] == ["bank"]
+    assert "encrypted_password" not in rows[0]
+
+
+def test_export_of_unknown_resource_is_404(client):
+    assert client.get("/export/users").status_code == 404
+
+
+def test_export_filters_by_date_range(client):
+    entities = create_entities(client, 3)
+    rows = exported_csv(client, "/export/entities", created_after=entities[1]["created_at"])
+    assert sorted(row["entity_name"] for row in rows) == ["entity-001", "entity-002"]
+
+
+def test_export_of_an_empty_table_is_just_a_header(client):
+    with client.stream("GET", "/export/task-steps") as response:
+        lines = "".join(response.iter_text()).splitlines()
+    assert len(lines) == 1
+    assert lines[0] == "id,step_name,description,status,task_id,created_at,updated_at"
+
+
+@postgres_only
+def test_export_releases_its_connection_when_the_client_disconnects():
+    import asyncio
+
+    import psycopg2
+
+    from lawmox.export import ExportResponse
+    from lawmox.postgres import PostgresRepository
+
+    empty_database(TEST_DATABASE_URL)
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO entities (entity_name) SELECT 'entity-' || i FROM generate_series(1, 20000) i")
+        conn.commit()
+    finally:
+        conn.close()
+
+    async def scenario():
+        repository = PostgresRepository(TEST_DATABASE_URL)
+        repository.start()
+        await repository.warm_up(10)
+        try:
+            response = ExportResponse(await repository.export("entities", ["id", "entity_name"]))
+            first_chunk = asyncio.Event()
+
+            async def send(message):
+                if message["type"] == "http.response.body":
+                    first_chunk.set()
+                    # A slow client, gone before the rest of the export
+                    await asyncio.sleep(10)
+
+            async def receive():
+                await first_chunk.wait()
+                return {"type": "http.disconnect"}
+
+            await asyncio.wait_for(response({"type": "http"}, receive, send), 5)
+            await asyncio.sleep(0.2)
+            return repository.pool.stats()["in_use"]
+        finally:
+            await repository.close()
+
+    assert asyncio.run(scenario()) == 0
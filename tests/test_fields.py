@@ -0,0 +1,40 @@
+"""Sparse fieldsets: ?fields= trims the response and the SELECT behind it"""
+
+from conftest import create_entities
+from lawmox import queries
+
+
+def test_fields_limit_list_and_detail_responses(client):
+    entity, = create_entities(client, 1, state_of_formation="DE")
+    page = client.get("/entities?fields=id,entity_name").json()
+    assert page["items"] == [{"id": entity["id"], "entity_name": entity["entity_name"]}]
+    detail = client.get(f"/entities/{entity['id']}?fields=state_of_formation").json()
+    assert detail == {"state_of_formation": "DE"}
+
+
+def test_unknown_fields_are_rejected(client):
+    assert client.get("/entities?fields=entity_name,bogus").status_code == 400
+    assert client.get("/accounts?fields=encrypted_password").status_code == 400
+
+
+def test_fields_keep_list_pages_paginated(client):
+    entities = create_entities(client, 3)
+    first = client.get("/entities?fields=entity_name&limit=2&sort=entity_name").json()
+    assert first["items"] == [{"entity_name": "entity-000"}, {"entity_name": "entity-001"}]
+    second = client.get("/entities", params={"fields": "entity_name", "limit": 2, "sort": "entity_name",
+                                             "cursor": first["next_cursor"]}).json()
+    assert second["items"] == [{"entity_name": entities[2]["entity_name"]}]
+
+
+def test_fields_are_pushed_into_the_select(pg_client, monkeypatch, capsys):
+    entity, = create_entities(pg_client, 1)
+    pg_client.get("/entities?fields=entity_name")
+    # Every statement counts as slow, so each one is logged with its SQL
+    monkeypatch.setattr(queries, "SLOW_QUERY_MS", 0)
+    capsys.readouterr()
+    pg_client.get("/entities?fields=entity_name&limit=5")
+    pg_client.get(f"/entities/{entity['id']}?fields=status")
+    logged = capsys.readouterr().out
+    assert "SELECT entity_name, created_at, id FROM entities" in logged
+    assert "SELECT status, id, updated_at FROM entities" in logged
+    assert "registered_address" not in logged
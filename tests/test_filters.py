@@ -0,0 +1,46 @@
+"""Server-side filters and the sort whitelist, on every engine"""
+
+from conftest import create_entities
+
+
+def names(client, url, **params):
+    page = client.get(url, params=params)
+    assert page.status_code == 200, page.text
+    return [item.get("entity_name") or item.get("task_name") for item in page.json()["items"]]
+
+
+def test_equality_filters_combine(client):
+    create_entities(client, 2, state_of_formation="DE")
+    create_entities(client, 1, state_of_formation="NV", entity_type="LLC")
+    client.put(f"/entities/{client.get('/entities').json()['items'][-1]['id']}", json={"status": "inactive"})
+    assert names(client, "/entities", state_of_formation="DE") == ["entity-001", "entity-000"]
+    assert names(client, "/entities", state_of_formation="DE", status="active") == ["entity-001"]
+    assert names(client, "/entities", entity_type="LLC") == ["entity-000"]
+    assert names(client, "/entities", status="dissolved") == []
+
+
+def test_tasks_filter_by_entity_and_status(client):
+    first, second = create_entities(client, 2)
+    for entity, status in ((first, "pending"), (first, "completed"), (second, "pending")):
+        client.post("/tasks", json={"task_name": f"{entity['entity_name']} {status}", "entity_id": entity["id"], "status": status})
+    assert names(client, "/tasks", entity_id=first["id"]) == ["entity-000 completed", "entity-000 pending"]
+    assert names(client, "/tasks", entity_id=first["id"], status="pending") == ["entity-000 pending"]
+    assert names(client, "/tasks", status="pending") == ["entity-001 pending", "entity-000 pending"]
+
+
+def test_date_ranges_are_half_open(client):
+    entities = create_entities(client, 3)
+    middle = entities[1]["created_at"]
+    assert names(client, "/entities", created_after=middle) == ["entity-002", "entity-001"]
+    assert names(client, "/entities", created_before=middle) == ["entity-000"]
+    assert names(client, "/entities", created_after=middle, created_before=entities[2]["created_at"]) == ["entity-001"]
+    client.put(f"/entities/{entities[0]['id']}", json={"status": "inactive"})
+    assert names(client, "/entities", updated_after=entities[2]["updated_at"]) == ["entity-002", "entity-000"]
+
+
+def test_sorts_are_whitelisted(client):
+    create_entities(client, 3)
+    assert names(client, "/entities", sort="-entity_name") == ["entity-002", "entity-001", "entity-000"]
+    assert names(client, "/entities", sort="created_at") == ["entity-000", "entity-001", "entity-002"]
+    for sort in ("ein", "entity_name; DROP TABLE entities", "--created_at", "task_name"):
+        assert client.get("/entities", params={"sort": sort}).status_code == 422, sort
@@ -0,0 +1,68 @@
+"""benchmarks/generate_dataset.py against the test database"""
+
+import argparse
+import os
+import sys
+
+import pytest
+from cryptography.fernet import Fernet
+
+from conftest import ROOT, TEST_DATABASE_URL, empty_database, postgres_only
+
+pytestmark = postgres_only
+
+ROLE = "lawmox_loader"
+COUNTS = {"entities": 50, "accounts": 120, "tasks": 200}
+
+
+def load(dsn):
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    import generate_dataset
+
+    generate_dataset.main(argparse.Namespace(
+        dsn=dsn, key=Fernet.generate_key().decode(), as_of="2025-01-01", seed=7, **COUNTS,
+        skew=0.8, history_days=365, workers=1, truncate=True,
+    ))
+
+
+def counts(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT (SELECT count(*) FROM entities), (SELECT count(*) FROM accounts), (SELECT count(*) FROM tasks)")
+        return dict(zip(COUNTS, cur.fetchone()))
+
+
+@pytest.fixture
+def conn():
+    import psycopg2
+    empty_database(TEST_DATABASE_URL)
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    conn.autocommit = True
+    yield conn
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE task_steps, tasks, accounts, entities, tombstones")
+    conn.close()
+
+
+@pytest.fixture
+def unprivileged_dsn(conn):
+    """TEST_DATABASE_URL as a role that may write the tables but not disable their triggers"""
+    import psycopg2.extensions
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP ROLE IF EXISTS {ROLE}")
+        cur.execute(f"CREATE ROLE {ROLE} LOGIN NOSUPERUSER")
+        cur.execute(f"GRANT ALL ON ALL TABLES IN SCHEMA public TO {ROLE}")
+    yield psycopg2.extensions.make_dsn(TEST_DATABASE_URL, user=ROLE)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP OWNED BY {ROLE}")
+        cur.execute(f"DROP ROLE {ROLE}")
+
+
+def test_loads_the_requested_rows(conn):
+    load(TEST_DATABASE_URL)
+    assert counts(conn) == COUNTS
+
+
+def test_loads_without_permission_to_skip_triggers(conn, unprivileged_dsn):
+    load(unprivileged_dsn)
+    assert counts(conn) == COUNTS
@@ -0,0 +1,52 @@
+"""Prometheus /metrics: request, database and crypto series"""
+
+from conftest import create_entities
+from lawmox import metrics
+from lawmox.metrics import Histogram
+
+
+def sample(client, series):
+    """Value of one ``series{labels}`` line of /metrics, 0 when absent"""
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+def test_histograms_render_cumulative_buckets(monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", [])
+    histogram = Histogram("test_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, "/a")
+    assert histogram.render() == [
+        "# HELP test_seconds Test latency",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 6.05',
+        'test_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_requests_are_counted_by_route_template(client):
+    entity, = create_entities(client, 1)
+    ok = 'lawmox_http_requests_total{method="GET",route="/entities/{entity_id}",status="200"}'
+    missing = 'lawmox_http_errors_total{method="GET",route="/entities/{entity_id}",status="404"}'
+    before = sample(client, ok), sample(client, missing)
+    client.get(f"/entities/{entity['id']}")
+    client.get("/entities/00000000-0000-0000-0000-000000000000")
+    assert (sample(client, ok), sample(client, missing)) == (before[0] + 1, before[1] + 1)
+    assert entity["id"] not in client.get("/metrics").text
+
+
+def test_encryption_and_stats_are_exposed(client):
+    entity, = create_entities(client, 1)
+    series = 'lawmox_crypto_seconds_count{operation="encrypt_batch"}'
+    before = sample(client, series)
+    client.post("/accounts/bulk", content=f"account_name,username,password,entity_id\nbank,user,pw,{entity['id']}\n",
+                headers={"Content-Type": "text/csv"})
+    assert sample(client, series) == before + 1
+    text = client.get("/metrics").text
+    assert "lawmox_cache_entries " in text
+    assert "lawmox_events_subscribers 0" in text
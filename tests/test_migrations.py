@@ -0,0 +1,119 @@
+"""Versioned migrations, applied to an empty schema of the TEST_DATABASE_URL database"""
+
+import pytest
+
+from conftest import TEST_DATABASE_URL, postgres_only
+
+pytestmark = postgres_only
+
+SCHEMA = "lawmox_migration_test"
+
+
+@pytest.fixture
+def conn():
+    import psycopg2
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def empty_schema(conn):
+    """``conn`` with a new, empty schema as its search_path"""
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"SET search_path = {SCHEMA}")
+    conn.autocommit = False
+    yield conn
+    conn.rollback()
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+def test_migrations_apply_from_scratch_once(empty_schema):
+    from lawmox.migrations import MIGRATIONS, current_version, migrate
+
+    latest = max(migration.version for migration in MIGRATIONS)
+    assert current_version(empty_schema) == 0
+    empty_schema.rollback()
+    assert migrate(empty_schema) == latest
+    with empty_schema.cursor() as cur:
+        cur.execute("SELECT version FROM schema_version ORDER BY version")
+        assert [row[0] for row in cur.fetchall()] == sorted(migration.version for migration in MIGRATIONS)
+        # Indexes built concurrently must not be left INVALID
+        cur.execute(
+            "SELECT count(*) FROM pg_index JOIN pg_class ON pg_class.oid = indexrelid "
+            "WHERE relnamespace = %s::regnamespace AND NOT indisvalid", (SCHEMA,)
+        )
+        assert cur.fetchone()[0] == 0
+    # A second run finds nothing to do
+    assert migrate(empty_schema) == latest
+    with empty_schema.cursor() as cur:
+        cur.execute("SELECT count(*) FROM schema_version")
+        assert cur.fetchone()[0] == len(MIGRATIONS)
+
+
+def test_migrated_schema_accepts_the_app_writes(empty_schema):
+    from lawmox.migrations import migrate
+
+    migrate(empty_schema)
+    with empty_schema.cursor() as cur:
+        cur.execute("INSERT INTO entities (entity_name) VALUES ('Acme') RETURNING id, created_at, updated_at")
+        entity_id, created_at, updated_at = cur.fetchone()
+        assert created_at == updated_at
+        cur.execute("DELETE FROM entities WHERE id = %s", (entity_id,))
+        cur.execute("SELECT count(*) FROM tombstones WHERE row_id = %s", (entity_id,))
+        assert cur.fetchone()[0] == 1
+    empty_schema.rollback()
+
+
+def test_upgrades_apply_only_pending_migrations(empty_schema):
+    from lawmox.migrations import MIGRATIONS, current_version, migrate
+
+    assert migrate(empty_schema, MIGRATIONS[:5]) == 5
+    with empty_schema.cursor() as cur:
+        cur.execute("INSERT INTO entities (entity_name) VALUES ('Acme')")
+    empty_schema.commit()
+    assert migrate(empty_schema) == MIGRATIONS[-1].version
+    assert current_version(empty_schema) == MIGRATIONS[-1].version
+    with empty_schema.cursor() as cur:
+        cur.execute("SELECT entity_name FROM entities")
+        assert cur.fetchall() == [("Acme",)]
+        cur.execute("SELECT count(*) FROM pg_indexes WHERE schemaname = %s AND indexname = 'idx_tasks_open_deadline_id'", (SCHEMA,))
+        assert cur.fetchone()[0] == 1
+
+
+def test_a_failed_migration_changes_nothing(empty_schema):
+    from lawmox.migrations import LOCK_ID, MIGRATIONS, Migration, current_version, migrate
+
+    latest = migrate(empty_schema)
+    broken = Migration(latest + 1, "Broken", ["CREATE TABLE scratch (n int)", "SELECT 1 / 0"])
+    with pytest.raises(Exception, match="division by zero"):
+        migrate(empty_schema, MIGRATIONS + [broken])
+    assert current_version(empty_schema) == latest
+    with empty_schema.cursor() as cur:
+        cur.execute("SELECT to_regclass('scratch')")
+        assert cur.fetchone()[0] is None
+        cur.execute("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = %s", (LOCK_ID & 0xFFFFFFFF,))
+        assert cur.fetchone()[0] == 0
+    empty_schema.rollback()
+
+
+def test_invalid_indexes_are_rebuilt(empty_schema):
+    from lawmox.migrations import MIGRATIONS, Migration, migrate
+    from lawmox.schema import STEP_ORDER_INDEXES
+
+    latest = migrate(empty_schema)
+    name = STEP_ORDER_INDEXES[0][0]
+    # What an interrupted CREATE INDEX CONCURRENTLY leaves behind
+    with empty_schema.cursor() as cur:
+        cur.execute("UPDATE pg_index SET indisvalid = false WHERE indexrelid = %s::regclass", (name,))
+    empty_schema.commit()
+    migrate(empty_schema, MIGRATIONS + [Migration(latest + 1, "Rebuild", indexes=STEP_ORDER_INDEXES)])
+    with empty_schema.cursor() as cur:
+        cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = %s::regclass", (name,))
+        assert cur.fetchone()[0] is True
+    empty_schema.rollback()
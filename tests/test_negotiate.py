@@ -0,0 +1,69 @@
+"""Content negotiation: columnar and MessagePack pages, gzip/brotli bodies"""
+
+import msgpack
+
+from conftest import create_entities
+from lawmox import negotiate
+
+
+def test_columnar_json(client):
+    entities = create_entities(client, 2)
+    response = client.get("/entities?fields=id,entity_name", headers={"Accept": "application/vnd.lawmox.columnar+json"})
+    assert response.headers["content-type"].startswith("application/vnd.lawmox.columnar+json")
+    assert "Accept" in response.headers["vary"]
+    body = response.json()
+    assert sorted(body["columns"]) == ["entity_name", "id"]
+    columns = dict(zip(body["columns"], body["data"]))
+    assert columns["id"] == [entity["id"] for entity in reversed(entities)]
+    assert columns["entity_name"] == [entity["entity_name"] for entity in reversed(entities)]
+
+
+def test_msgpack(client):
+    create_entities(client, 1)
+    response = client.get("/entities?fields=entity_name", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"].startswith("application/msgpack")
+    assert msgpack.unpackb(response.content) == {"items": [{"entity_name": "entity-000"}], "next_cursor": None}
+
+
+def test_representations_have_distinct_etags(client):
+    create_entities(client, 1)
+    plain = client.get("/entities").headers["etag"]
+    columnar = client.get("/entities", headers={"Accept": "application/vnd.lawmox.columnar+json"}).headers["etag"]
+    assert plain != columnar
+
+
+def test_unknown_media_type_falls_back_to_json(client):
+    response = client.get("/entities", headers={"Accept": "text/html"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+
+
+def test_q_values_rank_media_types(client):
+    create_entities(client, 1)
+    preferred = client.get("/entities", headers={"Accept": "application/json;q=0.5, application/msgpack"})
+    assert preferred.headers["content-type"].startswith("application/msgpack")
+    refused = client.get("/entities", headers={"Accept": "application/msgpack;q=0, application/json;q=0.1"})
+    assert refused.headers["content-type"].startswith("application/json")
+
+
+def test_columnar_msgpack(client):
+    entity, = create_entities(client, 1)
+    response = client.get("/entities?fields=id", headers={"Accept": "application/vnd.lawmox.columnar+msgpack"})
+    assert msgpack.unpackb(response.content) == {"columns": ["id"], "data": [[entity["id"]]], "next_cursor": None}
+
+
+def test_gzip_bodies_are_cached_compressed(client):
+    create_entities(client, 1)
+    for cache in ("MISS", "HIT"):
+        response = client.get("/entities", headers={"Accept-Encoding": "gzip"})
+        assert (response.headers["content-encoding"], response.headers["x-cache"]) == ("gzip", cache)
+        assert response.json()["items"][0]["entity_name"] == "entity-000"
+    assert "content-encoding" not in client.get("/entities", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_msgpack_falls_back_to_json_without_the_package(client, monkeypatch):
+    monkeypatch.setattr(negotiate, "msgpack", None)
+    create_entities(client, 1)
+    response = client.get("/entities", headers={"Accept": "application/vnd.lawmox.columnar+msgpack"})
+    assert response.headers["content-type"].startswith("application/vnd.lawmox.columnar+json")
+    assert response.json()["columns"]
@@ -0,0 +1,95 @@
+"""Keyset pagination: cursors round-trip on every engine and tampered ones are refused"""
+
+import base64
+import json
+
+from conftest import create_entities
+from lawmox.pagination import MAX_PAGE_SIZE, keyset_query
+
+
+def walk(client, url):
+    """Every item of a list endpoint, following next_cursor"""
+    items, cursor = [], None
+    while True:
+        page = client.get(url, params={"cursor": cursor} if cursor else {})
+        assert page.status_code == 200, page.text
+        items.extend(page.json()["items"])
+        cursor = page.json()["next_cursor"]
+        if not cursor:
+            return items
+
+
+def cursor_of(*parts):
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip_newest_first(client):
+    entities = create_entities(client, 5)
+    items = walk(client, "/entities?limit=2")
+    assert [item["id"] for item in items] == [entity["id"] for entity in reversed(entities)]
+
+
+def test_cursor_round_trip_by_name(client):
+    entities = create_entities(client, 5)
+    items = walk(client, "/entities?limit=2&sort=entity_name")
+    assert [item["entity_name"] for item in items] == sorted(entity["entity_name"] for entity in entities)
+
+
+def test_cursor_round_trip_by_deadline(client):
+    entity, = create_entities(client, 1)
+    deadlines = ["2026-03-01", None, "2026-01-15", "2026-03-01", None, "2026-02-01"]
+    for i, deadline in enumerate(deadlines):
+        client.post("/tasks", json={"task_name": f"task-{i}", "entity_id": entity["id"], "deadline": deadline,
+                                    "status": "completed" if i == 5 else "pending"})
+    items = walk(client, "/tasks?limit=2&sort=deadline")
+    assert [item["deadline"] for item in items] == sorted(deadline for deadline in deadlines if deadline)
+    items = walk(client, "/tasks?limit=1&sort=-deadline&status=pending")
+    assert [item["deadline"] for item in items] == ["2026-03-01", "2026-03-01", "2026-01-15"]
+
+
+def test_cursor_for_another_sort_is_rejected(client):
+    create_entities(client, 3)
+    cursor = client.get("/entities?limit=1").json()["next_cursor"]
+    response = client.get("/entities", params={"cursor": cursor, "sort": "entity_name"})
+    assert response.status_code == 400
+
+
+def test_tampered_cursors_are_rejected(client):
+    create_entities(client, 2)
+    uuid = "00000000-0000-0000-0000-000000000000"
+    for sort, cursor in (
+        ("-created_at", "not-base64!"),
+        ("-created_at", cursor_of("-created_at", "yesterday", uuid)),
+        ("-created_at", cursor_of("-created_at", "2026-01-01T00:00:00", uuid)),
+        ("-created_at", cursor_of("-created_at", 5, uuid)),
+        ("-created_at", cursor_of("-created_at", "2026-01-01T00:00:00+00:00", "x")),
+        ("entity_name", cursor_of("entity_name", None, uuid)),
+    ):
+        response = client.get("/entities", params={"cursor": cursor, "sort": sort})
+        assert response.status_code == 400, cursor
+    response = client.get("/tasks", params={"cursor": cursor_of("deadline", "soon", uuid), "sort": "deadline"})
+    assert response.status_code == 400
+
+
+def test_page_size_is_bounded(client):
+    assert client.get("/entities?limit=0").status_code == 422
+    assert client.get(f"/entities?limit={MAX_PAGE_SIZE + 1}").status_code == 422
+
+
+def test_writes_between_pages_do_not_shift_later_pages(client):
+    entities = create_entities(client, 4)
+    first = client.get("/entities?limit=2").json()
+    # An offset would now repeat entity-002 on page two
+    create_entities(client, 1)
+    second = client.get("/entities", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    listed = [item["id"] for item in first["items"] + second["items"]]
+    assert listed == [entity["id"] for entity in reversed(entities)]
+    assert second["next_cursor"] is None
+
+
+def test_keyset_query_seeks_past_the_cursor():
+    cursor = cursor_of("entity_name", "Acme", "00000000-0000-0000-0000-000000000000")
+    query, params = keyset_query("SELECT * FROM entities", cursor, 10, ["status = %s"], ["active"], "entity_name")
+    assert query == ("SELECT * FROM entities WHERE status = %s AND (entity_name, id) > (%s::text, %s::uuid) "
+                     "ORDER BY entity_name ASC, id ASC LIMIT %s")
+    assert params == ["active", "Acme", "00000000-0000-0000-0000-000000000000", 11]
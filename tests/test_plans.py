@@ -0,0 +1,40 @@
+"""benchmarks/check_plans.py at its full size: ~1M task steps, loaded in about two minutes"""
+
+import os
+import sys
+
+import pytest
+
+from conftest import ROOT, TEST_DATABASE_URL, empty_database, postgres_only
+
+pytestmark = postgres_only
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture(scope="module")
+def loaded():
+    """TEST_DATABASE_URL with check_plans' default dataset, vacuumed and analyzed"""
+    import check_plans
+    import psycopg2
+
+    args = check_plans.arguments().parse_args([])
+    empty_database(TEST_DATABASE_URL)
+    try:
+        check_plans.load(TEST_DATABASE_URL, args)
+        conn = psycopg2.connect(TEST_DATABASE_URL)
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("VACUUM ANALYZE")
+        finally:
+            conn.close()
+        yield args
+    finally:
+        empty_database(TEST_DATABASE_URL)
+
+
+def test_every_selective_query_uses_an_index(loaded):
+    import check_plans
+
+    assert check_plans.check(TEST_DATABASE_URL, loaded.min_rows, loaded.scan_fraction) == []
@@ -0,0 +1,81 @@
+"""The bounded connection pool, against the TEST_DATABASE_URL server"""
+
+import threading
+
+import pytest
+
+from conftest import TEST_DATABASE_URL, postgres_only
+from lawmox.pool import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(TEST_DATABASE_URL, minconn=0, maxconn=2, timeout=1)
+    yield pool
+    pool.closeall()
+
+
+def test_pool_size_is_validated():
+    for minconn, maxconn in ((-1, 2), (0, 0), (3, 2)):
+        with pytest.raises(ValueError):
+            ConnectionPool(minconn=minconn, maxconn=maxconn)
+
+
+@postgres_only
+def test_connections_are_reused(pool):
+    for _ in range(5):
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    stats = pool.stats()
+    assert (stats["connections_created"], stats["checkouts"], stats["size"], stats["idle"]) == (1, 5, 1, 1)
+
+
+@postgres_only
+def test_checkout_waits_then_times_out_at_the_bound(pool):
+    held = [pool.getconn(), pool.getconn()]
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.1)
+    # A connection handed back wakes a waiting checkout
+    threading.Timer(0.1, held.pop().close).start()
+    held.append(pool.getconn(timeout=5))
+    stats = pool.stats()
+    assert (stats["size"], stats["in_use"], stats["timeouts"], stats["waits"]) == (2, 2, 1, 2)
+    for conn in held:
+        conn.close()
+    assert pool.stats()["idle"] == 2
+
+
+@postgres_only
+def test_returned_connections_are_rolled_back(pool):
+    import psycopg2
+    from psycopg2 import extensions
+
+    conn = pool.getconn()
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1")
+    conn.close()
+    with pytest.raises(psycopg2.InterfaceError):
+        conn.cursor()
+    with pool.connection() as conn:
+        assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+
+
+@postgres_only
+def test_broken_connections_are_replaced(pool):
+    pool.health_check_interval = 0
+    victim, killer = pool.getconn(), pool.getconn()
+    backend = victim.get_backend_pid()
+    victim.close()
+    with killer.cursor() as cur:
+        cur.execute("SELECT pg_terminate_backend(%s)", (backend,))
+    killer.commit()
+    # The idle victim fails its ping and a new connection takes its place
+    with pool.connection() as conn:
+        assert conn.get_backend_pid() != backend
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            assert cur.fetchone() == (1,)
+    killer.close()
+    stats = pool.stats()
+    assert (stats["health_check_failures"], stats["connections_created"], stats["size"]) == (1, 3, 2)
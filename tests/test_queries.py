@@ -0,0 +1,95 @@
+"""Per-request query accounting on Postgres: fixed statement budgets and slow-query capture"""
+
+import pytest
+
+import lawmox.app as api
+from conftest import create_entities
+from lawmox import queries
+from lawmox.cache import MemoryCache, ResponseCache
+from lawmox.queries import assert_max_queries
+
+
+@pytest.fixture
+def seeded(pg_client):
+    """Three entities, each with an account and three tasks of two steps"""
+    entities = create_entities(pg_client, 3)
+    for entity in entities:
+        account = pg_client.post("/accounts", json={
+            "account_name": "bank", "username": f"user-{entity['id']}", "password": "secret", "entity_id": entity["id"],
+        }).json()
+        for i in range(3):
+            task = pg_client.post("/tasks", json={
+                "task_name": f"task-{i}", "entity_id": entity["id"], "account_id": account["id"],
+            }).json()
+            for j in range(2):
+                pg_client.post("/task-steps", json={"task_id": task["id"], "step_name": f"step-{j}"})
+    return entities
+
+
+@pytest.mark.parametrize("limit", [1, 25])
+def test_dashboard_is_one_query(pg_client, seeded, limit):
+    page = assert_max_queries(pg_client, 1, "GET", f"/dashboard?limit={limit}").json()
+    assert len(page["items"]) == min(limit, 3)
+    assert all(len(task["steps"]) == 2 for entity in page["items"] for task in entity["tasks"])
+
+
+def test_entity_full_is_one_query(pg_client, seeded):
+    entity = assert_max_queries(pg_client, 1, "GET", f"/entities/{seeded[0]['id']}/full").json()
+    assert len(entity["accounts"]) == 1
+    assert len(entity["tasks"]) == 3
+
+
+@pytest.mark.parametrize("url", [
+    "/entities", "/entities?status=active&sort=entity_name", "/accounts", "/tasks", "/tasks?status=pending",
+    "/task-steps", "/tasks?fields=id,task_name",
+])
+def test_list_pages_are_a_version_and_a_page_query(pg_client, seeded, url):
+    # The collection version (for the ETag) and the page itself
+    assert_max_queries(pg_client, 2, "GET", url)
+
+
+def test_filtered_list_by_parent(pg_client, seeded):
+    assert_max_queries(pg_client, 2, "GET", f"/tasks?entity_id={seeded[0]['id']}")
+    assert_max_queries(pg_client, 2, "GET", f"/accounts?entity_id={seeded[0]['id']}")
+
+
+def test_revalidation_skips_the_page_query(pg_client, seeded, monkeypatch):
+    # Without the response cache, so the request reaches the database
+    monkeypatch.setattr(api, "cache", ResponseCache(MemoryCache(), ttl=0))
+    etag = pg_client.get("/entities").headers["etag"]
+    response = assert_max_queries(pg_client, 1, "GET", "/entities", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_cache_hits_need_no_queries(pg_client, seeded):
+    task_id = pg_client.get("/tasks").json()["items"][0]["id"]
+    pg_client.get(f"/tasks/{task_id}")
+    assert_max_queries(pg_client, 0, "GET", "/tasks")
+    assert_max_queries(pg_client, 0, "GET", f"/tasks/{task_id}")
+
+
+def test_detail_is_one_query(pg_client, seeded):
+    assert_max_queries(pg_client, 1, "GET", f"/entities/{seeded[0]['id']}")
+
+
+def test_responses_carry_the_statement_count(pg_client, seeded):
+    response = assert_max_queries(pg_client, 2, "GET", "/tasks")
+    assert response.headers["x-db-queries"] == "2"
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="2 queries"')
+    # Off unless QUERY_DEBUG is set
+    assert "x-db-queries" not in pg_client.get("/accounts").headers
+
+
+def test_slow_queries_are_logged_with_their_plan(pg_client, monkeypatch, capsys):
+    monkeypatch.setattr(queries, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(queries, "SLOW_QUERY_EXPLAIN", True)
+    capsys.readouterr()
+    created = pg_client.post("/entities", json={"entity_name": "Acme"}).json()
+    logged = capsys.readouterr().out
+    assert "Slow query" in logged and "/entities" in logged
+    assert "INSERT INTO entities" in logged
+    assert "Insert on entities" in logged
+    # The EXPLAIN ANALYZE ran in a rolled-back savepoint: the row went in once
+    monkeypatch.setattr(queries, "SLOW_QUERY_MS", 500)
+    assert [item["id"] for item in pg_client.get("/entities").json()["items"]] == [created["id"]]
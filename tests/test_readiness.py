@@ -0,0 +1,82 @@
+"""The readiness monitor: requests fail fast while the database is down"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import lawmox.app as api
+from conftest import TEST_DATABASE_URL, postgres_only
+from lawmox.cache import ResponseCache
+from lawmox.pool import ConnectionPool
+from lawmox.readiness import DatabaseUnavailable, ReadinessMonitor
+
+# A Unix socket nothing listens on: connecting fails at once
+DOWN_DSN = "postgresql://postgres@/lawmox?host=/nonexistent"
+
+
+def monitor_for(dsn, **options):
+    return ReadinessMonitor(ConnectionPool(dsn, minconn=0, maxconn=2), **options)
+
+
+async def running(monitor, seconds):
+    """Let ``monitor`` probe for ``seconds``"""
+    monitor.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await monitor.stop()
+
+
+async def until_ready(monitor):
+    while not monitor.ready:
+        await asyncio.sleep(0.01)
+
+
+def test_requests_fail_fast_while_the_database_is_down(monkeypatch):
+    from lawmox.postgres import PostgresRepository
+
+    monkeypatch.setattr(api, "repository", PostgresRepository(DOWN_DSN))
+    monkeypatch.setattr(api, "cache", ResponseCache.from_env())
+    monkeypatch.setattr(api, "WARMUP_TIMEOUT", 0)
+    with TestClient(api.app) as client:
+        started = time.perf_counter()
+        ready = client.get("/ready")
+        listed = client.get("/entities")
+        assert time.perf_counter() - started < 1
+    assert ready.status_code == listed.status_code == 503
+    assert int(ready.headers["retry-after"]) >= 1
+    assert ready.json()["status"] == "unavailable"
+    assert "Database unavailable" in listed.json()["detail"]
+
+
+def test_probes_back_off_up_to_the_cap():
+    monitor = monitor_for(DOWN_DSN, initial_backoff=0.01, max_backoff=0.04)
+    asyncio.run(running(monitor, 0.3))
+    assert monitor._backoff == 0.04
+    with pytest.raises(DatabaseUnavailable):
+        monitor.check()
+    monitor.pool.closeall()
+
+
+@postgres_only
+def test_ready_once_reached_and_reprobed_when_marked_down():
+    prepared = []
+    monitor = monitor_for(TEST_DATABASE_URL, on_ready=lambda: prepared.append(True), check_interval=60)
+
+    async def scenario():
+        monitor.start()
+        try:
+            await asyncio.wait_for(until_ready(monitor), 5)
+            monitor.check()
+            # A request hit a dead connection: the monitor probes again now, not in a minute
+            monitor.mark_unavailable(Exception("server closed the connection"))
+            assert not monitor.ready
+            await asyncio.wait_for(until_ready(monitor), 1)
+        finally:
+            await monitor.stop()
+
+    asyncio.run(scenario())
+    monitor.pool.closeall()
+    assert prepared == [True]
@@ -0,0 +1,43 @@
+"""The storage engines directly, below the API"""
+
+import asyncio
+
+import pytest
+
+from conftest import make_repository, postgres_only
+
+
+@pytest.fixture(params=["memory", pytest.param("postgres", marks=postgres_only)])
+def engine(request):
+    return request.param
+
+
+def run_on(engine, scenario):
+    """``await scenario(repository)`` on a started, empty repository of ``engine``"""
+    async def main():
+        repository = make_repository(engine)
+        repository.start()
+        await repository.warm_up(10)
+        try:
+            return await scenario(repository)
+        finally:
+            await repository.close()
+    return asyncio.run(main())
+
+
+def test_related_looks_up_rows_by_any_value(engine):
+    async def scenario(repository):
+        entity = await repository.insert("entities", {"entity_name": "Acme"}, ("id",))
+        other = await repository.insert("entities", {"entity_name": "Other"}, ("id",))
+        account = await repository.insert("accounts", {
+            "account_name": "bank", "username": "acme", "encrypted_password": "x", "entity_id": entity["id"],
+        }, ("id",))
+        by_entity = await repository.related("accounts", "entity_id", [entity["id"], other["id"]], ("id",))
+        by_id = await repository.related("entities", "id", [str(entity["id"])], ("id",))
+        by_username = await repository.related("accounts", "username", ["acme", "nobody"], ("username",))
+        return account, entity, by_entity, by_id, by_username
+
+    account, entity, by_entity, by_id, by_username = run_on(engine, scenario)
+    assert [str(row["id"]) for row in by_entity] == [str(account["id"])]
+    assert [str(row["id"]) for row in by_id] == [str(entity["id"])]
+    assert by_username == [{"username": "acme"}]
@@ -0,0 +1,66 @@
+"""The list fast path: tuples encoded straight to JSON, alike on every route and encoder"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from conftest import create_entities
+from lawmox import serialize
+from lawmox.pagination import encode_cursor
+from lawmox.serialize import dumps, page_data, paginate_tuples
+
+
+def test_encoders_agree(monkeypatch):
+    value = {
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+        "at": datetime(2026, 1, 1, 9, 30, 0, 500000, tzinfo=timezone.utc),
+        "local": datetime(2026, 1, 1, 9, 30, tzinfo=timezone(timedelta(hours=2))),
+        "on": date(2026, 1, 1),
+        "amount": Decimal("1.50"),
+        "name": "Ünïcode",
+    }
+    fast = dumps(value)
+    monkeypatch.setattr(serialize, "orjson", None)
+    assert json.loads(dumps(value)) == json.loads(fast) == {
+        "id": "12345678-1234-5678-1234-567812345678",
+        "at": "2026-01-01T09:30:00.500000+00:00",
+        "local": "2026-01-01T09:30:00+02:00",
+        "on": "2026-01-01",
+        "amount": "1.50",
+        "name": "Ünïcode",
+    }
+
+
+def test_tuple_pages_drop_cursor_only_columns():
+    columns = ["entity_name", "created_at", "id"]
+    rows = [("b", datetime(2026, 1, 2, tzinfo=timezone.utc), "2"), ("a", datetime(2026, 1, 1, tzinfo=timezone.utc), "1")]
+    page, cursor = paginate_tuples(columns, rows, 1)
+    assert cursor == encode_cursor(dict(zip(columns, rows[0])))
+    assert page_data(columns, page, cursor, ["entity_name"]) == {"items": [{"entity_name": "b"}], "next_cursor": cursor}
+
+
+def test_every_response_writes_timestamps_alike(client):
+    entity, = create_entities(client, 1)
+    assert entity["created_at"].endswith("+00:00")
+    listed, = client.get("/entities").json()["items"]
+    detail = client.get(f"/entities/{entity['id']}").json()
+    full = client.get(f"/entities/{entity['id']}/full").json()
+    dashboard, = client.get("/dashboard").json()["items"]
+    updated = client.put(f"/entities/{entity['id']}", json={"status": "inactive"}).json()
+    assert listed["created_at"] == detail["created_at"] == full["created_at"] == dashboard["created_at"] == entity["created_at"]
+    assert updated["created_at"] == entity["created_at"]
+    assert updated["updated_at"].endswith("+00:00")
+
+
+def test_exports_write_timestamps_like_the_api(client):
+    entity, = create_entities(client, 1, date_of_formation="2020-02-29")
+    with client.stream("GET", "/export/entities") as response:
+        row, = csv.DictReader(io.StringIO("".join(response.iter_text())))
+    with client.stream("GET", "/export/entities?format=ndjson") as response:
+        line, = [json.loads(line) for line in response.iter_lines() if line]
+    for exported in (row, line):
+        assert (exported["created_at"], exported["updated_at"]) == (entity["created_at"], entity["updated_at"])
+        assert exported["date_of_formation"] == "2020-02-29"
@@ -0,0 +1,67 @@
+"""Worker count and per-worker pool sizing for lawmox.serve"""
+
+import os
+
+import pytest
+
+from lawmox import serve
+from lawmox.serve import MIN_POOL_SIZE, configure, max_workers, pool_size, worker_count
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """A clean serving environment on an 8-CPU machine"""
+    for name in ("WEB_CONCURRENCY", "DB_POOL_MAX_SIZE", "DB_POOL_MIN_SIZE", "CRYPTO_WORKERS", "CACHE_URL", "CACHE_TTL",
+                 "ENCRYPTION_KEY", "STORAGE"):
+        # Set first so the variables configure() writes are restored afterwards
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+    monkeypatch.setattr(serve, "available_cpus", lambda: 8)
+    return monkeypatch
+
+
+@pytest.mark.parametrize("budget", [6, 10, 40, 100, 500])
+def test_workers_and_a_reload_spare_stay_within_the_budget(budget):
+    for workers in range(1, max_workers(budget) + 1):
+        # Every process, the reload spare included, holds its pool and a LISTEN connection
+        assert (workers + 1) * (pool_size(budget, workers) + 1) <= budget
+        assert pool_size(budget, workers) >= MIN_POOL_SIZE
+
+
+def test_pools_never_shrink_below_the_minimum():
+    assert max_workers(3) == 1
+    assert pool_size(3, 1) == MIN_POOL_SIZE
+    assert pool_size(40, 1, requested=1) == 1
+
+
+def test_worker_count_defaults_to_the_cpus(env):
+    assert worker_count(budget=100) == 8
+    assert worker_count(budget=100, postgres=False) == 8
+    env.setenv("WEB_CONCURRENCY", "3")
+    assert worker_count(budget=100) == 3
+    assert worker_count(5, budget=100) == 5
+
+
+def test_worker_count_is_capped_by_the_budget_on_postgres(env):
+    assert worker_count(budget=12) == max_workers(12) == 3
+    assert worker_count(16, budget=12, postgres=False) == 16
+
+
+def test_configure_shares_the_budget_and_one_key(env):
+    env.setenv("CACHE_TTL", "30")
+    configure(4, budget=40)
+    assert os.environ["DB_POOL_MAX_SIZE"] == "7"
+    assert os.environ["DB_POOL_MIN_SIZE"] == "1"
+    assert os.environ["CRYPTO_WORKERS"] == "2"
+    # Per-worker caches would miss each other's invalidations
+    assert os.environ["CACHE_TTL"] == "0"
+    assert os.environ["ENCRYPTION_KEY"]
+
+
+def test_configure_keeps_a_smaller_requested_pool(env):
+    env.setenv("DB_POOL_MAX_SIZE", "3")
+    env.setenv("CACHE_URL", "redis://localhost")
+    env.setenv("CACHE_TTL", "30")
+    configure(2, budget=40)
+    assert os.environ["DB_POOL_MAX_SIZE"] == "3"
+    assert os.environ["CACHE_TTL"] == "30"
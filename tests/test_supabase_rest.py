@@ -0,0 +1,96 @@
+"""SupabaseRepository against a small in-process PostgREST: round trips and column mapping"""
+
+import asyncio
+
+import httpx
+
+from lawmox.supabase_rest import SupabaseRepository, SupabaseRest
+
+FILTER_OPERATORS = {
+    "eq": lambda value, arg: str(value) == arg,
+    "in": lambda value, arg: str(value) in {item.strip('"') for item in arg.strip("()").split(",")},
+}
+
+
+def selected(row, select):
+    """``row`` projected by a PostgREST select list; ``alias:column`` renames"""
+    result = {}
+    for name in select.split(","):
+        alias, _, column = name.partition(":")
+        result[alias] = row.get(column or alias)
+    return result
+
+
+def postgrest(tables, calls):
+    """A MockTransport answering GETs with ``tables`` (eq/in filters, order, limit, select aliases)"""
+
+    def handle(request):
+        table = request.url.path.rsplit("/", 1)[-1]
+        calls.append((request.method, table))
+        params = request.url.params
+        rows = list(tables[table])
+        for name, value in params.multi_items():
+            op, _, arg = value.partition(".")
+            if op in FILTER_OPERATORS:
+                rows = [row for row in rows if FILTER_OPERATORS[op](row[name], arg)]
+        for key in reversed(params["order"].split(",") if "order" in params else []):
+            column, direction = key.split(".")
+            rows.sort(key=lambda row: row[column], reverse=direction == "desc")
+        if "limit" in params:
+            rows = rows[:int(params["limit"])]
+        return httpx.Response(200, json=[selected(row, params["select"]) for row in rows])
+
+    return httpx.MockTransport(handle)
+
+
+def seeded_tables(entities=3, tasks=2, steps=2):
+    """database_schema.sql rows: every entity has one account and ``tasks`` tasks of ``steps`` steps"""
+    tables = {"entities": [], "accounts": [], "tasks": [], "task_steps": []}
+    for e in range(entities):
+        entity_id = f"00000000-0000-0000-0000-{e:012d}"
+        created = f"2026-01-0{e + 1}T00:00:00+00:00"
+        tables["entities"].append({"id": entity_id, "entity_name": f"entity-{e}", "status": "active",
+                                   "created_at": created, "updated_at": created})
+        tables["accounts"].append({"id": f"a-{e}", "entity_id": entity_id, "account_name": "bank", "username": f"user-{e}",
+                                   "password_encrypted": "token", "created_at": created, "updated_at": created})
+        for t in range(tasks):
+            task_id = f"t-{e}-{t}"
+            tables["tasks"].append({"id": task_id, "entity_id": entity_id, "task_title": f"task-{t}", "status": "pending",
+                                    "created_at": created, "updated_at": created})
+            for s in range(steps):
+                tables["task_steps"].append({"id": f"s-{e}-{t}-{s}", "task_id": task_id, "step_description": f"step-{s}",
+                                             "step_order": s + 1, "completed": s == 0, "created_at": f"{created[:11]}0{s}:00:00+00:00"})
+    return tables
+
+
+def run(tables, scenario):
+    """(scenario(repository) result, PostgREST calls made)"""
+    calls = []
+
+    async def main():
+        rest = SupabaseRest("https://supabase.test", "key")
+        await rest.client.aclose()
+        rest.client = httpx.AsyncClient(base_url="https://supabase.test/rest/v1", transport=postgrest(tables, calls))
+        repository = SupabaseRepository(rest)
+        try:
+            return await scenario(repository)
+        finally:
+            await repository.close()
+
+    return asyncio.run(main()), calls
+
+
+def test_dashboard_is_four_requests_whatever_its_size():
+    for entities in (1, 5):
+        page, calls = run(seeded_tables(entities), lambda repository: repository.dashboard(limit=25))
+        assert len(page) == entities
+        assert calls == [("GET", "entities"), ("GET", "accounts"), ("GET", "tasks"), ("GET", "task_steps")]
+
+
+def test_tasks_come_back_with_their_steps_mapped():
+    entity, calls = run(seeded_tables(), lambda repository: repository.entity_full("00000000-0000-0000-0000-000000000001"))
+    assert len(calls) == 4
+    assert sorted(task["task_name"] for task in entity["tasks"]) == ["task-0", "task-1"]
+    steps = entity["tasks"][0]["steps"]
+    assert [(step["step_name"], step["status"]) for step in steps] == [("step-0", "completed"), ("step-1", "pending")]
+    assert "encrypted_password" not in entity["accounts"][0]